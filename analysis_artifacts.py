@@ -0,0 +1,164 @@
+"""
+Normalised, sharded analysis artifacts for the frontend.
+
+``analysis_results.json`` repeats every fixture string for every team and
+target, and a page only ever shows one team at a time. ``write_artifacts``
+splits the same analysis into
+
+* ``overview.json``: metadata, the team list, a shared fixture index table,
+  the outcome code table and every cross-team column (overall probabilities,
+  percentages, expected positions, lineups, ...), with per-team values stored
+  as arrays in team order;
+* ``teams/<team>.json``: that team's slice (required outcomes as integer codes
+  indexing the fixture table, qualification path, position distribution,
+  points thresholds and trajectory).
+
+Files are written compactly with deterministic ``.gz`` siblings and, when the
+optional ``brotli`` package is installed, ``.br`` siblings, so a static host
+can serve the pre-compressed bytes directly.
+"""
+import gzip
+import json
+import os
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACTS_DIR = os.path.join(BASE_DIR, "analysis")
+OUTCOME_CODES = ["Result doesn't matter", "team1 wins", "team2 wins"]  # 0, 1, 2
+TEAM_SECTIONS = ("qualification_path", "position_distribution", "tiebreak_range")
+
+
+def _team_file(team):
+    return "teams/" + re.sub(r"[^A-Za-z0-9_-]", "_", team) + ".json"
+
+
+def _encode_outcomes(results_df, fixtures, extra_labels):
+    """Outcome codes aligned with the fixture table, or None if there are none."""
+    if not results_df:
+        return None
+    codes = []
+    for team_a, team_b in fixtures:
+        entry = results_df.get(f"{team_a} vs {team_b}")
+        label = entry["Outcome"] if entry else OUTCOME_CODES[0]
+        if label == OUTCOME_CODES[0]:
+            codes.append(0)
+        elif label == f"{team_a} wins":
+            codes.append(1)
+        elif label == f"{team_b} wins":
+            codes.append(2)
+        else:
+            if label not in extra_labels:
+                extra_labels.append(label)
+            codes.append(len(OUTCOME_CODES) + extra_labels.index(label))
+    return codes
+
+
+def build_artifacts(output_data, fixtures):
+    """Returns (overview, {relative team file: team shard}) for an analysis artifact."""
+    analysis = output_data["analysis_data"]
+    overall = analysis["overall_probabilities"]
+    teams = list(overall)
+    fixtures = [list(match) for match in fixtures]
+    columns = ["Top 4 Probability", "Top 2 Probability"]
+    extra_labels = []
+    team_analysis = {str(n): by_team for n, by_team in analysis.get("team_analysis", {}).items()}
+
+    overview = {
+        "metadata": output_data["metadata"],
+        "teams": teams,
+        "fixtures": fixtures,
+        "outcome_codes": OUTCOME_CODES,
+        "extra_outcomes": extra_labels,
+        "overall_probabilities": {
+            "columns": columns,
+            "rows": [[overall[team][column] for column in columns] for team in teams],
+        },
+        "percentage": {
+            n: [by_team.get(team, {}).get("percentage", 0) for team in teams]
+            for n, by_team in team_analysis.items()
+        },
+        "team_files": {team: _team_file(team) for team in teams},
+    }
+    if "expected_position" in analysis:
+        overview["expected_position"] = {
+            policy: [values.get(team) for team in teams]
+            for policy, values in analysis["expected_position"].items()
+        }
+    if "co_qualification" in analysis:
+        co = analysis["co_qualification"]
+        overview["co_qualification"] = [[co[a].get(b, 0) for b in teams] for a in teams]
+    if "playoff_lineups" in analysis:
+        overview["playoff_lineups"] = analysis["playoff_lineups"]
+    thresholds = analysis.get("points_thresholds", {})
+    if "cutoff_points" in thresholds:
+        overview["cutoff_points"] = thresholds["cutoff_points"]
+    trajectory = analysis.get("probability_trajectory")
+    if trajectory:
+        overview["trajectory_percentiles"] = trajectory["percentiles"]
+
+    shards = {}
+    for team in teams:
+        shard = {
+            "team": team,
+            "team_analysis": {
+                n: {
+                    "percentage": by_team.get(team, {}).get("percentage", 0),
+                    "outcomes": _encode_outcomes(
+                        by_team.get(team, {}).get("results_df"), fixtures, extra_labels
+                    ),
+                }
+                for n, by_team in team_analysis.items()
+            },
+        }
+        for section in TEAM_SECTIONS:
+            if section in analysis:
+                shard[section] = {
+                    str(key): by_team.get(team) for key, by_team in analysis[section].items()
+                }
+        if "qualification_by_points" in thresholds:
+            shard["qualification_by_points"] = {
+                policy: {n: by_team.get(team, {}) for n, by_team in by_target.items()}
+                for policy, by_target in thresholds["qualification_by_points"].items()
+            }
+        if trajectory:
+            shard["probability_trajectory"] = {
+                str(n): by_team.get(team) for n, by_team in trajectory["teams"].items()
+            }
+        shards[_team_file(team)] = shard
+    return overview, shards
+
+
+def _write(path, obj):
+    """Writes compact JSON plus .gz (and .br) siblings; returns the JSON byte size."""
+    data = json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    with open(path + ".gz", "wb") as f:
+        # mtime=0 keeps the bytes stable when the content is unchanged.
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(data, quality=11))
+    return len(data)
+
+
+def write_artifacts(output_data, fixtures, out_dir=ARTIFACTS_DIR):
+    """Writes overview.json and teams/*.json under out_dir. Returns {relative path: bytes}."""
+    overview, shards = build_artifacts(output_data, fixtures)
+    teams_dir = os.path.join(out_dir, "teams")
+    if os.path.isdir(teams_dir):  # Drop shards of teams no longer in the analysis
+        current = {os.path.basename(relative) for relative in shards}
+        for name in os.listdir(teams_dir):
+            if name.split(".json")[0] + ".json" not in current:
+                os.remove(os.path.join(teams_dir, name))
+    sizes = {}
+    for relative, shard in shards.items():
+        sizes[relative] = _write(os.path.join(out_dir, relative), shard)
+    sizes["overview.json"] = _write(os.path.join(out_dir, "overview.json"), overview)
+    return sizes
@@ -0,0 +1,360 @@
+"""
+Local HTTP service for analysis and what-if queries.
+
+A small asyncio front end serves JSON built on the engines in
+``ipl_analysis_app.py``:
+
+    GET  /health                         -> {"status": "ok", ...}
+    GET  /probabilities                  -> overall Top 4 / Top 2 probabilities
+    GET  /teams/<team>?top=4             -> one team's chance and required outcomes
+    POST /what-if                        -> the same, with some fixtures pinned
+
+A what-if body pins remaining fixtures (indices into remaining_fixtures.json)
+to a winner, or to null for a no result:
+
+    {"pinned": [{"fixture": 0, "winner": "Chennai"}], "team": "Delhi", "top": 4}
+
+Pinned results are added to the standings and the fixtures are dropped, so
+the engines only see the smaller remaining problem. Engine work runs in a
+process pool. Results are kept in an LRU cache keyed by the canonical request
+(input hash of the effective standings and fixtures plus the engine settings),
+and identical requests that arrive while one is being computed share that
+computation instead of starting another.
+
+    python analysis_service.py [--host 127.0.0.1] [--port 8765] [--workers N]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from ipl_analysis_app import (
+    FIXTURES_FILE,
+    STANDINGS_FILE,
+    analyze_team_mc,
+    load_data,
+    run_exhaustive_analysis_once,
+    simulate_season_mc,
+)
+from match_ledger import apply_results
+from scenario_aggregates import QUALIFICATION_TARGETS
+from scenario_space import compute_input_hash
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+CACHE_SIZE = 256  # Analyses kept in the LRU cache
+EXACT_LIMIT = 20  # Max remaining fixtures answered by exhaustive enumeration
+SERVICE_MC_SIMULATIONS = 50000  # Monte Carlo runs per query above EXACT_LIMIT
+MAX_BODY_BYTES = 64 * 1024
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class RequestError(Exception):
+    """A client error, answered with its HTTP status and message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# --- Engine work (runs in worker processes) ---
+def _plain(obj):
+    """JSON round trip: string keys and builtin types only."""
+    return json.loads(json.dumps(obj))
+
+
+def run_full_analysis(standings, fixtures):
+    """Exhaustive overall probabilities and team analysis for every team."""
+    results = run_exhaustive_analysis_once(standings, fixtures, progress=False) or {}
+    return _plain(
+        {
+            "overall_probabilities": results.get("overall_probabilities", {}),
+            "team_analysis": results.get("team_analysis", {}),
+        }
+    )
+
+
+def run_overall_mc(standings, fixtures, num_simulations, seed):
+    random.seed(seed)
+    return _plain({"overall_probabilities": simulate_season_mc(standings, fixtures, num_simulations=num_simulations) or {}})
+
+
+def run_team_mc(team, top_n, standings, fixtures, num_simulations, seed):
+    random.seed(seed)
+    percentage, results_df = analyze_team_mc(team, top_n, standings, fixtures, num_simulations=num_simulations)
+    return _plain({"percentage": percentage, "results_df": results_df.to_dict(orient="index")})
+
+
+# --- Inputs ---
+_input_mtimes = {}
+
+
+def load_current_inputs():
+    """Current (standings, fixtures), re-read whenever either data file changes."""
+    mtimes = {path: os.path.getmtime(path) if os.path.exists(path) else None for path in (STANDINGS_FILE, FIXTURES_FILE)}
+    if mtimes != _input_mtimes:
+        load_data.clear()
+        _input_mtimes.clear()
+        _input_mtimes.update(mtimes)
+    standings, fixtures, _, _, _ = load_data()
+    return standings, [tuple(match) for match in fixtures]
+
+
+def apply_pinned(standings, fixtures, pinned):
+    """(standings, fixtures) with the pinned fixtures played. Raises RequestError if invalid."""
+    if not isinstance(pinned, list):
+        raise RequestError(400, "'pinned' must be a list.")
+    entries = {}
+    for pin in pinned:
+        if (
+            not isinstance(pin, dict)
+            or not isinstance(pin.get("fixture"), int)
+            or isinstance(pin["fixture"], bool)
+        ):
+            raise RequestError(400, "Each pin needs an integer 'fixture' index.")
+        index = pin["fixture"]
+        if not 0 <= index < len(fixtures):
+            raise RequestError(400, f"Fixture index {index} is out of range; {len(fixtures)} fixtures remain.")
+        if index in entries:
+            raise RequestError(400, f"Fixture {index} is pinned more than once.")
+        team1, team2 = fixtures[index]
+        winner = pin.get("winner")
+        if winner not in (team1, team2, None):
+            raise RequestError(400, f"Winner of fixture {index} must be {team1!r}, {team2!r} or null.")
+        entries[index] = {"team1": team1, "team2": team2, "winner": winner}
+    standings = apply_results({team: dict(stats) for team, stats in standings.items()}, entries.values())
+    return standings, [match for i, match in enumerate(fixtures) if i not in entries]
+
+
+# --- Service ---
+class AnalysisService:
+    """Routes queries to cached, coalesced engine runs on an executor."""
+
+    def __init__(
+        self,
+        executor,
+        load_inputs=load_current_inputs,
+        cache_size=CACHE_SIZE,
+        exact_limit=EXACT_LIMIT,
+        num_simulations=SERVICE_MC_SIMULATIONS,
+    ):
+        self.executor = executor
+        self.load_inputs = load_inputs
+        self.cache_size = cache_size
+        self.exact_limit = exact_limit
+        self.num_simulations = num_simulations
+        self.cache = OrderedDict()
+        self.in_flight = {}
+        self.stats = {"requests": 0, "hits": 0, "coalesced": 0, "computed": 0}
+
+    async def _cached(self, key, fn, *args):
+        """fn(*args) on the executor, memoised under key; concurrent callers share one run."""
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.stats["hits"] += 1
+            return self.cache[key]
+        if key in self.in_flight:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(self.in_flight[key])
+        future = asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        self.in_flight[key] = future
+        self.stats["computed"] += 1
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            del self.in_flight[key]
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+    def _engine(self, fixtures):
+        return "exhaustive" if len(fixtures) <= self.exact_limit else "monte_carlo"
+
+    def _key(self, standings, fixtures, **query):
+        config = {"engine": self._engine(fixtures), **query}
+        if config["engine"] == "monte_carlo":
+            config["num_simulations"] = self.num_simulations
+        return compute_input_hash(standings, fixtures, **config)
+
+    async def overall(self, standings, fixtures):
+        key = self._key(standings, fixtures)
+        if self._engine(fixtures) == "exhaustive":
+            result = await self._cached(key, run_full_analysis, standings, fixtures)
+        else:
+            result = await self._cached(key, run_overall_mc, standings, fixtures, self.num_simulations, key)
+        return key, result["overall_probabilities"]
+
+    async def team(self, team, top_n, standings, fixtures):
+        if not isinstance(team, str):
+            raise RequestError(400, "'team' must be a string.")
+        if team not in standings:
+            raise RequestError(404, f"Unknown team {team!r}.")
+        if not isinstance(top_n, int) or isinstance(top_n, bool) or top_n not in QUALIFICATION_TARGETS:
+            raise RequestError(400, f"'top' must be one of {list(QUALIFICATION_TARGETS)}.")
+        if self._engine(fixtures) == "exhaustive":
+            key = self._key(standings, fixtures)
+            result = await self._cached(key, run_full_analysis, standings, fixtures)
+            return key, result["team_analysis"][str(top_n)][team]
+        key = self._key(standings, fixtures, team=team, top_n=top_n)
+        return key, await self._cached(
+            key, run_team_mc, team, top_n, standings, fixtures, self.num_simulations, key
+        )
+
+    async def handle(self, method, path, query, body):
+        """Answers one request. Returns (status, JSON-serialisable payload)."""
+        self.stats["requests"] += 1
+        if path == "/health":
+            return 200, {"status": "ok", "cached": len(self.cache), "in_flight": len(self.in_flight), **self.stats}
+        standings, fixtures = self.load_inputs()
+        if path == "/probabilities":
+            if method != "GET":
+                raise RequestError(405, "Use GET.")
+            key, overall = await self.overall(standings, fixtures)
+            return 200, {"input_hash": key, "engine": self._engine(fixtures), "overall_probabilities": overall}
+        if path.startswith("/teams/"):
+            if method != "GET":
+                raise RequestError(405, "Use GET.")
+            try:
+                top_n = int(query.get("top", ["4"])[0])
+            except ValueError:
+                raise RequestError(400, "'top' must be an integer.")
+            team = unquote(path[len("/teams/"):])
+            key, analysis = await self.team(team, top_n, standings, fixtures)
+            return 200, {"input_hash": key, "engine": self._engine(fixtures), "team": team, "top": top_n, **analysis}
+        if path == "/what-if":
+            if method != "POST":
+                raise RequestError(405, "Use POST.")
+            try:
+                request = json.loads(body or b"{}")
+            except ValueError:
+                raise RequestError(400, "Body must be JSON.")
+            if not isinstance(request, dict):
+                raise RequestError(400, "Body must be a JSON object.")
+            pinned = request.get("pinned", [])
+            standings, remaining = apply_pinned(standings, fixtures, pinned)
+            key, overall = await self.overall(standings, remaining)
+            response = {
+                "input_hash": key,
+                "engine": self._engine(remaining),
+                "pinned": pinned,
+                "remaining_fixtures": len(remaining),
+                "overall_probabilities": overall,
+            }
+            if request.get("team") is not None:
+                top_n = request.get("top", 4)
+                _, response["team_analysis"] = await self.team(request["team"], top_n, standings, remaining)
+            return 200, response
+        raise RequestError(404, f"No route for {path}.")
+
+
+# --- HTTP ---
+async def read_request(reader):
+    """(method, target, headers, body) of the next request, or None at end of stream."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split()
+    except ValueError:
+        raise RequestError(400, "Malformed request line.")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise RequestError(400, "Content-Length must be an integer.")
+    if length < 0:
+        raise RequestError(400, "Content-Length must not be negative.")
+    if length > MAX_BODY_BYTES:
+        raise RequestError(400, "Request body too large.")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+def encode_response(status, payload, keep_alive):
+    body = json.dumps(payload).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'Error')}\r\n"
+        "Content-Type: application/json\r\n"
+        "Access-Control-Allow-Origin: *\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def serve_connection(service, reader, writer):
+    """Serves keep-alive requests on one connection until the client closes it."""
+    try:
+        while True:
+            keep_alive = False
+            try:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                url = urlsplit(target)
+                status, payload = await service.handle(method, url.path, parse_qs(url.query), body)
+            except RequestError as e:
+                status, payload = e.status, {"error": str(e)}
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            except Exception as e:
+                print(f"ERROR: Request failed: {e!r}")
+                status, payload = 500, {"error": "Analysis failed."}
+            writer.write(encode_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+
+async def start_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    return await asyncio.start_server(
+        lambda reader, writer: serve_connection(service, reader, writer), host, port
+    )
+
+
+async def main(host, port, workers, exact_limit, num_simulations):
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        service = AnalysisService(executor, exact_limit=exact_limit, num_simulations=num_simulations)
+        server = await start_server(service, host, port)
+        print(f"Analysis service listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve analysis and what-if queries over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Address to bind (default: %(default)s).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to bind (default: %(default)s).")
+    parser.add_argument("--workers", type=int, default=None, help="Engine worker processes (default: CPU count).")
+    parser.add_argument(
+        "--exact-limit",
+        type=int,
+        default=EXACT_LIMIT,
+        help="Max remaining fixtures answered exactly; above it Monte Carlo is used (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--simulations",
+        type=int,
+        default=SERVICE_MC_SIMULATIONS,
+        help="Monte Carlo runs per query (default: %(default)s).",
+    )
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.host, args.port, args.workers, args.exact_limit, args.simulations))
+    except KeyboardInterrupt:
+        print("Analysis service stopped.")
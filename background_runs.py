@@ -0,0 +1,203 @@
+"""
+Background analysis runs with anytime estimates.
+
+The estimate iterators yield the overall Top 4 / Top 2 probabilities after
+every chunk of work, each with a range per team:
+
+* ``iter_exhaustive_estimates`` walks the scenario space in a keyed
+  pseudo-random order (``scenario_space.permute_indices``), so the share of
+  scenarios enumerated so far is an unbiased estimate of the exact answer at
+  any point. The range is a 95% confidence interval for sampling without
+  replacement, clipped to the interval the exact answer is already guaranteed
+  to lie in (no remaining scenario qualifies .. every remaining scenario
+  qualifies). A run can be stopped early with a time budget.
+* ``iter_mc_estimates`` samples scenarios uniformly; the range is a 95%
+  confidence interval.
+
+``BackgroundRun`` consumes one of them on a daemon thread so a Streamlit page
+can poll ``snapshot()`` on every rerun and ``cancel()`` it at any time.
+"""
+import threading
+import time
+
+import numpy as np
+
+from scenario_aggregates import QUALIFICATION_TARGETS
+from scenario_space import (
+    DEFAULT_CHUNK_SIZE,
+    base_tables,
+    competition_ranks,
+    decode_outcomes,
+    fixture_team_indices,
+    iter_index_chunks,
+    permutation_key,
+    permute_indices,
+    scenario_tables,
+)
+
+MC_BATCH_SIZE = 20000  # Scenarios sampled between Monte Carlo estimates
+Z_95 = 1.96  # Normal quantile of the Monte Carlo confidence interval
+
+
+def _estimate(engine, team_keys, counts, done, total, ranges):
+    columns = [f"Top {n} Probability" for n in QUALIFICATION_TARGETS]
+    return {
+        "engine": engine,
+        "done": done,
+        "total": total,
+        "probabilities": {
+            team: {
+                column: (float(counts[i][t]) / done * 100 if done else 0.0)
+                for i, column in enumerate(columns)
+            }
+            for t, team in enumerate(team_keys)
+        },
+        "ranges": {
+            column: {team: ranges(counts[i][t]) for t, team in enumerate(team_keys)}
+            for i, column in enumerate(columns)
+        },
+    }
+
+
+def _qualifying_counts(outcomes, base_points, base_wins, team_a, team_b):
+    points, _ = scenario_tables(outcomes, base_points, base_wins, team_a, team_b)
+    ranks = competition_ranks(points)
+    return np.stack([(ranks <= n).sum(axis=0) for n in QUALIFICATION_TARGETS])
+
+
+def _unplayable(initial_standings_arg, fixtures_arg):
+    """True if a fixture names a team without standings (no scenario completes)."""
+    return any(
+        a not in initial_standings_arg or b not in initial_standings_arg
+        for a, b in fixtures_arg
+    )
+
+
+def iter_exhaustive_estimates(
+    initial_standings_arg,
+    fixtures_arg,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    order="random",
+    seed=None,
+    time_budget=None,
+):
+    """
+    Yields an estimate after each chunk of the exhaustive enumeration; the last
+    one is exact unless time_budget (seconds) ran out first. order is "random"
+    or "lexicographic" (the product([0, 1]) order, whose partial shares are
+    biased towards the first fixtures going one way).
+    """
+    team_keys = list(initial_standings_arg.keys())
+    num_fixtures = len(fixtures_arg)
+    total = 2**num_fixtures
+    counts = np.zeros((len(QUALIFICATION_TARGETS), len(team_keys)), dtype=np.int64)
+    if _unplayable(initial_standings_arg, fixtures_arg):
+        yield _estimate("exhaustive", team_keys, counts, total, total, lambda c: (0.0, 0.0))
+        return
+    base_points, base_wins = base_tables(initial_standings_arg, team_keys)
+    team_a, team_b = fixture_team_indices(team_keys, fixtures_arg)
+    key = permutation_key(seed) if order == "random" else None
+    deadline = time.time() + time_budget if time_budget is not None else None
+    for lo, hi in iter_index_chunks(total, chunk_size):
+        positions = np.arange(lo, hi, dtype=np.int64)
+        indices = permute_indices(positions, num_fixtures, key) if key is not None else positions
+        outcomes = decode_outcomes(indices, num_fixtures)
+        counts += _qualifying_counts(outcomes, base_points, base_wins, team_a, team_b)
+
+        def interval(c, done=hi):
+            low, high = c / total, (c + total - done) / total
+            if key is not None and done < total:
+                p = c / done
+                half_width = Z_95 * np.sqrt(p * (1 - p) / done * (total - done) / max(total - 1, 1))
+                low, high = max(low, p - half_width), min(high, p + half_width)
+            return (float(low) * 100, float(high) * 100)
+
+        yield _estimate("exhaustive", team_keys, counts, hi, total, interval)
+        if deadline is not None and time.time() >= deadline:
+            return
+
+
+def iter_mc_estimates(
+    initial_standings_arg,
+    fixtures_arg,
+    num_simulations,
+    batch_size=MC_BATCH_SIZE,
+    seed=None,
+):
+    """Yields a Monte Carlo estimate after each batch of uniformly sampled scenarios."""
+    team_keys = list(initial_standings_arg.keys())
+    counts = np.zeros((len(QUALIFICATION_TARGETS), len(team_keys)), dtype=np.int64)
+    if _unplayable(initial_standings_arg, fixtures_arg):
+        yield _estimate("monte_carlo", team_keys, counts, num_simulations, num_simulations, lambda c: (0.0, 0.0))
+        return
+    rng = np.random.default_rng(seed)
+    base_points, base_wins = base_tables(initial_standings_arg, team_keys)
+    team_a, team_b = fixture_team_indices(team_keys, fixtures_arg)
+    done = 0
+    while done < num_simulations:
+        size = min(batch_size, num_simulations - done)
+        outcomes = rng.integers(0, 2, size=(size, len(fixtures_arg)), dtype=np.uint8)
+        counts += _qualifying_counts(outcomes, base_points, base_wins, team_a, team_b)
+        done += size
+
+        def interval(c, n=done):
+            p = c / n
+            half_width = Z_95 * np.sqrt(p * (1 - p) / n)
+            return (max(0.0, p - half_width) * 100, min(1.0, p + half_width) * 100)
+
+        yield _estimate("monte_carlo", team_keys, counts, done, num_simulations, interval)
+
+
+class BackgroundRun:
+    """Consumes an estimate iterator on a daemon thread; poll snapshot(), stop with cancel()."""
+
+    def __init__(self, estimates, key=None):
+        self.key = key
+        self._estimates = estimates
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._state = {"status": "running", "estimate": None, "error": None, "elapsed": 0.0}
+        self._thread = threading.Thread(target=self._run, name="background-analysis", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        status, error = "done", None
+        try:
+            estimate = None
+            for estimate in self._estimates:
+                with self._lock:
+                    self._state["estimate"] = estimate
+                    self._state["elapsed"] = time.time() - self._started
+                if self._cancel.is_set():
+                    status = "cancelled"
+                    break
+            else:
+                # The iterator stopped before covering everything: its time budget ran out.
+                if estimate is not None and estimate.get("done", 0) < estimate.get("total", 0):
+                    status = "timed_out"
+        except Exception as e:
+            status, error = "failed", str(e)
+        finally:
+            self._estimates.close()
+            with self._lock:
+                self._state.update(status=status, error=error, elapsed=time.time() - self._started)
+
+    def cancel(self):
+        self._cancel.set()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self.snapshot()["status"] == "running"
+
+    def snapshot(self):
+        """
+        Status ("running", "done", "timed_out", "cancelled" or "failed"), latest
+        estimate, error and elapsed seconds. "timed_out" means the estimates
+        stopped early (a time budget) and the last one is partial.
+        """
+        with self._lock:
+            return dict(self._state)
@@ -0,0 +1,290 @@
+"""
+Backtest the qualification engines against completed seasons.
+
+Each season is a local JSON file with its matches in date order:
+
+    {
+        "season": "2024",
+        "matches": [{"team1": "Chennai", "team2": "Bangalore", "winner": "Chennai"}, ...],
+        "qualifiers": {"4": [...], "2": [...]}   # optional, see actual_qualifiers
+    }
+
+A match with "winner": null is a no result (one point each). For every
+checkpoint (every `step` matches) the standings and remaining fixtures are
+rebuilt from the results so far and analysed with the chosen engine; the
+predicted Top 4 / Top 2 probabilities, with points ties settled by the chosen
+tie policy (neutral by default, as the app's headline bars), are then scored
+against who actually qualified with the Brier score and log loss. Checkpoints run in parallel
+across processes and every analysis is cached on disk under its input hash,
+so re-runs only compute configurations that have not been seen before.
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from math import log
+
+from ipl_analysis_app import (
+    EXHAUSTIVE_LIMIT,
+    run_exhaustive_analysis_once,
+    simulate_season_mc,
+)
+from split_enumeration import SPLIT_ENUMERATION_LIMIT, run_split_enumeration_analysis
+from scenario_aggregates import QUALIFICATION_TARGETS, TIEBREAK_POLICIES
+from scenario_space import compute_input_hash
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKTEST_CACHE_DIR = os.path.join(BASE_DIR, "backtest_cache")
+BACKTEST_RESULTS_FILE = os.path.join(BASE_DIR, "backtest_results.json")
+ENGINES = ("auto", "exhaustive", "split_enumeration", "monte_carlo")
+DEFAULT_STEP = 7  # Matches between checkpoints
+DEFAULT_MC_SIMULATIONS = 20000
+DEFAULT_TIE_POLICY = "neutral"  # Real ties are split by net run rate, which past seasons do not record
+LOG_LOSS_EPSILON = 1e-6  # Probabilities are clipped to [eps, 1 - eps] for log loss
+
+
+# --- Seasons ---
+def load_season(path):
+    """Reads a season file; the season name defaults to the file name."""
+    with open(path, "r") as f:
+        season = json.load(f)
+    season.setdefault("season", os.path.splitext(os.path.basename(path))[0])
+    return season
+
+
+def season_teams(season):
+    """Teams in first-appearance order."""
+    teams = {}
+    for match in season["matches"]:
+        teams.setdefault(match["team1"], None)
+        teams.setdefault(match["team2"], None)
+    return list(teams)
+
+
+def standings_at(season, played):
+    """(standings, remaining fixtures) after the first `played` matches."""
+    standings = {team: {"Matches": 0, "Wins": 0, "Points": 0} for team in season_teams(season)}
+    for match in season["matches"][:played]:
+        for team in (match["team1"], match["team2"]):
+            standings[team]["Matches"] += 1
+            if match.get("winner") is None:
+                standings[team]["Points"] += 1
+        winner = match.get("winner")
+        if winner is not None:
+            standings[winner]["Wins"] += 1
+            standings[winner]["Points"] += 2
+    fixtures = [(m["team1"], m["team2"]) for m in season["matches"][played:]]
+    return standings, fixtures
+
+
+def actual_qualifiers(season):
+    """
+    {n: set of teams that finished in the top n}. Taken from the season file's
+    "qualifiers" when given (real tables are split by net run rate), else from
+    the final table ordered by points then wins.
+    """
+    if "qualifiers" in season:
+        return {n: set(season["qualifiers"][str(n)]) for n in QUALIFICATION_TARGETS}
+    standings, _ = standings_at(season, len(season["matches"]))
+    table = sorted(standings, key=lambda t: (-standings[t]["Points"], -standings[t]["Wins"]))
+    return {n: set(table[:n]) for n in QUALIFICATION_TARGETS}
+
+
+# --- Scoring ---
+def brier_score(predictions):
+    """Mean squared error of (probability, outcome) pairs, probability in [0, 1]."""
+    return sum((p - y) ** 2 for p, y in predictions) / len(predictions)
+
+
+def log_loss(predictions):
+    """Mean negative log-likelihood of (probability, outcome) pairs."""
+    total = 0.0
+    for p, y in predictions:
+        p = min(max(p, LOG_LOSS_EPSILON), 1 - LOG_LOSS_EPSILON)
+        total -= log(p) if y else log(1 - p)
+    return total / len(predictions)
+
+
+def score(checkpoints, qualifiers):
+    """Brier score and log loss per target over checkpoint predictions."""
+    scores = {}
+    for n in QUALIFICATION_TARGETS:
+        predictions = [
+            (probs[f"Top {n} Probability"] / 100, team in qualifiers[checkpoint["season"]][n])
+            for checkpoint in checkpoints
+            for team, probs in checkpoint["probabilities"].items()
+        ]
+        if predictions:
+            scores[n] = {
+                "brier_score": brier_score(predictions),
+                "log_loss": log_loss(predictions),
+                "predictions": len(predictions),
+            }
+    return scores
+
+
+# --- Analyses ---
+def choose_engine(engine, num_fixtures):
+    """Engine to run for a checkpoint, or None if the requested one cannot."""
+    if engine == "auto":
+        if num_fixtures <= EXHAUSTIVE_LIMIT:
+            return "exhaustive"
+        if num_fixtures <= SPLIT_ENUMERATION_LIMIT:
+            return "split_enumeration"
+        return "monte_carlo"
+    limits = {"exhaustive": EXHAUSTIVE_LIMIT, "split_enumeration": SPLIT_ENUMERATION_LIMIT}
+    if num_fixtures > limits.get(engine, num_fixtures):
+        return None
+    return engine
+
+
+def run_analysis(task):
+    """Runs one checkpoint analysis (in a worker process); returns the probabilities under its tie policy."""
+    standings, fixtures = task["standings"], task["fixtures"]
+    if task["engine"] == "monte_carlo":
+        random.seed(task["key"])
+        return simulate_season_mc(
+            standings, fixtures, num_simulations=task["num_simulations"], tie_policy=task["tie_policy"]
+        )
+    if task["engine"] == "split_enumeration":
+        results = run_split_enumeration_analysis(standings, fixtures)
+    else:
+        results = run_exhaustive_analysis_once(standings, fixtures, progress=False)
+    return results["tiebreak_range"][task["tie_policy"]]
+
+
+def cache_path(cache_dir, key):
+    """Cached overall probabilities of the analysis with this input hash."""
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def run_backtest(
+    seasons,
+    engine="auto",
+    step=DEFAULT_STEP,
+    num_simulations=DEFAULT_MC_SIMULATIONS,
+    workers=None,
+    cache_dir=BACKTEST_CACHE_DIR,
+    tie_policy=DEFAULT_TIE_POLICY,
+):
+    """
+    Analyses every checkpoint of every season (cached analyses are reused) and
+    scores the predictions under tie_policy, one of TIEBREAK_POLICIES. Returns a
+    JSON-serialisable dict with the per checkpoint probabilities, scores overall
+    and per season, the tie policy and run counts.
+    """
+    if tie_policy not in TIEBREAK_POLICIES:
+        raise ValueError(f"Unknown tie policy {tie_policy!r}; expected one of {TIEBREAK_POLICIES}.")
+    os.makedirs(cache_dir, exist_ok=True)
+    checkpoints = []
+    pending = []
+    for season in seasons:
+        for played in range(0, len(season["matches"]), step):
+            standings, fixtures = standings_at(season, played)
+            chosen = choose_engine(engine, len(fixtures))
+            if chosen is None:
+                print(
+                    f"Skipping {season['season']} after {played} matches: "
+                    f"{len(fixtures)} fixtures is too many for the {engine} engine."
+                )
+                continue
+            config = {"engine": chosen, "tie_policy": tie_policy}
+            if chosen == "monte_carlo":
+                config["num_simulations"] = num_simulations
+            checkpoint = {
+                "season": season["season"],
+                "matches_played": played,
+                "engine": chosen,
+                "key": compute_input_hash(standings, fixtures, **config),
+            }
+            checkpoints.append(checkpoint)
+            path = cache_path(cache_dir, checkpoint["key"])
+            if os.path.exists(path):
+                with open(path, "r") as f:
+                    checkpoint["probabilities"] = json.load(f)
+            else:
+                pending.append(
+                    dict(config, key=checkpoint["key"], standings=standings, fixtures=fixtures)
+                )
+
+    # Identical inputs (e.g. two season files sharing a prefix) are analysed once.
+    pending = list({task["key"]: task for task in pending}.values())
+    print(f"{len(checkpoints)} checkpoints, {len(checkpoints) - len(pending)} cached, {len(pending)} to analyse.")
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for task, probabilities in zip(pending, executor.map(run_analysis, pending)):
+                with open(cache_path(cache_dir, task["key"]), "w") as f:
+                    json.dump(probabilities, f)
+    for checkpoint in checkpoints:
+        if "probabilities" not in checkpoint:
+            with open(cache_path(cache_dir, checkpoint["key"]), "r") as f:
+                checkpoint["probabilities"] = json.load(f)
+
+    qualifiers = {season["season"]: actual_qualifiers(season) for season in seasons}
+    return {
+        "engine": engine,
+        "tie_policy": tie_policy,
+        "step": step,
+        "analysed": len(pending),
+        "cached": len(checkpoints) - len(pending),
+        "scores": score(checkpoints, qualifiers),
+        "season_scores": {
+            season["season"]: score(
+                [c for c in checkpoints if c["season"] == season["season"]], qualifiers
+            )
+            for season in seasons
+        },
+        "checkpoints": checkpoints,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest qualification probabilities on past seasons.")
+    parser.add_argument("seasons", nargs="+", help="Season JSON files or directories containing them.")
+    parser.add_argument("--engine", choices=ENGINES, default="auto", help="Engine to evaluate (default: %(default)s).")
+    parser.add_argument(
+        "--tie-policy",
+        choices=TIEBREAK_POLICIES,
+        default=DEFAULT_TIE_POLICY,
+        help="How points ties are settled in the scored probabilities (default: %(default)s).",
+    )
+    parser.add_argument("--step", type=int, default=DEFAULT_STEP, help="Matches between checkpoints (default: %(default)s).")
+    parser.add_argument(
+        "--simulations",
+        type=int,
+        default=DEFAULT_MC_SIMULATIONS,
+        help="Monte Carlo runs per checkpoint (default: %(default)s).",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--cache-dir", default=BACKTEST_CACHE_DIR, help="Analysis cache directory.")
+    parser.add_argument("--output", default=BACKTEST_RESULTS_FILE, help="Where to write the results JSON.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    paths = []
+    for entry in args.seasons:
+        paths.extend(sorted(glob.glob(os.path.join(entry, "*.json"))) if os.path.isdir(entry) else [entry])
+    start_time = time.time()
+    results = run_backtest(
+        [load_season(path) for path in paths],
+        engine=args.engine,
+        step=args.step,
+        num_simulations=args.simulations,
+        workers=args.workers,
+        cache_dir=args.cache_dir,
+        tie_policy=args.tie_policy,
+    )
+    print(f"Scores with points ties settled by the {results['tie_policy']} tie policy:")
+    for n, scores in results["scores"].items():
+        print(
+            f"Top {n}: Brier {scores['brier_score']:.4f}, log loss {scores['log_loss']:.4f} "
+            f"over {scores['predictions']} predictions."
+        )
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=4)
+    print(f"Backtest finished in {time.time() - start_time:.2f} seconds; results saved to {args.output}.")
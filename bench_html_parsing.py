@@ -0,0 +1,76 @@
+"""
+Benchmark of the scraper's HTML parsing on the saved pages in html_samples/.
+
+Compares building the whole DOM with html.parser (the old approach) against
+parsing only the standings table / match containers with a SoupStrainer, with
+html.parser and, when installed, lxml:
+
+    python bench_html_parsing.py [--repeat N]
+"""
+import argparse
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+import generate_ipl_data
+from generate_ipl_data import (
+    MATCH_CONTAINER_CLASS,
+    STANDINGS_TABLE_CLASS,
+    parse_only,
+)
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "html_samples")
+PAGES = (
+    ("points_table.html", "table", STANDINGS_TABLE_CLASS),
+    ("fixtures.html", "div", MATCH_CONTAINER_CLASS),
+)
+
+
+def best_of(repeat, fn):
+    """Fastest of `repeat` timed calls, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def full_parse(html, tag, class_pattern):
+    return BeautifulSoup(html, "html.parser").find_all(tag, class_=class_pattern)
+
+
+def strained_parse(parser):
+    def parse(html, tag, class_pattern):
+        generate_ipl_data.HTML_PARSER = parser
+        return parse_only(html, tag, class_pattern).find_all(tag, class_=class_pattern)
+    return parse
+
+
+def main(repeat):
+    variants = [("full DOM, html.parser", full_parse), ("strained, html.parser", strained_parse("html.parser"))]
+    try:
+        import lxml  # noqa: F401
+        variants.append(("strained, lxml", strained_parse("lxml")))
+    except ImportError:
+        print("lxml is not installed; skipping the lxml variant.")
+    default_parser = generate_ipl_data.HTML_PARSER
+
+    for filename, tag, class_pattern in PAGES:
+        with open(os.path.join(SAMPLES_DIR, filename), "r", encoding="utf-8") as f:
+            html = f.read()
+        print(f"{filename} ({len(html) / 1024:.0f} KB)")
+        baseline = None
+        for name, parse in variants:
+            found = len(parse(html, tag, class_pattern))
+            elapsed = best_of(repeat, lambda: parse(html, tag, class_pattern))
+            baseline = baseline or elapsed
+            print(f"  {name:<24} {elapsed:8.1f} ms  {baseline / elapsed:5.1f}x  ({found} elements)")
+    generate_ipl_data.HTML_PARSER = default_parser
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark scraper HTML parsing on saved pages.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per variant (default: %(default)s).")
+    main(parser.parse_args().repeat)
@@ -0,0 +1,56 @@
+"""
+Atomic on-disk checkpoints for long-running engines.
+
+A checkpoint is a single .npz file holding the engine's running tallies as
+numpy arrays plus a JSON metadata record that includes the input hash (see
+``scenario_space.compute_input_hash``). It is written to a temporary file,
+fsynced and moved into place with ``os.replace``, so a run killed mid-write
+leaves either the previous checkpoint or the new one, never a torn file.
+"""
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+EXHAUSTIVE_CHECKPOINT_FILE = os.path.join(BASE_DIR, "exhaustive_checkpoint.npz")
+CHECKPOINT_INTERVAL_SECONDS = 60
+
+_METADATA_KEY = "__metadata__"
+
+
+def save_checkpoint(path, metadata, arrays):
+    """Atomically writes {name: array} plus a JSON-serialisable metadata dict to path."""
+    metadata = dict(metadata, saved_at=datetime.utcnow().isoformat() + "Z")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **{_METADATA_KEY: np.array(json.dumps(metadata))}, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path, input_hash):
+    """
+    Returns (metadata, arrays) if path holds a readable checkpoint written for
+    input_hash, else None.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            metadata = json.loads(str(data[_METADATA_KEY]))
+            arrays = {name: data[name] for name in data.files if name != _METADATA_KEY}
+    except (OSError, ValueError, KeyError, json.JSONDecodeError):
+        return None
+    if metadata.get("input_hash") != input_hash:
+        return None
+    return metadata, arrays
+
+
+def remove_checkpoint(path):
+    """Deletes a checkpoint once the run it belongs to has finished."""
+    for stale in (path, path + ".tmp"):
+        if os.path.exists(stale):
+            os.remove(stale)
@@ -0,0 +1,107 @@
+"""
+Shared worker pool that coalesces identical computations.
+
+The Streamlit app keeps one ``CoalescingPool`` per server process (via
+``st.cache_resource``), so every session submits to the same pool. Work is
+keyed by the input hash of what it computes: a key that is already running
+returns the in-flight future instead of starting another run, and a finished
+result is kept (for the most recent ``max_results`` keys) so later sessions
+get it without recomputing. Failed runs are not kept. Work can report how far
+it has got through ``reporter(key)``, which pages read back with ``progress()``.
+
+Long-lived background runs (anything with a ``cancel()`` method, such as
+``background_runs.BackgroundRun``) are shared the same way with ``run()``: one
+per key for every session, until ``drop_run()`` or ``cancel_runs()``.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_RESULTS = 8
+
+
+class CoalescingPool:
+    """Executor wrapper running at most one computation per key at a time."""
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, max_results=DEFAULT_MAX_RESULTS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+        self.max_results = max_results
+        self.results = OrderedDict()
+        self.in_flight = {}
+        self.runs = OrderedDict()
+        self._progress = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, *args, **kwargs):
+        """Future for fn(*args, **kwargs) under key, shared with any identical request."""
+        with self._lock:
+            if key in self.results:
+                self.results.move_to_end(key)
+                future = Future()
+                future.set_result(self.results[key])
+                return future
+            if key in self.in_flight:
+                return self.in_flight[key]
+            future = self.executor.submit(fn, *args, **kwargs)
+            self.in_flight[key] = future
+        future.add_done_callback(lambda done: self._finish(key, done))
+        return future
+
+    def reporter(self, key):
+        """A progress(done, total) callback recording how far the work under key has got."""
+
+        def report(done, total):
+            with self._lock:
+                self._progress[key] = (done, total)
+
+        return report
+
+    def progress(self, key):
+        """(done, total) last reported for the in-flight work under key, or None."""
+        with self._lock:
+            return self._progress.get(key)
+
+    def _finish(self, key, future):
+        with self._lock:
+            self.in_flight.pop(key, None)
+            self._progress.pop(key, None)
+            if future.cancelled() or future.exception() is not None:
+                return
+            self.results[key] = future.result()
+            if len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+
+    def get(self, key):
+        """The cached result for key, or None."""
+        with self._lock:
+            return self.results.get(key)
+
+    def run(self, key, start):
+        """The background run shared under key, started with start() on first use."""
+        with self._lock:
+            if key not in self.runs:
+                self.runs[key] = start()
+            self.runs.move_to_end(key)
+            evicted = []
+            while len(self.runs) > self.max_results:
+                evicted.append(self.runs.popitem(last=False)[1])
+            run = self.runs[key]
+        for old in evicted:
+            old.cancel()
+        return run
+
+    def drop_run(self, key):
+        """Forgets the run under key so the next run() starts a fresh one."""
+        with self._lock:
+            run = self.runs.pop(key, None)
+        if run is not None:
+            run.cancel()
+
+    def cancel_runs(self):
+        """Cancels and forgets every background run (e.g. once full results are available)."""
+        with self._lock:
+            runs = list(self.runs.values())
+            self.runs.clear()
+        for run in runs:
+            run.cancel()
@@ -0,0 +1,302 @@
+"""
+Cost-model planner choosing how to analyse the current table.
+
+Every engine's running time is modelled as (work units for these inputs) x
+(seconds per unit), where the per-unit cost is measured by a short local
+micro-benchmark on a truncated copy of the same standings and fixtures. The
+planner sizes a Monte Carlo run to the requested precision, then picks the
+cheapest engine that fits the time and memory budgets; an exact engine is
+preferred over a cheaper one only when exact results are required. The returned plan is a JSON-serialisable dict so it can be stored
+in the analysis metadata.
+"""
+import time
+from math import prod
+
+from ipl_analysis_app import (
+    EXHAUSTIVE_LIMIT,
+    analyze_team_mc,
+    run_exhaustive_analysis_once,
+    simulate_season_mc,
+)
+from split_enumeration import (
+    JOIN_CHUNK_ROWS,
+    SPLIT_ENUMERATION_LIMIT,
+    enumerate_half,
+    run_split_enumeration_analysis,
+    split_fixtures,
+)
+from probability_trajectory import compute_trajectories
+from scenario_aggregates import DEFAULT_BUFFER_SIZE, QUALIFICATION_TARGETS
+from scenario_space import DEFAULT_CHUNK_SIZE, group_fixtures
+from scenario_symmetry import FixtureSymmetry
+
+DEFAULT_TIME_BUDGET = 3600  # Seconds
+DEFAULT_MEMORY_BUDGET_MB = 2048
+DEFAULT_MC_PRECISION = 0.05  # Max standard error of a probability, in percentage points
+MIN_MC_SAMPLES = 10000
+
+CALIBRATION_STATES = 1024  # Exhaustive states in the benchmark prefix
+CALIBRATION_FIXTURES = 12  # Fixtures in the split enumeration and trajectory benchmark prefixes
+CALIBRATION_SAMPLES = 2000  # Monte Carlo runs in the benchmark
+
+ENGINES = ("exhaustive", "split_enumeration", "monte_carlo")
+
+
+def exhaustive_states(initial_standings_arg, fixtures_arg):
+    """States walked by run_exhaustive_analysis_once: pair win counts, one per symmetry orbit."""
+    groups = group_fixtures(fixtures_arg)
+    states = prod(len(indices) + 1 for _, indices in groups)
+    symmetry = FixtureSymmetry.detect(initial_standings_arg, groups)
+    return states / (len(symmetry) if symmetry else 1)
+
+
+def joined_tables(initial_standings_arg, fixtures_arg):
+    """Tables evaluated by run_split_enumeration_analysis (distinct left x distinct right vectors)."""
+    team_keys = list(initial_standings_arg.keys())
+    halves = split_fixtures(team_keys, fixtures_arg)
+    sizes = [
+        len(enumerate_half(team_keys, [fixtures_arg[j] for j in half]).counts)
+        for half in halves
+    ]
+    return sizes[0] * sizes[1]
+
+
+def mc_samples_for_precision(precision):
+    """Runs needed so no probability has a standard error above `precision` points."""
+    return max(MIN_MC_SAMPLES, int((50 / precision) ** 2))
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def _prefix(fixtures_arg, fits):
+    """Longest fixture prefix for which fits(prefix) holds (at least one fixture)."""
+    length = 1
+    while length < len(fixtures_arg) and fits(fixtures_arg[: length + 1]):
+        length += 1
+    return fixtures_arg[:length]
+
+
+def calibrate(initial_standings_arg, fixtures_arg):
+    """
+    Seconds per work unit of each engine, measured on truncated copies of the
+    inputs so the per-unit cost reflects this machine and this number of teams.
+    """
+    calibration = {}
+    if not fixtures_arg:
+        return calibration
+
+    prefix = _prefix(
+        fixtures_arg,
+        lambda f: exhaustive_states(initial_standings_arg, f) <= CALIBRATION_STATES,
+    )
+    calibration["exhaustive"] = _timed(
+        run_exhaustive_analysis_once, initial_standings_arg, prefix, progress=False
+    ) / exhaustive_states(initial_standings_arg, prefix)
+
+    prefix = fixtures_arg[:CALIBRATION_FIXTURES]
+    calibration["split_enumeration"] = _timed(
+        run_split_enumeration_analysis, initial_standings_arg, prefix
+    ) / joined_tables(initial_standings_arg, prefix)
+    calibration["trajectory"] = _timed(
+        compute_trajectories, initial_standings_arg, prefix
+    ) / 2 ** len(prefix)
+
+    season = _timed(
+        simulate_season_mc,
+        initial_standings_arg,
+        fixtures_arg,
+        num_simulations=CALIBRATION_SAMPLES,
+        details={},
+    )
+    team = _timed(
+        analyze_team_mc,
+        next(iter(initial_standings_arg)),
+        4,
+        initial_standings_arg,
+        fixtures_arg,
+        num_simulations=CALIBRATION_SAMPLES,
+    )
+    # One season pass plus a Top 4 and a Top 2 pass per team, as in precompute_analysis.
+    passes = 2 * len(initial_standings_arg)
+    calibration["monte_carlo"] = (season + passes * team) / CALIBRATION_SAMPLES
+    return calibration
+
+
+def estimate_costs(initial_standings_arg, fixtures_arg, calibration, mc_samples):
+    """Estimated seconds and peak working memory (MB) per engine, or infeasibility reasons."""
+    num_teams = len(initial_standings_arg)
+    num_fixtures = len(fixtures_arg)
+    # Lineup counts (dense over 2^teams) plus buffered aggregate rows, shared by all.
+    base_mb = ((1 << num_teams) * 8 + DEFAULT_BUFFER_SIZE * num_teams * 8 * 12) / 2**20
+    candidates = []
+
+    candidate = {"engine": "exhaustive", "exact": True}
+    if num_fixtures > EXHAUSTIVE_LIMIT:
+        candidate["infeasible"] = f"more than {EXHAUSTIVE_LIMIT} fixtures"
+    else:
+        units = exhaustive_states(initial_standings_arg, fixtures_arg)
+        candidate.update(
+            units=units,
+            seconds=units * calibration["exhaustive"],
+            memory_mb=base_mb + DEFAULT_BUFFER_SIZE * (2 * num_teams + num_fixtures) * 8 / 2**20,
+        )
+    candidates.append(candidate)
+
+    candidate = {"engine": "split_enumeration", "exact": True}
+    if num_fixtures > SPLIT_ENUMERATION_LIMIT:
+        candidate["infeasible"] = f"more than {SPLIT_ENUMERATION_LIMIT} fixtures"
+    else:
+        units = joined_tables(initial_standings_arg, fixtures_arg)
+        half_outcomes = 2 ** ((num_fixtures + 1) // 2)
+        candidate.update(
+            units=units,
+            seconds=units * calibration["split_enumeration"],
+            # Join blocks (~a dozen teams-wide arrays) and one fully decoded half.
+            memory_mb=base_mb
+            + (JOIN_CHUNK_ROWS * num_teams * 8 * 12 + half_outcomes * (num_fixtures + 4 * num_teams)) / 2**20,
+        )
+    candidates.append(candidate)
+
+    candidates.append(
+        {
+            "engine": "monte_carlo",
+            "exact": False,
+            "units": mc_samples,
+            "seconds": mc_samples * calibration["monte_carlo"],
+            "memory_mb": base_mb,
+        }
+    )
+    return candidates
+
+
+def estimate_trajectory(initial_standings_arg, fixtures_arg, calibration):
+    """Estimated seconds and peak working memory (MB) of compute_trajectories, or its infeasibility reason."""
+    num_teams = len(initial_standings_arg)
+    num_fixtures = len(fixtures_arg)
+    estimate = {}
+    if num_fixtures > EXHAUSTIVE_LIMIT:
+        estimate["infeasible"] = f"more than {EXHAUSTIVE_LIMIT} fixtures"
+        return estimate
+    # A full pass over all 2^n scenarios, without grouping or symmetry.
+    chunk_bits = min(num_fixtures, DEFAULT_CHUNK_SIZE.bit_length() - 1)
+    chunk_rows = 1 << chunk_bits
+    targets = len(QUALIFICATION_TARGETS)
+    estimate.update(
+        units=2**num_fixtures,
+        seconds=2**num_fixtures * calibration.get("trajectory", 0.0),
+        # Decoded chunk tables, per-level histograms and per-chunk totals.
+        memory_mb=(
+            chunk_rows * (num_fixtures + 4 * num_teams) * 8
+            + targets * num_teams * 2 * (chunk_rows + 1) * 8
+            + targets * (2**num_fixtures // chunk_rows) * num_teams * 8
+        )
+        / 2**20,
+    )
+    return estimate
+
+
+def plan_trajectory(initial_standings_arg, fixtures_arg, plan, engine_seconds):
+    """
+    Whether the probability trajectory fits in what the chosen engine leaves of
+    the time budget and in the memory budget. Returns its estimate with "run"
+    and "reason" added.
+    """
+    trajectory = estimate_trajectory(initial_standings_arg, fixtures_arg, plan["calibration"])
+    if "infeasible" in trajectory:
+        trajectory.update(run=False, reason=trajectory["infeasible"])
+    elif trajectory["memory_mb"] > plan["memory_budget_mb"]:
+        trajectory.update(run=False, reason=f"needs {trajectory['memory_mb']:.0f} MB, over the memory budget")
+    elif engine_seconds + trajectory["seconds"] > plan["time_budget_seconds"]:
+        trajectory.update(
+            run=False,
+            reason=f"{trajectory['seconds']:.0f}s estimated, over what the analysis leaves of the time budget",
+        )
+    else:
+        trajectory.update(run=True, reason=f"{trajectory['seconds']:.0f}s estimated, within budget")
+    return trajectory
+
+
+def plan_engine(
+    initial_standings_arg,
+    fixtures_arg,
+    time_budget=DEFAULT_TIME_BUDGET,
+    memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB,
+    precision=DEFAULT_MC_PRECISION,
+    require_exact=False,
+    calibration=None,
+):
+    """
+    Chooses an engine for these inputs. Returns a dict with the chosen "engine",
+    its "num_simulations" (Monte Carlo only), the "reason", the budgets, every
+    candidate's estimate and whether the probability "trajectory" should run.
+    """
+    calibration = calibration or calibrate(initial_standings_arg, fixtures_arg)
+    mc_samples = mc_samples_for_precision(precision)
+    plan = {
+        "time_budget_seconds": time_budget,
+        "memory_budget_mb": memory_budget_mb,
+        "precision": precision,
+        "require_exact": require_exact,
+        "calibration": calibration,
+    }
+    if not fixtures_arg:
+        plan.update(engine="exhaustive", reason="no fixtures remaining", candidates=[])
+        plan["trajectory"] = plan_trajectory(initial_standings_arg, fixtures_arg, plan, 0)
+        return plan
+
+    candidates = estimate_costs(initial_standings_arg, fixtures_arg, calibration, mc_samples)
+    plan["candidates"] = candidates
+    # Monte Carlo: as many runs as the precision asks for, capped by the budget.
+    monte_carlo = candidates[-1]
+    affordable = int(time_budget / calibration["monte_carlo"])
+    samples = max(MIN_MC_SAMPLES, min(mc_samples, affordable))
+    monte_carlo.update(units=samples, seconds=samples * calibration["monte_carlo"])
+    capped = f"; runs capped at {samples:,} by the time budget" if samples < mc_samples else ""
+
+    runnable = sorted(
+        (c for c in candidates if "infeasible" not in c and c["memory_mb"] <= memory_budget_mb),
+        key=lambda c: c["seconds"],
+    )
+    exact = [c for c in runnable if c["exact"]]
+    if require_exact and exact:
+        chosen = exact[0]
+        within = "within" if chosen["seconds"] <= time_budget else "over"
+        plan.update(
+            engine=chosen["engine"],
+            reason=f"fastest exact engine, exact analysis requested ({chosen['seconds']:.0f}s estimated, {within} budget)",
+        )
+        plan["trajectory"] = plan_trajectory(initial_standings_arg, fixtures_arg, plan, chosen["seconds"])
+        return plan
+
+    # Otherwise the cheapest engine that fits the time budget; Monte Carlo always does.
+    chosen = next(
+        (c for c in runnable if c["seconds"] <= time_budget or not c["exact"]),
+        monte_carlo,
+    )
+    if chosen["exact"]:
+        plan.update(
+            engine=chosen["engine"],
+            reason=f"cheapest engine, and exact ({chosen['seconds']:.0f}s estimated, within budget)",
+        )
+        plan["trajectory"] = plan_trajectory(initial_standings_arg, fixtures_arg, plan, chosen["seconds"])
+        return plan
+
+    plan.update(
+        engine="monte_carlo",
+        num_simulations=samples,
+        standard_error=50 / samples**0.5,
+        reason=(
+            "exact analysis requested but no exact engine can run these inputs"
+            if require_exact
+            else "cheapest engine within the budget"
+            if exact and exact[0]["seconds"] <= time_budget
+            else "no exact engine fits the budget"
+        )
+        + capped,
+    )
+    plan["trajectory"] = plan_trajectory(initial_standings_arg, fixtures_arg, plan, monte_carlo["seconds"])
+    return plan
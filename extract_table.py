@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
-import requests
 import json
 from datetime import datetime, timezone
 
+from http_fetch import Fetcher, unchanged
+from match_ledger import LEDGER_FILE, append_results, derive_files
+
 # ── Configuration ────
 API_KEY           = "63d25b78-f287-4cf5-a2f5-4c97396766d5"
 SERIES_ID         = "d5a498c8-7596-4b93-8ab0-e0efc3345312"
@@ -11,6 +13,9 @@ FIXTURES_URL      = f"https://api.cricapi.com/v1/series_info?apikey={API_KEY}&id
 OUTPUT_STANDINGS  = "current_standings.json"
 OUTPUT_FIXTURES   = "remaining_fixtures.json"
 
+# Words in a match name that mark a playoff, which does not count towards the table
+PLAYOFF_MARKERS   = ("qualifier", "eliminator", "final", "playoff")
+
 # Full → short team mapping
 TEAM_NAME_MAP = {
     "Royal Challengers Bengaluru": "Bangalore",
@@ -25,10 +30,7 @@ TEAM_NAME_MAP = {
     "Chennai Super Kings":          "Chennai",
 }
 
-def fetch_standings():
-    resp = requests.get(STANDINGS_URL)
-    resp.raise_for_status()
-    payload = resp.json()
+def parse_standings(payload):
     if payload.get("status") != "success":
         raise RuntimeError("Standings API error")
 
@@ -40,23 +42,23 @@ def fetch_standings():
         ties     = item.get("ties", 0)
         nr       = item.get("nr", 0)
         points   = wins * 2 + ties + nr
+        nrr      = item.get("nrr")
         if not team_raw:
             continue
         team = TEAM_NAME_MAP.get(team_raw, team_raw)
-        records.append({
+        record = {
             "Team":    team,
             "Matches": matches,
             "Wins":    wins,
             "Points":  points
-        })
+        }
+        if nrr is not None:
+            record["NRR"] = nrr
+        records.append(record)
 
     records.sort(key=lambda r: r["Points"], reverse=True)
     standings = {
-        rec["Team"]: {
-            "Matches": rec["Matches"],
-            "Wins":    rec["Wins"],
-            "Points":  rec["Points"],
-        }
+        rec["Team"]: {k: v for k, v in rec.items() if k != "Team"}
         for rec in records
     }
 
@@ -66,10 +68,13 @@ def fetch_standings():
         "standings":    standings
     }
 
-def fetch_fixtures():
-    resp = requests.get(FIXTURES_URL)
-    resp.raise_for_status()
-    payload = resp.json()
+def is_league_match(match):
+    """False for playoff matches (Qualifier, Eliminator, Final), judged by the match name."""
+    name = (match.get("name") or "").lower()
+    return not any(marker in name for marker in PLAYOFF_MARKERS)
+
+def parse_fixtures(payload):
+    """Upcoming matches as date-ordered {match_id, date, team1, team2} dicts."""
     match_list = payload.get("data", {}).get("matchList", [])
 
     now = datetime.now(timezone.utc)
@@ -78,6 +83,8 @@ def fetch_fixtures():
     for match in match_list:
         if match.get("status") != "Match not started" or not match.get("hasSquad", False):
             continue
+        if not is_league_match(match):
+            continue
 
         dt_str = match.get("dateTimeGMT")
         try:
@@ -94,27 +101,67 @@ def fetch_fixtures():
 
         t1 = TEAM_NAME_MAP.get(teams[0], teams[0])
         t2 = TEAM_NAME_MAP.get(teams[1], teams[1])
-        upcoming.append((dt, [t1, t2]))
+        upcoming.append((dt, {"match_id": match.get("id"), "date": dt_str, "team1": t1, "team2": t2}))
 
     upcoming.sort(key=lambda x: x[0])
-    fixtures = [pair for _, pair in upcoming]
-
-    return {
-        "last_updated": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "source":       "Series Info API",
-        "fixtures":     fixtures
-    }
+    return [fixture for _, fixture in upcoming]
+
+def parse_results(payload):
+    """
+    Completed league matches as date-ordered {match_id, date, team1, team2,
+    winner} dicts; playoffs are left out so they never reach the table. The winner is read from the status line ("<team> won by ..."); an
+    ended match without one (no result, abandoned) has winner None.
+    """
+    results = []
+    for match in payload.get("data", {}).get("matchList", []):
+        teams = match.get("teams", [])
+        if not match.get("matchEnded") or len(teams) != 2 or not is_league_match(match):
+            continue
+        status = match.get("status") or ""
+        winner = next((t for t in teams if status.startswith(f"{t} won")), None)
+        results.append({
+            "match_id": match.get("id"),
+            "date":     match.get("dateTimeGMT"),
+            "team1":    TEAM_NAME_MAP.get(teams[0], teams[0]),
+            "team2":    TEAM_NAME_MAP.get(teams[1], teams[1]),
+            "winner":   TEAM_NAME_MAP.get(winner, winner),
+        })
+    results.sort(key=lambda r: r["date"] or "")
+    return results
 
 def main():
-    standings_json = fetch_standings()
-    with open(OUTPUT_STANDINGS, "w", encoding="utf-8") as f:
-        json.dump(standings_json, f, indent=4)
+    fetcher = Fetcher()
+    results = fetcher.fetch_all([STANDINGS_URL, FIXTURES_URL])
+    for result in results.values():
+        if result.error:
+            raise result.error
+    if unchanged(results, [OUTPUT_STANDINGS, OUTPUT_FIXTURES], live_sources=("Match Ledger", "Series Points API")):
+        print("✔ Upstream unchanged; keeping existing standings and fixtures")
+        return
+
+    table = parse_standings(json.loads(results[STANDINGS_URL].text))["standings"]
+    series = json.loads(results[FIXTURES_URL].text)
+    recorded = append_results(parse_results(series), source="Series Info API")
+    print(f"✔ Recorded {len(recorded)} new results in {LEDGER_FILE}")
+
+    delta = derive_files(
+        parse_fixtures(series),
+        OUTPUT_STANDINGS,
+        OUTPUT_FIXTURES,
+        teams=table.keys(),
+        nrr={team: stats.get("NRR") for team, stats in table.items()},
+        source="Match Ledger (Series Info API)",
+        points_table=table,
+        points_table_source="Series Points API (ledger mismatch)",
+    )
+    for mismatch in delta["mismatches"]:
+        print(
+            f"⚠ Ledger gives {mismatch['team']} {mismatch['ledger_points']} points but the points table has "
+            f"{mismatch['table_points']}; publishing the points table"
+        )
     print(f"✔ Saved standings to {OUTPUT_STANDINGS}")
-
-    fixtures_json = fetch_fixtures()
-    with open(OUTPUT_FIXTURES, "w", encoding="utf-8") as f:
-        json.dump(fixtures_json, f, indent=4)
-    print(f"✔ Saved fixtures to {OUTPUT_FIXTURES}")
+    print(f"✔ Saved fixtures to {OUTPUT_FIXTURES} ({len(delta['resolved'])} resolved since the last refresh)")
+    fetcher.save()
 
 if __name__ == "__main__":
     main()
@@ -1,12 +1,13 @@
 # generate_ipl_data.py
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import json
 import re
 from datetime import datetime
 import os
 import traceback # Import traceback for detailed error printing
 
+from http_fetch import Fetcher, RequestException, unchanged
+
 # --- Configuration ---
 # Option 1: Scrape Live Data (Requires internet, fragile)
 SCRAPE_LIVE_DATA = True # Set to False to use hardcoded data below
@@ -24,6 +25,20 @@ STANDINGS_URL = f"https://www.espncricinfo.com/series/ipl-{CURRENT_SEASON_YEAR}-
 FIXTURES_URL = f"https://www.espncricinfo.com/series/ipl-{CURRENT_SEASON_YEAR}-{CURRENT_SEASON_ID}/match-schedule-fixtures-and-results"
 # --- End Important URLs ---
 
+# Parse with lxml's C parser when it is installed, else the pure-Python html.parser.
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# --- !!! SELECTOR CHECK NEEDED !!! ---
+# **IMPORTANT**: Inspect the pages' HTML and update these selectors if needed.
+STANDINGS_TABLE_CLASS = re.compile(r'ds-w-full.*ds-table.*standings')
+MATCH_CONTAINER_CLASS = re.compile(r'ds-p-4.*ds-border-b.*ds-border-line.*ds-relative')
+MATCH_CONTAINER_FALLBACK_CLASS = re.compile(r'ci-match-card') # Add other potential patterns if needed
+# --- End Selector Check ---
+
 HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'} # Mimic a browser
 
 # Option 2: Hardcoded Data (Use as fallback or for testing if scraping fails)
@@ -93,19 +108,20 @@ def get_internal_team_key(scraped_name):
              return None # Return None if no mapping found
     return key
 
-def fetch_standings_from_web():
-    """Scrapes and parses the IPL points table from the web."""
-    print(f"Attempting to fetch live standings from {STANDINGS_URL}...")
+def parse_only(html, tag, class_pattern):
+    """Builds a soup of just the `tag` elements whose class matches class_pattern
+    (with their subtrees), skipping the DOM for navigation, ads and scripts."""
+    return BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer(tag, class_=class_pattern))
+
+def fetch_standings_from_web(fetched):
+    """Parses the IPL points table from a FetchResult of STANDINGS_URL."""
     try:
-        response = requests.get(STANDINGS_URL, headers=HEADERS, timeout=20)
-        response.raise_for_status() # Raise an exception for bad status codes
-        soup = BeautifulSoup(response.text, 'html.parser')
+        if fetched.error:
+            raise fetched.error
+        soup = parse_only(fetched.text, 'table', STANDINGS_TABLE_CLASS)
 
         standings = {}
-        # --- !!! SELECTOR CHECK NEEDED !!! ---
-        # **IMPORTANT**: Inspect the standings page HTML and update this selector if needed.
-        table = soup.find('table', class_=re.compile(r'ds-w-full.*ds-table.*standings'))
-        # --- End Selector Check ---
+        table = soup.find('table', class_=STANDINGS_TABLE_CLASS)
 
         if not table:
             print(f"ERROR: Could not find the standings table using the specified selector pattern on {STANDINGS_URL}. Website structure might have changed.")
@@ -160,6 +176,12 @@ def fetch_standings_from_web():
                     continue
 
                 standings[team_key] = {'Matches': matches, 'Wins': wins, 'Points': points}
+                # NRR is optional: only used to break points ties, so a bad cell is not fatal.
+                if len(cols) > 7:
+                    try:
+                        standings[team_key]['NRR'] = float(cols[7].get_text(strip=True))
+                    except ValueError:
+                        print(f"Warning: Could not parse NRR for {scraped_name}; ties will be shared evenly.")
                 parsed_count += 1
             # else:
             #     print(f"Skipping row {i+1} with insufficient columns: {len(cols)}")
@@ -175,7 +197,7 @@ def fetch_standings_from_web():
         print(f"Successfully parsed standings for {parsed_count} teams from web.")
         return standings
 
-    except requests.exceptions.RequestException as e:
+    except RequestException as e:
         print(f"ERROR: Network error fetching standings from {STANDINGS_URL}: {e}")
         return None
     except Exception as e:
@@ -184,29 +206,24 @@ def fetch_standings_from_web():
         return None
 
 
-def fetch_fixtures_from_web():
-    """Scrapes and parses the remaining IPL fixtures from the web."""
-    print(f"Attempting to fetch live fixtures from {FIXTURES_URL}...")
+def fetch_fixtures_from_web(fetched):
+    """Parses the remaining IPL fixtures from a FetchResult of FIXTURES_URL."""
     try:
-        response = requests.get(FIXTURES_URL, headers=HEADERS, timeout=20)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
+        if fetched.error:
+            raise fetched.error
         remaining_fixtures = []
-        # --- !!! SELECTOR CHECK NEEDED !!! ---
-        # **IMPORTANT**: Inspect the fixtures page HTML and update this selector to find individual match containers.
-        # This is highly likely to need adjustment. Try inspecting a few match divs.
-        primary_selector = re.compile(r'ds-p-4.*ds-border-b.*ds-border-line.*ds-relative')
-        fallback_selector = re.compile(r'ci-match-card') # Add other potential patterns if needed
+        primary_selector = MATCH_CONTAINER_CLASS
+        fallback_selector = MATCH_CONTAINER_FALLBACK_CLASS
 
+        soup = parse_only(fetched.text, 'div', primary_selector)
         match_divs = soup.find_all('div', class_=primary_selector)
         if not match_divs:
              print(f"Primary match container selector ('{primary_selector.pattern}') failed. Trying fallback ('{fallback_selector.pattern}')...")
+             soup = parse_only(fetched.text, 'div', fallback_selector)
              match_divs = soup.find_all('div', class_=fallback_selector)
              if not match_divs:
                   print(f"ERROR: Could not find match containers using known selectors on {FIXTURES_URL}. Website structure might have changed.")
                   return None # Return None to indicate failure
-        # --- End Selector Check ---
 
 
         print(f"Found {len(match_divs)} potential match containers. Parsing for upcoming fixtures...")
@@ -277,7 +294,7 @@ def fetch_fixtures_from_web():
         # Even if no fixtures are found (e.g., end of season), return an empty list, not None
         return remaining_fixtures
 
-    except requests.exceptions.RequestException as e:
+    except RequestException as e:
         print(f"ERROR: Network error fetching fixtures from {FIXTURES_URL}: {e}")
         return None # Indicate failure to fetch
     except Exception as e:
@@ -324,8 +341,17 @@ if __name__ == "__main__":
              print(f"WARNING: Could not parse CURRENT_SEASON_YEAR ('{CURRENT_SEASON_YEAR}') as integer.")
 
 
-        live_standings = fetch_standings_from_web()
-        live_fixtures = fetch_fixtures_from_web()
+        print(f"Fetching live standings and fixtures from {STANDINGS_URL} and {FIXTURES_URL}...")
+        fetcher = Fetcher()
+        fetched = fetcher.fetch_all([STANDINGS_URL, FIXTURES_URL], headers=HEADERS)
+        # Only keep files that came from an earlier live scrape; fallback data is always replaced.
+        if unchanged(fetched, [OUTPUT_STANDINGS_FILE, OUTPUT_FIXTURES_FILE], live_sources=("Live Scrape",)):
+            print("\nUpstream pages unchanged since the last refresh; keeping existing data files.")
+            print(f"\n--- IPL Data Generation Finished: {datetime.now()} ---")
+            raise SystemExit(0)
+
+        live_standings = fetch_standings_from_web(fetched[STANDINGS_URL])
+        live_fixtures = fetch_fixtures_from_web(fetched[FIXTURES_URL])
 
         # Use live data only if BOTH were fetched successfully (returned data, not None)
         if live_standings is not None and live_fixtures is not None:
@@ -334,6 +360,8 @@ if __name__ == "__main__":
             final_fixtures = live_fixtures
             source = f"Live Scrape ({CURRENT_SEASON_YEAR})"
             fetch_successful = True # Mark fetch as successful
+            # Only remember validators for pages that parsed, so a failed scrape is retried in full.
+            fetcher.save()
         else:
             print("\nScraping live data FAILED or returned incomplete data.")
             if live_standings is None: print("Reason: Failed to fetch/parse standings (check errors above).")
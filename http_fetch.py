@@ -0,0 +1,148 @@
+"""
+Shared HTTP layer for the data scrapers.
+
+One pooled ``requests.Session`` fetches every resource of a refresh
+concurrently. Responses are cached on disk with their ETag / Last-Modified
+validators, so later refreshes send conditional requests and an unchanged
+resource comes back as a cheap 304 served from the cache. Transient failures
+(connection errors, timeouts, 429 and 5xx) are retried a bounded number of
+times with exponential backoff.
+"""
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FETCH_CACHE_FILE = os.path.join(BASE_DIR, "fetch_cache.json")
+DEFAULT_TIMEOUT = 20  # Seconds per attempt
+MAX_RETRIES = 3  # Extra attempts after the first
+BACKOFF_SECONDS = 0.5  # Delay before the first retry; doubled each time
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+POOL_SIZE = 4  # Connections kept per host
+
+FetchResult = namedtuple("FetchResult", ["url", "text", "status", "not_modified", "error"])
+FetchResult.__doc__ = """Outcome of one fetch.
+
+not_modified is True when the server answered 304 and text came from the cache;
+error holds the requests exception if every attempt failed (text is then None).
+"""
+
+
+class Fetcher:
+    """Pooled, caching, retrying HTTP client for a scraper run."""
+
+    def __init__(
+        self,
+        cache_path=FETCH_CACHE_FILE,
+        timeout=DEFAULT_TIMEOUT,
+        max_retries=MAX_RETRIES,
+        backoff=BACKOFF_SECONDS,
+    ):
+        self.cache_path = cache_path
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self.cache = {}
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    self.cache = json.load(f)
+            except (IOError, ValueError) as e:
+                print(f"WARNING: Ignoring unreadable fetch cache {cache_path}: {e}")
+
+    def fetch(self, url, headers=None):
+        """GETs url, conditionally if it is cached. Returns a FetchResult."""
+        headers = dict(headers or {})
+        with self._lock:
+            cached = self.cache.get(url)
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+                if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                    raise requests.exceptions.RetryError(f"HTTP {response.status_code} from {url}")
+                if response.status_code == 304:
+                    if cached:
+                        return FetchResult(url, cached["text"], 304, True, None)
+                    # Nothing cached to serve (e.g. the caller sent its own validators):
+                    # treat it as a miss and ask again without conditional headers.
+                    headers.pop("If-None-Match", None)
+                    headers.pop("If-Modified-Since", None)
+                    if attempt < self.max_retries:
+                        raise requests.exceptions.RetryError(f"HTTP 304 from {url} with nothing cached")
+                    return FetchResult(
+                        url, None, 304, False, requests.exceptions.RetryError(f"HTTP 304 from {url} with nothing cached")
+                    )
+                response.raise_for_status()
+                break
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.RetryError) as e:
+                if attempt == self.max_retries:
+                    return FetchResult(url, None, None, False, e)
+                time.sleep(self.backoff * 2**attempt)
+            except RequestException as e:
+                return FetchResult(url, None, getattr(e.response, "status_code", None), False, e)
+
+        with self._lock:
+            self.cache[url] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "fetched_at": datetime.now(timezone.utc).isoformat(),
+                "text": response.text,
+            }
+        return FetchResult(url, response.text, response.status_code, False, None)
+
+    def fetch_all(self, urls, headers=None):
+        """Fetches every url concurrently. Returns {url: FetchResult}."""
+        with ThreadPoolExecutor(max_workers=max(1, len(urls))) as executor:
+            results = executor.map(lambda url: self.fetch(url, headers=headers), urls)
+            return dict(zip(urls, results))
+
+    def save(self):
+        """Writes the validator cache atomically."""
+        if not self.cache_path:
+            return
+        tmp_path = self.cache_path + ".tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.cache, f)
+        os.replace(tmp_path, self.cache_path)
+
+
+def _source(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("source") or ""
+    except (IOError, ValueError, AttributeError):
+        return None
+
+
+def unchanged(results, outputs, live_sources=None):
+    """
+    True if every fetch was a 304 and all output files already exist. Given
+    live_sources, each output's "source" must also start with one of them, so
+    files written from fallback data are regenerated rather than kept.
+    """
+    if not all(r.not_modified for r in results.values()):
+        return False
+    if live_sources is None:
+        return all(os.path.exists(path) for path in outputs)
+    sources = [_source(path) for path in outputs]
+    return all(source is not None and source.startswith(tuple(live_sources)) for source in sources)
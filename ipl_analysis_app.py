@@ -1,5 +1,6 @@
 import streamlit as st
-from itertools import product
+from itertools import islice, product
+from math import comb, isclose, prod
 from pandas import DataFrame
 import random
 import json
@@ -7,8 +8,36 @@ import os
 from datetime import datetime
 import time  # Added for progress bar
 import altair as alt  # <<< ADD THIS IMPORT >>>
+import numpy as np
 import traceback  # Added for detailed error printing
 from collections import defaultdict  # Add this import
+from background_runs import BackgroundRun, iter_exhaustive_estimates, iter_mc_estimates
+from checkpoint import (
+    CHECKPOINT_INTERVAL_SECONDS,
+    load_checkpoint,
+    remove_checkpoint,
+    save_checkpoint,
+)
+from computation_pool import CoalescingPool
+from nrr_tiebreak import NRRTieResolver
+from scenario_aggregates import (
+    DEFAULT_BUFFER_SIZE,
+    ScenarioAggregates,
+    points_ties,
+    qualifying_share,
+)
+from scenario_index import ScenarioBitmapIndex
+from scenario_space import (
+    base_tables,
+    compute_input_hash,
+    decode_outcomes,
+    fixture_team_indices,
+    group_fixtures,
+    iter_index_chunks,
+    scenario_tables,
+)
+from scenario_symmetry import FixtureSymmetry
+from scenario_store import load_scenario_store
 
 # --- File Paths ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -22,6 +51,7 @@ FIXTURES_FILE = os.path.join(BASE_DIR, "remaining_fixtures.json")
 # --- Configuration ---
 EXHAUSTIVE_LIMIT = 23  # Max fixtures for exhaustive simulation
 NUM_SIMULATIONS_MC = 1000000  # Number of simulations for Monte Carlo
+BACKGROUND_POLL_SECONDS = 1.0  # Refresh interval of provisional estimates in the page
 MC_TOLERANCE = 0.02  # Tolerance for 'Result doesn't matter' in MC (e.g., 2% difference) # <<< ADD THIS
 # --- End Configuration ---
 
@@ -261,6 +291,15 @@ def load_data():
                 for k, v in stats.items():
                     if k not in validated_stats:
                         validated_stats[k] = v
+                # NRR is optional (tie-breaks only): drop it rather than the team if invalid.
+                if "NRR" in validated_stats:
+                    try:
+                        validated_stats["NRR"] = float(validated_stats["NRR"])
+                    except (ValueError, TypeError):
+                        load_errors.append(
+                            f"Warning: Invalid NRR for team '{team}'. Points ties will be shared evenly."
+                        )
+                        del validated_stats["NRR"]
 
                 validated_standings[team] = validated_stats  # Add validated data
 
@@ -395,11 +434,16 @@ def plot_standings(standings_data):
         lambda x: team_full_names.get(x, x)
     )  # Use full names
 
-    # Sort before adding position
-    df.sort_values(by="Points", ascending=False, inplace=True)
+    has_nrr = "NRR" in df.columns and not df["NRR"].isnull().all()
+
+    # Sort before adding position (NRR separates teams level on points, as in the real table)
+    sort_cols = ["Points", "NRR"] if has_nrr else ["Points"]
+    df.sort_values(by=sort_cols, ascending=False, inplace=True)
     df.insert(0, "Pos", range(1, len(df) + 1))
     # Define display columns
     display_cols = ["Pos", "Team Name", "Matches", "Wins", "Points"]  # Base columns
+    if has_nrr:
+        display_cols.append("NRR")
     if prob_cols_exist:
         # Conditionally add probability columns if they have non-NaN values
         if not df["Top 4 Probability"].isnull().all():
@@ -412,10 +456,13 @@ def plot_standings(standings_data):
 
 
 # --- Exhaustive Simulation Functions (Renamed) ---
-def simulate_season_exhaustive(initial_standings_arg, fixtures_arg):
+def simulate_season_exhaustive(initial_standings_arg, fixtures_arg, tie_policy="optimistic"):
     """
     Simulates the season exhaustively using provided data.
-    Returns a dictionary of probabilities for each team.
+    Returns a dictionary of probabilities for each team, with points ties
+    settled by tie_policy (see scenario_aggregates.qualifying_share).
+    Scenarios are decoded from index ranges chunk by chunk, so memory stays
+    bounded however many fixtures remain, and every team is scored in one pass.
     """
     # --- Performance Check ---
     # MAX_EXHAUSTIVE_FIXTURES is defined globally
@@ -436,70 +483,52 @@ def simulate_season_exhaustive(initial_standings_arg, fixtures_arg):
     if not total_matches_per_team:
         return None
 
-    scenarios = list(product([0, 1], repeat=len(fixtures_arg)))
+    team_keys = list(initial_standings_arg.keys())
     probabilities_dict = {
         team: {"Top 4 Probability": 0.0, "Top 2 Probability": 0.0}
         for team in initial_standings_arg
     }
+    # A fixture naming an unknown team can never be played out, so no scenario
+    # completes the season.
+    if any(
+        a not in initial_standings_arg or b not in initial_standings_arg
+        for a, b in fixtures_arg
+    ):
+        return probabilities_dict
+
+    num_fixtures = len(fixtures_arg)
+    total_possible_scenarios = 2**num_fixtures
+    base_points, base_wins = base_tables(initial_standings_arg, team_keys)
+    team_a, team_b = fixture_team_indices(team_keys, fixtures_arg)
+    # Scenarios in which each team makes the top n; a neutral tie-break counts
+    # a share of the scenarios where it is level on points at the cut.
+    top_4_counts = np.zeros(len(team_keys))
+    top_2_counts = np.zeros(len(team_keys))
 
     progress_bar = st.progress(0)
     status_text = st.empty()
-    total_teams = len(initial_standings_arg)
     start_time = time.time()
 
-    for i, team_priority in enumerate(initial_standings_arg):
-        top_4_counts = 0
-        top_2_counts = 0
-        total_valid_scenarios_for_team = 0
+    for lo, hi in iter_index_chunks(total_possible_scenarios):
+        outcomes = decode_outcomes(np.arange(lo, hi, dtype=np.int64), num_fixtures)
+        points, _ = scenario_tables(outcomes, base_points, base_wins, team_a, team_b)
+        greater, tied = points_ties(points)
+        top_4_counts += qualifying_share(greater, tied, 4, tie_policy).sum(axis=0)
+        top_2_counts += qualifying_share(greater, tied, 2, tie_policy).sum(axis=0)
 
-        # Update status for each team being processed
+        progress = hi / total_possible_scenarios
+        progress_bar.progress(progress)
         status_text.text(
-            f"Analyzing scenarios for {team_full_names.get(team_priority, team_priority)} ({i+1}/{total_teams})..."
+            f"Analyzing scenarios... {hi:,}/{total_possible_scenarios:,} ({progress:.1%})"
         )
 
-        for (
-            outcome
-        ) in scenarios:  # This is the inner loop, progress within this is hard
-            standings_scenario = {t: dict(s) for t, s in initial_standings_arg.items()}
-            for match_result, match in zip(outcome, fixtures_arg):
-                winner = match[0] if match_result == 1 else match[1]
-                loser = match[1] if winner == match[0] else match[0]
-                if winner in standings_scenario and loser in standings_scenario:
-                    standings_scenario[winner]["Wins"] += 1
-                    standings_scenario[winner]["Points"] += 2
-                    standings_scenario[winner]["Matches"] += 1
-                    standings_scenario[loser]["Matches"] += 1
-
-            if all(
-                standings_scenario[t]["Matches"] == total_matches_per_team[t]
-                for t in standings_scenario
-            ):
-                total_valid_scenarios_for_team += 1
-                sorted_teams = sorted(
-                    standings_scenario.items(),
-                    key=lambda x: (
-                        -x[1]["Points"],
-                        x[0] != team_priority,
-                        -x[1]["Wins"],
-                    ),
-                )
-                top_4_teams = sorted_teams[:4]
-                top_2_teams = sorted_teams[:2]
-                if team_priority in [t[0] for t in top_4_teams]:
-                    top_4_counts += 1
-                if team_priority in [t[0] for t in top_2_teams]:
-                    top_2_counts += 1
-
-        if total_valid_scenarios_for_team > 0:
-            probabilities_dict[team_priority]["Top 4 Probability"] = (
-                top_4_counts / total_valid_scenarios_for_team
-            ) * 100
-            probabilities_dict[team_priority]["Top 2 Probability"] = (
-                top_2_counts / total_valid_scenarios_for_team
-            ) * 100
-
-        # Update progress bar after each team is processed
-        progress_bar.progress((i + 1) / total_teams)
+    for t, team in enumerate(team_keys):
+        probabilities_dict[team]["Top 4 Probability"] = (
+            top_4_counts[t] / total_possible_scenarios
+        ) * 100
+        probabilities_dict[team]["Top 2 Probability"] = (
+            top_2_counts[t] / total_possible_scenarios
+        ) * 100
 
     end_time = time.time()
     status_text.text(
@@ -510,10 +539,14 @@ def simulate_season_exhaustive(initial_standings_arg, fixtures_arg):
     return probabilities_dict
 
 
-def analyze_team_exhaustive(team_name, top_n, initial_standings_arg, fixtures_arg):
+def analyze_team_exhaustive(
+    team_name, top_n, initial_standings_arg, fixtures_arg, tie_policy="optimistic"
+):
     """
     Analyzes prospects for one team using exhaustive simulation based on provided data.
     Returns percentage chance and DataFrame of required outcomes.
+    Scenarios are streamed in decoded chunks like simulate_season_exhaustive, and
+    points ties involving team_name are settled by tie_policy.
     """
     # --- Performance Check ---
     if len(fixtures_arg) > EXHAUSTIVE_LIMIT:
@@ -532,81 +565,52 @@ def analyze_team_exhaustive(team_name, top_n, initial_standings_arg, fixtures_ar
     )
     if not total_matches_per_team:
         return 0, DataFrame(columns=["Outcome"])
+    if team_name not in initial_standings_arg or any(
+        a not in initial_standings_arg or b not in initial_standings_arg for a, b in fixtures_arg
+    ):
+        return 0, DataFrame(columns=["Outcome"])
 
-    valid_scenarios = 0
-    match_wins_count = {
-        tuple(match): {
-            "team_a_wins": 0,
-            "team_b_wins": 0,
-            "Outcome": "Result doesn't matter",
-        }
-        for match in fixtures_arg
-    }
+    team_keys = list(initial_standings_arg.keys())
+    team_index = team_keys.index(team_name)
     num_fixtures = len(fixtures_arg)
     total_possible_scenarios = 2**num_fixtures
+    base_points, base_wins = base_tables(initial_standings_arg, team_keys)
+    team_a, team_b = fixture_team_indices(team_keys, fixtures_arg)
+
+    valid_scenarios = 0.0
+    # Scenarios where team_name qualifies and each fixture's first team won.
+    team_a_wins = np.zeros(num_fixtures)
 
     progress_bar = st.progress(0)
     status_text = st.empty()
     start_time = time.time()
-    processed_scenarios = 0
-
-    # Generate all possible outcomes
-    scenarios = product([0, 1], repeat=num_fixtures)
 
-    for outcome in scenarios:
-        updated_standings = {
-            team: dict(stats) for team, stats in initial_standings_arg.items()
-        }
-        outcome_dict = dict(zip(fixtures_arg, outcome))
-
-        for match, result in outcome_dict.items():
-            team_a, team_b = match
-            winner = team_a if result == 1 else team_b
-            loser = team_b if winner == team_a else team_a
-            if winner in updated_standings and loser in updated_standings:
-                updated_standings[winner]["Wins"] += 1
-                updated_standings[winner]["Points"] += 2
-                updated_standings[loser]["Matches"] += 1
-                updated_standings[winner]["Matches"] += 1
-
-        if all(
-            updated_standings[team]["Matches"] == total_matches_per_team[team]
-            for team in updated_standings
-        ):
-            sorted_teams = sorted(
-                updated_standings.items(),
-                key=lambda x: (-x[1]["Points"], x[0] != team_name, -x[1]["Wins"]),
-            )
-            if team_name in [team for team, _ in sorted_teams[:top_n]]:
-                valid_scenarios += 1
-                for match, result in outcome_dict.items():
-                    match_key = tuple(match)
-                    if match_key in match_wins_count:
-                        if result == 1:
-                            match_wins_count[match_key]["team_a_wins"] += 1
-                        else:
-                            match_wins_count[match_key]["team_b_wins"] += 1
-
-        processed_scenarios += 1
-        if (
-            processed_scenarios % (max(1, total_possible_scenarios // 100)) == 0
-        ):  # Update progress roughly every 1%
-            progress = processed_scenarios / total_possible_scenarios
-            progress_bar.progress(progress)
-            status_text.text(
-                f"Analyzing scenarios for {team_full_names.get(team_name, team_name)}... {processed_scenarios:,}/{total_possible_scenarios:,} ({progress:.1%})"
-            )
+    for lo, hi in iter_index_chunks(total_possible_scenarios):
+        outcomes = decode_outcomes(np.arange(lo, hi, dtype=np.int64), num_fixtures)
+        points, _ = scenario_tables(outcomes, base_points, base_wins, team_a, team_b)
+        greater = (points > points[:, [team_index]]).sum(axis=1)
+        tied = (points == points[:, [team_index]]).sum(axis=1)
+        qualified = qualifying_share(greater, tied, top_n, tie_policy)
+        valid_scenarios += float(qualified.sum())
+        team_a_wins += qualified @ outcomes
+
+        progress = hi / total_possible_scenarios
+        progress_bar.progress(progress)
+        status_text.text(
+            f"Analyzing scenarios for {team_full_names.get(team_name, team_name)}... {hi:,}/{total_possible_scenarios:,} ({progress:.1%})"
+        )
 
-    # Final outcome calculation (remains the same)
     if valid_scenarios > 0:
-        # Calculate outcomes AFTER iterating through all scenarios
+        # One row per distinct match tuple; a fixture listed twice in the same
+        # order is read from its last occurrence.
+        match_wins_count = {}
+        for j, match in enumerate(fixtures_arg):
+            match_wins_count[tuple(match)] = {
+                "team_a_wins": float(team_a_wins[j]),
+                "team_b_wins": valid_scenarios - float(team_a_wins[j]),
+            }
         for match_key, results in match_wins_count.items():
-            total_wins_in_success = results["team_a_wins"] + results["team_b_wins"]
-
-            if total_wins_in_success == 0:
-                # Match never appeared in a successful scenario
-                results["Outcome"] = "Result doesn't matter"
-            elif results["team_a_wins"] == results["team_b_wins"]:
+            if isclose(results["team_a_wins"], results["team_b_wins"], abs_tol=1e-9):
                 # Match appeared equally often for both winners in successful scenarios
                 results["Outcome"] = "Result doesn't matter"
             elif results["team_a_wins"] > results["team_b_wins"]:
@@ -639,14 +643,18 @@ def analyze_team_exhaustive(team_name, top_n, initial_standings_arg, fixtures_ar
 
 # --- Monte Carlo Simulation Functions (Adapted) ---
 def simulate_season_mc(
-    initial_standings_arg, fixtures_arg, num_simulations=NUM_SIMULATIONS_MC
+    initial_standings_arg,
+    fixtures_arg,
+    num_simulations=NUM_SIMULATIONS_MC,
+    details=None,
+    tie_policy="optimistic",
 ):
     """
     Simulates the season using Monte Carlo based on provided data.
-    Returns a dictionary of probabilities for each team.
-    NOTE: Uses simple Points -> Wins sorting for overall probabilities,
-          does NOT apply team-specific priority tie-breaking during this calculation
-          for performance reasons and to reflect general chances before specific tie-breaks.
+    Returns a dictionary of probabilities for each team, with points ties
+    settled by tie_policy as in simulate_season_exhaustive.
+    If a `details` dict is passed, it is filled with the extra aggregate sections
+    (finishing-position distribution, ...) gathered in the same pass.
     """
     total_matches_per_team = calculate_total_matches_per_team(
         initial_standings_arg, fixtures_arg
@@ -654,7 +662,19 @@ def simulate_season_mc(
     if not total_matches_per_team:
         return None
 
-    counts = {team: {"top4": 0, "top2": 0} for team in initial_standings_arg}
+    team_keys = list(initial_standings_arg.keys())
+    top_4_counts = np.zeros(len(team_keys))
+    top_2_counts = np.zeros(len(team_keys))
+    aggregates = (
+        ScenarioAggregates(
+            team_keys,
+            tie_resolver=NRRTieResolver.from_standings(
+                initial_standings_arg, fixtures_arg
+            ),
+        )
+        if details is not None
+        else None
+    )
     probabilities_dict = {
         team: {"Top 4 Probability": 0.0, "Top 2 Probability": 0.0}
         for team in initial_standings_arg
@@ -681,20 +701,12 @@ def simulate_season_mc(
             standings[team]["Matches"] == total_matches_per_team[team]
             for team in standings
         ):
-            # --- Sorting for Overall MC Probability ---
-            # Sorts by Points (desc), then Wins (desc). No team-specific priority here.
-            sorted_teams = sorted(
-                standings.items(), key=lambda x: (-x[1]["Points"], -x[1]["Wins"])
-            )
-            # --- End Sorting ---
-
-            top4_teams = [team for team, _ in sorted_teams[:4]]
-            top2_teams = [team for team, _ in sorted_teams[:2]]
-            for team in initial_standings_arg:
-                if team in top4_teams:
-                    counts[team]["top4"] += 1
-                if team in top2_teams:
-                    counts[team]["top2"] += 1
+            points = [standings[t]["Points"] for t in team_keys]
+            greater, tied = points_ties(points)
+            top_4_counts += qualifying_share(greater, tied, 4, tie_policy)
+            top_2_counts += qualifying_share(greater, tied, 2, tie_policy)
+            if aggregates is not None:
+                aggregates.add(points, [standings[t]["Wins"] for t in team_keys])
 
         # Update progress bar periodically
         if (i + 1) % (max(1, num_simulations // 100)) == 0:
@@ -705,14 +717,17 @@ def simulate_season_mc(
             )
 
     # Calculate final probabilities
-    for team in initial_standings_arg:
+    for t, team in enumerate(team_keys):
         probabilities_dict[team]["Top 4 Probability"] = (
-            counts[team]["top4"] / num_simulations
+            top_4_counts[t] / num_simulations
         ) * 100
         probabilities_dict[team]["Top 2 Probability"] = (
-            counts[team]["top2"] / num_simulations
+            top_2_counts[t] / num_simulations
         ) * 100
 
+    if aggregates is not None:
+        details.update(aggregates.results())
+
     end_time = time.time()
     status_text.text(
         f"Monte Carlo simulation ({num_simulations:,} runs) completed in {end_time - start_time:.2f} seconds."
@@ -728,16 +743,18 @@ def analyze_team_mc(
     initial_standings_arg,
     fixtures_arg,
     num_simulations=NUM_SIMULATIONS_MC,
+    tie_policy="optimistic",
 ):
     """
     Analyzes prospects for one team using Monte Carlo based on provided data.
     Returns percentage chance and DataFrame of required outcomes.
-    Applies priority sorting for the analyzed team in case of ties on points. # <<< Added comment
+    Points ties involving team_name are settled by tie_policy, as in
+    analyze_team_exhaustive.
     """
     total_matches_per_team = calculate_total_matches_per_team(
         initial_standings_arg, fixtures_arg
     )
-    if not total_matches_per_team:
+    if not total_matches_per_team or team_name not in initial_standings_arg:
         return 0, DataFrame(columns=["Outcome"])
 
     valid_scenarios = 0
@@ -770,21 +787,18 @@ def analyze_team_mc(
             updated_standings[team]["Matches"] == total_matches_per_team[team]
             for team in updated_standings
         ):
-            # Sort by Points (desc), then Priority (asc - team_name gets False=0), then Wins (desc)
-            sorted_teams = sorted(
-                updated_standings.items(),
-                key=lambda x: (-x[1]["Points"], x[0] != team_name, -x[1]["Wins"]),
-            )
-
-            top_n_teams = [team for team, _ in sorted_teams[:top_n]]
-            if team_name in top_n_teams:
-                valid_scenarios += 1
+            own_points = updated_standings[team_name]["Points"]
+            greater = sum(s["Points"] > own_points for s in updated_standings.values())
+            tied = sum(s["Points"] == own_points for s in updated_standings.values())
+            share = float(qualifying_share(greater, tied, top_n, tie_policy))
+            if share:
+                valid_scenarios += share
                 for match_key, result in outcome_dict.items():
                     if match_key in match_wins_count:
                         if result == 1:
-                            match_wins_count[match_key]["team_a_wins"] += 1
+                            match_wins_count[match_key]["team_a_wins"] += share
                         else:
-                            match_wins_count[match_key]["team_b_wins"] += 1
+                            match_wins_count[match_key]["team_b_wins"] += share
 
         # Update progress bar periodically
         if (i + 1) % (max(1, num_simulations // 100)) == 0:
@@ -917,7 +931,11 @@ def simulate_matches(results_df, team_name, initial_standings_arg):
 # --- End Simulate Matches Function ---
 
 
-def create_probability_chart(data_dict, prob_column="Top 4 Probability"):
+def create_probability_chart(data_dict, prob_column="Top 4 Probability", range_dict=None):
+    """
+    Horizontal bar chart of prob_column per team. range_dict optionally maps
+    team -> (low, high) percentages, drawn as whiskers across each bar.
+    """
     if not data_dict:
         return None
     chart_data = []
@@ -927,12 +945,16 @@ def create_probability_chart(data_dict, prob_column="Top 4 Probability"):
             prob = float(raw)
         except:
             prob = 0.0
+        low, high = (range_dict or {}).get(team_key, (prob, prob))
         chart_data.append(
             {
                 "Team": team_short_names.get(team_key, team_key),
                 "Probability": prob / 100.0,
+                "Low": low / 100.0,
+                "High": high / 100.0,
                 "BarColor": team_styles.get(team_key, {"bg": "#808080"})["bg"],
                 "ProbText": f"{prob:.4f}%",
+                "RangeText": f"{low:.2f}% - {high:.2f}%",
             }
         )
     if not chart_data:
@@ -977,10 +999,24 @@ def create_probability_chart(data_dict, prob_column="Top 4 Probability"):
             tooltip=[
                 alt.Tooltip("Team:N", title="Team"),
                 alt.Tooltip("Probability:Q", format=".4%", title="Chance"),
-            ],
+            ]
+            + ([alt.Tooltip("RangeText:N", title="Tie-break range")] if range_dict else []),
         )
         .properties(height=height)
     )
+    if range_dict:
+        whiskers = (
+            alt.Chart(df)
+            .mark_rule(strokeWidth=2)
+            .encode(
+                x="Low:Q",
+                x2="High:Q",
+                y=y_encoding_bars,
+                color=alt.value(text_color_for_prob_column),
+                tooltip=[alt.Tooltip("RangeText:N", title="Tie-break range")],
+            )
+        )
+        bars = alt.layer(bars, whiskers).properties(height=height)
 
     # Chart 2: Text Column ONLY
     text = (
@@ -1011,23 +1047,44 @@ def create_probability_chart(data_dict, prob_column="Top 4 Probability"):
     return chart
 
 
-def run_exhaustive_analysis_once(initial_standings_arg, fixtures_arg):
+def run_exhaustive_analysis_once(
+    initial_standings_arg,
+    fixtures_arg,
+    checkpoint_path=None,
+    checkpoint_interval=CHECKPOINT_INTERVAL_SECONDS,
+    progress=None,
+):
     """
     Performs a single exhaustive simulation pass to calculate all metrics.
     Returns a comprehensive dictionary with results for all teams and analyses.
+    With a checkpoint_path, the running tallies are saved there every
+    checkpoint_interval seconds, a checkpoint left by an interrupted run on the
+    same inputs is resumed from, and the file is removed once the pass completes.
+    By default progress and messages go to Streamlit widgets on the page; callers
+    without a page (worker threads, scripts, the service) pass progress=False to
+    print messages instead, or a progress(done, total) callback.
     """
     num_fixtures = len(fixtures_arg)
     team_keys = list(initial_standings_arg.keys())
+    headless = progress is not None
+
+    def notify(level, message):
+        if headless:
+            print(message)
+        else:
+            getattr(st, level)(message)
 
     # --- Performance Check ---
     if num_fixtures > EXHAUSTIVE_LIMIT:
-        st.error(
-            f"Exhaustive analysis requested for {num_fixtures} fixtures, exceeding the limit of {EXHAUSTIVE_LIMIT}. Aborting."
+        notify(
+            "error",
+            f"Exhaustive analysis requested for {num_fixtures} fixtures, exceeding the limit of {EXHAUSTIVE_LIMIT}. Aborting.",
         )
         return None
     elif num_fixtures > 15:
-        st.warning(
-            f"Running full exhaustive analysis for {num_fixtures} fixtures. This may take some time..."
+        notify(
+            "warning",
+            f"Running full exhaustive analysis for {num_fixtures} fixtures. This may take some time...",
         )
     # --- End Performance Check ---
 
@@ -1037,7 +1094,24 @@ def run_exhaustive_analysis_once(initial_standings_arg, fixtures_arg):
     if not total_matches_per_team:
         return None
 
-    total_possible_scenarios = 2**num_fixtures
+    # Repeated meetings of the same pair only matter through how many each side
+    # wins, so each pair is enumerated as a win count c out of m games, standing
+    # for comb(m, c) of the 2^n per-fixture scenarios.
+    fixture_groups = group_fixtures(fixtures_arg)
+    group_sizes = [len(indices) for _, indices in fixture_groups]
+    total_possible_scenarios = prod(size + 1 for size in group_sizes)
+    # Teams with identical standings and mirror-image schedules: see scenario_symmetry.
+    symmetry = FixtureSymmetry.detect(initial_standings_arg, fixture_groups)
+    identity = {team: team for team in team_keys}
+
+    # Fixture j belongs to group fixture_group_of[j]; fixture_flipped[j] if it names
+    # the group's second team first.
+    fixture_group_of = np.empty(num_fixtures, dtype=np.intp)
+    fixture_flipped = np.zeros(num_fixtures, dtype=bool)
+    for g, ((team_a, _), indices) in enumerate(fixture_groups):
+        fixture_group_of[indices] = g
+        fixture_flipped[indices] = [fixtures_arg[j][0] != team_a for j in indices]
+    fixture_sizes = np.array(group_sizes, dtype=np.int64)[fixture_group_of]
 
     # --- Data Structures for Aggregation ---
     # Overall qualification counts
@@ -1055,104 +1129,226 @@ def run_exhaustive_analysis_once(initial_standings_arg, fixtures_arg):
             2: defaultdict(lambda: {"team_a_wins": 0, "team_b_wins": 0}),
         }
     )
+    # Per-fixture tallies are buffered as (group wins, weight, qualified flags) rows
+    # and folded in with numpy: of the `weight` scenarios a row stands for, team_a
+    # of a fixture in a group where team_a won c of m games wins that fixture in
+    # weight * c / m (= comb(m-1, c-1) * rest) of them. outcome_tallies[side] is a
+    # (Top 4 rows per team + Top 2 rows per team) x fixtures array.
+    outcome_tallies = np.zeros((2, 2 * len(team_keys), num_fixtures), dtype=np.int64)
+    tally_rows = {"group_wins": [], "weights": [], "qualified": []}
+
+    def flush_outcome_tallies():
+        if not tally_rows["weights"]:
+            return
+        wins = np.array(tally_rows["group_wins"], dtype=np.int64)[:, fixture_group_of]
+        wins = np.where(fixture_flipped, fixture_sizes - wins, wins)
+        weights = np.array(tally_rows["weights"], dtype=np.int64)[:, None]
+        a_wins = weights * wins // fixture_sizes
+        qualified = np.array(tally_rows["qualified"], dtype=np.int64).T
+        outcome_tallies[0] += qualified @ a_wins
+        outcome_tallies[1] += qualified @ (weights - a_wins)
+        for rows in tally_rows.values():
+            rows.clear()
+
     total_valid_scenarios = 0
+    # Finishing-position histograms (and other per-scenario aggregates)
+    aggregates = ScenarioAggregates(
+        team_keys,
+        tie_resolver=NRRTieResolver.from_standings(initial_standings_arg, fixtures_arg),
+    )
     # --- End Data Structures ---
 
-    progress_bar = st.progress(0)
-    status_text = st.empty()
+    # --- Checkpointing ---
+    # path_counts as a (teams, wins, [total, qualified_top4, qualified_top2]) array.
+    max_team_wins = max(
+        total_matches_per_team[t] - initial_standings_arg[t]["Matches"] for t in team_keys
+    )
+    path_fields = ("total", "qualified_top4", "qualified_top2")
+    input_hash = compute_input_hash(
+        initial_standings_arg, fixtures_arg, engine="run_exhaustive_analysis_once"
+    )
+
+    def save_progress(next_index):
+        flush_outcome_tallies()
+        path_array = np.zeros((len(team_keys), max_team_wins + 1, 3), dtype=np.int64)
+        for t, team in enumerate(team_keys):
+            for k, counts in path_counts[team].items():
+                path_array[t, k] = [counts[field] for field in path_fields]
+        arrays = {
+            "overall_counts": np.array(
+                [[overall_counts[t]["top4"], overall_counts[t]["top2"]] for t in team_keys],
+                dtype=np.int64,
+            ),
+            "path_counts": path_array,
+            "outcome_tallies": outcome_tallies,
+        }
+        arrays.update(
+            {f"aggregates/{name}": value for name, value in aggregates.state().items()}
+        )
+        save_checkpoint(
+            checkpoint_path,
+            {
+                "input_hash": input_hash,
+                "next_index": next_index,
+                "total_states": total_possible_scenarios,
+                "total_valid_scenarios": total_valid_scenarios,
+            },
+            arrays,
+        )
+
+    start_index = 0
+    checkpoint = load_checkpoint(checkpoint_path, input_hash) if checkpoint_path else None
+    if checkpoint is not None:
+        checkpoint_meta, arrays = checkpoint
+        start_index = checkpoint_meta["next_index"]
+        total_valid_scenarios = checkpoint_meta["total_valid_scenarios"]
+        for t, team in enumerate(team_keys):
+            overall_counts[team] = {
+                "top4": int(arrays["overall_counts"][t, 0]),
+                "top2": int(arrays["overall_counts"][t, 1]),
+            }
+            for k in np.nonzero(arrays["path_counts"][t, :, 0])[0]:
+                path_counts[team][int(k)] = {
+                    field: int(value)
+                    for field, value in zip(path_fields, arrays["path_counts"][t, k])
+                }
+        outcome_tallies[:] = arrays["outcome_tallies"]
+        aggregates.load_state(
+            {
+                name[len("aggregates/"):]: value
+                for name, value in arrays.items()
+                if name.startswith("aggregates/")
+            }
+        )
+        notify(
+            "info",
+            f"Resuming exhaustive analysis from checkpoint at {start_index:,}/{total_possible_scenarios:,}.",
+        )
+    last_checkpoint_time = time.time()
+    # --- End Checkpointing ---
+
+    if not headless:
+        progress_bar = st.progress(0)
+        status_text = st.empty()
     start_time = time.time()
-    processed_scenarios = 0
+    processed_scenarios = start_index
 
     # --- Single Pass Simulation Loop ---
-    for i, outcome_tuple in enumerate(product([0, 1], repeat=num_fixtures)):
+    for i, group_wins in enumerate(
+        islice(product(*(range(size + 1) for size in group_sizes)), start_index, None),
+        start=start_index,
+    ):
+        if (
+            checkpoint_path
+            and time.time() - last_checkpoint_time >= checkpoint_interval
+        ):
+            save_progress(i)
+            last_checkpoint_time = time.time()
+
+        # Update progress
+        processed_scenarios += 1
+        if (i + 1) % (max(1, total_possible_scenarios // 100)) == 0:
+            fraction = (i + 1) / total_possible_scenarios
+            if callable(progress):
+                progress(i + 1, total_possible_scenarios)
+            elif not headless:
+                try:
+                    progress_bar.progress(fraction)
+                    status_text.text(
+                        f"Running full exhaustive analysis... {processed_scenarios:,}/{total_possible_scenarios:,} ({fraction:.1%})"
+                    )
+                except Exception as pb_e:
+                    st.warning(f"Progress bar update error: {pb_e}")
+
+        # Only the canonical member of each symmetry orbit is analysed; the
+        # others are credited below by relabelling its teams.
+        if symmetry is None:
+            orbit = {group_wins: identity}
+        else:
+            orbit = symmetry.orbit(group_wins, group_sizes)
+            if orbit is None:
+                continue
+
         standings_scenario = {t: dict(s) for t, s in initial_standings_arg.items()}
         team_wins_in_scenario = {team: 0 for team in team_keys}
-        match_outcomes_this_scenario = {}  # Store match results for this scenario
+        weight = prod(comb(m, c) for m, c in zip(group_sizes, group_wins))
 
         # Apply results for this specific scenario
-        for match_idx, result in enumerate(outcome_tuple): # Use enumerate here
-            match = fixtures_arg[match_idx]
-            match_key = tuple(match)
-            match_outcomes_this_scenario[match_key] = result  # Store 0 or 1
-            team_a, team_b = match
-            winner = team_a if result == 1 else team_b
-            loser = team_b if winner == team_a else team_a
-            if winner in standings_scenario and loser in standings_scenario:
-                standings_scenario[winner]["Wins"] += 1
-                standings_scenario[winner]["Points"] += 2
-                standings_scenario[winner]["Matches"] += 1
-                standings_scenario[loser]["Matches"] += 1
-                if winner in team_wins_in_scenario:
-                    team_wins_in_scenario[winner] += 1
+        for ((team_a, team_b), indices), c in zip(fixture_groups, group_wins):
+            m = len(indices)
+            for winner, loser, wins in ((team_a, team_b, c), (team_b, team_a, m - c)):
+                if winner in standings_scenario and loser in standings_scenario:
+                    standings_scenario[winner]["Wins"] += wins
+                    standings_scenario[winner]["Points"] += 2 * wins
+                    standings_scenario[winner]["Matches"] += wins
+                    standings_scenario[loser]["Matches"] += wins
+                    if winner in team_wins_in_scenario:
+                        team_wins_in_scenario[winner] += wins
 
         # Check if the scenario is valid
-        if all(
+        if not all(
             standings_scenario[team]["Matches"] == total_matches_per_team.get(team, -1)
             for team in standings_scenario
         ):
-            total_valid_scenarios += 1
-
-            # Analyze results for EACH team within this single scenario
-            for current_team_key in team_keys:
-                k_wins = team_wins_in_scenario[current_team_key]
-                path_counts[current_team_key][k_wins]["total"] += 1
-
-                # Sort with priority for the current_team_key
-                sorted_teams_prio = sorted(
-                    standings_scenario.items(),
-                    key=lambda x: (
-                        -x[1]["Points"],
-                        x[0] != current_team_key,
-                        -x[1]["Wins"],
-                    ),
-                )
+            continue
+
+        # Analyze results for EACH team within this single scenario
+        qualified = {}  # qualified[team] = (top4, top2)
+        for current_team_key in team_keys:
+            # Sort with priority for the current_team_key
+            sorted_teams_prio = sorted(
+                standings_scenario.items(),
+                key=lambda x: (
+                    -x[1]["Points"],
+                    x[0] != current_team_key,
+                    -x[1]["Wins"],
+                ),
+            )
+            qualified[current_team_key] = (
+                current_team_key in {t[0] for t in sorted_teams_prio[:4]},
+                current_team_key in {t[0] for t in sorted_teams_prio[:2]},
+            )
 
-                # Check Top 4 Qualification
-                top_4_teams_keys = {t[0] for t in sorted_teams_prio[:4]}
-                qualified_top4 = current_team_key in top_4_teams_keys
+        # Credit the scenario and its mirror images: in the image under perm,
+        # team perm[x] ends exactly where team x ended here. All members share
+        # the same weight, since comb(m, c) == comb(m, m - c).
+        for image_wins, perm in orbit.items():
+            source = {image: team for team, image in perm.items()}
+            total_valid_scenarios += weight
+            aggregates.add(
+                [standings_scenario[source[t]]["Points"] for t in team_keys],
+                [standings_scenario[source[t]]["Wins"] for t in team_keys],
+                weight,
+            )
+            image_qualified = [qualified[source[team]] for team in team_keys]
+            for team, (qualified_top4, qualified_top2) in zip(team_keys, image_qualified):
+                k_wins = team_wins_in_scenario[source[team]]
+                path_counts[team][k_wins]["total"] += weight
                 if qualified_top4:
-                    overall_counts[current_team_key]["top4"] += 1
-                    path_counts[current_team_key][k_wins]["qualified_top4"] += 1
-                    # Increment required outcome counts for Top 4
-                    for match_key, result in match_outcomes_this_scenario.items():
-                        if result == 1:  # Team A won
-                            req_outcome_counts[current_team_key][4][match_key][
-                                "team_a_wins"
-                            ] += 1
-                        else:  # Team B won
-                            req_outcome_counts[current_team_key][4][match_key][
-                                "team_b_wins"
-                            ] += 1
-
-                # Check Top 2 Qualification
-                top_2_teams_keys = {t[0] for t in sorted_teams_prio[:2]}
-                qualified_top2 = current_team_key in top_2_teams_keys
+                    overall_counts[team]["top4"] += weight
+                    path_counts[team][k_wins]["qualified_top4"] += weight
                 if qualified_top2:
-                    overall_counts[current_team_key]["top2"] += 1
-                    path_counts[current_team_key][k_wins]["qualified_top2"] += 1
-                    # Increment required outcome counts for Top 2
-                    for match_key, result in match_outcomes_this_scenario.items():
-                        if result == 1:  # Team A won
-                            req_outcome_counts[current_team_key][2][match_key][
-                                "team_a_wins"
-                            ] += 1
-                        else:  # Team B won
-                            req_outcome_counts[current_team_key][2][match_key][
-                                "team_b_wins"
-                            ] += 1
-
-        # Update progress
-        processed_scenarios += 1
-        if (i + 1) % (max(1, total_possible_scenarios // 100)) == 0:
-            progress = (i + 1) / total_possible_scenarios
-            try:
-                progress_bar.progress(progress)
-                status_text.text(
-                    f"Running full exhaustive analysis... {processed_scenarios:,}/{total_possible_scenarios:,} ({progress:.1%})"
-                )
-            except Exception as pb_e:
-                st.warning(f"Progress bar update error: {pb_e}")
+                    overall_counts[team]["top2"] += weight
+                    path_counts[team][k_wins]["qualified_top2"] += weight
+            tally_rows["group_wins"].append(image_wins)
+            tally_rows["weights"].append(weight)
+            tally_rows["qualified"].append(
+                [q[0] for q in image_qualified] + [q[1] for q in image_qualified]
+            )
+            if len(tally_rows["weights"]) >= DEFAULT_BUFFER_SIZE:
+                flush_outcome_tallies()
     # --- End Single Pass Loop ---
+    flush_outcome_tallies()
+    if checkpoint_path:
+        remove_checkpoint(checkpoint_path)
+    for t, team in enumerate(team_keys):
+        for row, target_n in ((t, 4), (len(team_keys) + t, 2)):
+            for j, match in enumerate(fixtures_arg):
+                # A pairing listed twice in the same order has identical tallies.
+                req_outcome_counts[team][target_n][tuple(match)] = {
+                    "team_a_wins": int(outcome_tallies[0, row, j]),
+                    "team_b_wins": int(outcome_tallies[1, row, j]),
+                }
 
     # --- Post-Processing ---
     final_results = {
@@ -1162,8 +1358,9 @@ def run_exhaustive_analysis_once(initial_standings_arg, fixtures_arg):
     }
 
     if total_valid_scenarios == 0:
-        st.error(
-            "No valid scenarios found during exhaustive analysis. Cannot calculate results."
+        notify(
+            "error",
+            "No valid scenarios found during exhaustive analysis. Cannot calculate results.",
         )
         return None  # Or return empty structure
 
@@ -1262,20 +1459,183 @@ def run_exhaustive_analysis_once(initial_standings_arg, fixtures_arg):
                 "guaranteed": min_wins_guaranteed,
                 "target_matches": num_team_matches,
             }
+    # 4. Finishing Positions, Playoff Lineups & Co-Qualification
+    final_results.update(aggregates.results())
     # --- End Post-Processing ---
 
     end_time = time.time()
-    try:
-        status_text.text(
-            f"Full exhaustive analysis completed in {end_time - start_time:.2f} seconds."
-        )
-        progress_bar.empty()
-    except Exception as pb_e:
-        st.warning(f"Final progress bar update error: {pb_e}")
+    if callable(progress):
+        progress(total_possible_scenarios, total_possible_scenarios)
+    elif not headless:
+        try:
+            status_text.text(
+                f"Full exhaustive analysis completed in {end_time - start_time:.2f} seconds."
+            )
+            progress_bar.empty()
+        except Exception as pb_e:
+            st.warning(f"Final progress bar update error: {pb_e}")
 
     return final_results
 
 
+@st.cache_resource(show_spinner="Building scenario index...")
+def get_scenario_index(initial_standings_arg, fixtures_arg):
+    """
+    Builds the bitmap index over every exhaustive scenario once per input and shares it
+    across sessions. Reuses the precomputed scenario store when it matches the inputs.
+    """
+    store = load_scenario_store(initial_standings_arg, fixtures_arg)
+    if store is not None:
+        return ScenarioBitmapIndex.from_store(store)
+    return ScenarioBitmapIndex.build(initial_standings_arg, fixtures_arg)
+
+
+@st.cache_resource
+def get_computation_pool():
+    """One coalescing worker pool per server process, shared by every session."""
+    return CoalescingPool()
+
+
+def build_exhaustive_analysis(
+    initial_standings_arg, fixtures_arg, input_hash, last_updated, data_source, progress=False
+):
+    """
+    Runs the exhaustive analysis in the precompute_analysis.py file format and
+    writes it to ANALYSIS_FILE. Returns the analysis dict, or None if it failed.
+    progress is an optional progress(done, total) callback.
+    """
+    # Runs on a pool thread without a ScriptRunContext, so no page widgets.
+    analysis_data = run_exhaustive_analysis_once(
+        initial_standings_arg, fixtures_arg, progress=progress
+    )
+    if not analysis_data:
+        return None
+    analysis = json.loads(
+        json.dumps(
+            {
+                "metadata": {
+                    "precomputed_at": datetime.utcnow().isoformat() + "Z",
+                    "num_fixtures": len(fixtures_arg),
+                    "last_data_update": last_updated,
+                    "data_source": data_source,
+                    "method_used": "Exhaustive",
+                    "input_hash": input_hash,
+                },
+                "analysis_data": analysis_data,
+            }
+        )
+    )
+    tmp_path = ANALYSIS_FILE + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(analysis, f, indent=4)
+        os.replace(tmp_path, ANALYSIS_FILE)
+    except IOError as write_e:
+        print(f"ERROR: Failed to write cache file {ANALYSIS_FILE}: {write_e}")
+    return analysis
+
+
+def get_background_run(initial_standings_arg, fixtures_arg, engine):
+    """
+    The background estimate run for these inputs, started on first use and
+    shared through the computation pool by every session viewing them.
+    """
+    key = compute_input_hash(initial_standings_arg, fixtures_arg, engine=engine)
+
+    def start():
+        if engine == "exhaustive":
+            estimates = iter_exhaustive_estimates(initial_standings_arg, fixtures_arg)
+        else:
+            estimates = iter_mc_estimates(
+                initial_standings_arg, fixtures_arg, NUM_SIMULATIONS_MC
+            )
+        return BackgroundRun(estimates, key=key)
+
+    return get_computation_pool().run(key, start)
+
+
+def show_pending_analysis(pending_analysis, key):
+    """
+    Shows how far the shared full analysis has got, re-rendering every
+    BACKGROUND_POLL_SECONDS until it finishes and the page redraws with it.
+    Its own progress is shown instead of a second, estimating enumeration of
+    the same scenarios.
+    """
+    st.fragment(render_pending_analysis, run_every=BACKGROUND_POLL_SECONDS)(
+        pending_analysis, key
+    )
+
+
+def render_pending_analysis(pending_analysis, key):
+    if pending_analysis.done():  # Redraw the whole page with the final results
+        st.rerun()
+    done, total = get_computation_pool().progress(key) or (0, 1)
+    st.progress(
+        done / total,
+        text=f"Running the full exhaustive analysis: {done:,} of {total:,} states. "
+        "The page updates when it finishes.",
+    )
+
+
+def show_background_estimates(run):
+    """
+    Charts a background run's latest estimate. While it is still running, the
+    section re-renders itself every BACKGROUND_POLL_SECONDS without rerunning
+    the rest of the page.
+    """
+    active = run.running
+    st.fragment(
+        render_background_estimates,
+        run_every=BACKGROUND_POLL_SECONDS if active else None,
+    )(run, active)
+
+
+def render_background_estimates(run, active):
+    if active and not run.running:  # Redraw the whole page with the final results
+        st.rerun()
+
+    snapshot = run.snapshot()
+    estimate = snapshot["estimate"]
+    if snapshot["status"] == "failed":
+        st.error(f"Background analysis failed: {snapshot['error']}")
+    if estimate is None:
+        st.info("Starting background analysis...")
+    else:
+        exhaustive = estimate["engine"] == "exhaustive"
+        status_text = {
+            "running": "running",
+            "done": "finished",
+            "timed_out": "stopped at its time budget (partial)",
+            "cancelled": "cancelled",
+            "failed": "failed",
+        }[snapshot["status"]]
+        st.caption(
+            f"{'Exhaustive enumeration' if exhaustive else 'Monte Carlo'}: "
+            f"{estimate['done']:,} of {estimate['total']:,} scenarios "
+            f"({estimate['done'] / estimate['total']:.1%}) in {snapshot['elapsed']:.1f} s, {status_text}. "
+            + (
+                "Scenarios are enumerated in random order, so bars are unbiased estimates; "
+                "whiskers are 95% intervals, never wider than the bounds on the exact answer."
+                if exhaustive
+                else "Bars are running estimates; whiskers are 95% confidence intervals."
+            )
+        )
+        col1, col2 = st.columns(2)
+        for col, prob_column in ((col1, "Top 4 Probability"), (col2, "Top 2 Probability")):
+            with col:
+                chart = create_probability_chart(
+                    estimate["probabilities"], prob_column, estimate["ranges"][prob_column]
+                )
+                if chart:
+                    st.altair_chart(chart, use_container_width=True)
+    if snapshot["status"] == "running":
+        st.button("Cancel", key="cancel_background_run", on_click=run.cancel)
+    elif snapshot["status"] in ("timed_out", "cancelled", "failed"):
+        if st.button("Restart", key="restart_background_run"):
+            get_computation_pool().drop_run(run.key)
+            st.rerun()
+
+
 # --- Main Streamlit App (Modified) ---
 def main():
     st.set_page_config(layout="wide", page_title="IPL Probability Analyzer")
@@ -1402,16 +1762,20 @@ def main():
     )
 
     analysis = None  # Initialize analysis variable
+    pending_analysis = None  # Future of a full analysis still running in the background
+    pending_key = None  # Its input hash, under which it reports progress
     try:
         with open(ANALYSIS_FILE, "r") as f:
             analysis = json.load(f)
         # st.caption(f"🔍 Loaded cached analysis from {ANALYSIS_FILE}")
     except (FileNotFoundError, json.JSONDecodeError) as e:
         st.warning(
-            f"Could not load cached analysis file ({e}). Running analysis now..."
+            f"Could not load cached analysis file ({e}). Running analysis in the background..."
         )
         # Need to load data first to run analysis
-        standings_data_init, fixtures_data_init, _, _, load_errors_init = load_data()
+        standings_data_init, fixtures_data_init, updated_init, source_init, load_errors_init = (
+            load_data()
+        )
         if not load_errors_init or not any(
             "CRITICAL" in err for err in load_errors_init
         ):
@@ -1419,23 +1783,32 @@ def main():
                 fixtures_data_init is not None
                 and len(fixtures_data_init) <= EXHAUSTIVE_LIMIT
             ):
-                analysis = run_exhaustive_analysis_once(
-                    standings_data_init, fixtures_data_init
+                # Sessions arriving together share one run for these inputs; the page
+                # shows its progress until it finishes.
+                input_hash = compute_input_hash(
+                    standings_data_init, fixtures_data_init, engine="exhaustive"
                 )
-                if analysis:
-                    try:
-                        with open(ANALYSIS_FILE, "w") as f:
-                            json.dump(analysis, f, indent=4)
-                        st.caption("⚙️ Computed and cached new analysis results.")
-                    except IOError as write_e:
-                        st.error(
-                            f"Failed to write cache file {ANALYSIS_FILE}: {write_e}"
-                        )
+                pool = get_computation_pool()
+                future = pool.submit(
+                    input_hash,
+                    build_exhaustive_analysis,
+                    standings_data_init,
+                    fixtures_data_init,
+                    input_hash,
+                    updated_init,
+                    source_init,
+                    progress=pool.reporter(input_hash),
+                )
+                if not future.done():
+                    pending_analysis, pending_key = future, input_hash
+                elif future.result():
+                    analysis = future.result()
+                    st.caption("⚙️ Computed and cached new analysis results.")
                 else:
                     st.error("Exhaustive analysis failed during initial computation.")
             elif fixtures_data_init is not None:  # Exceeds limit
                 st.warning(
-                    f"Number of fixtures ({len(fixtures_data_init)}) exceeds exhaustive limit ({EXHAUSTIVE_LIMIT}). Cannot precompute. Exhaustive mode will be unavailable."
+                    f"Number of fixtures ({len(fixtures_data_init)}) exceeds exhaustive limit ({EXHAUSTIVE_LIMIT}). Cannot precompute. Exhaustive mode will be unavailable; a Monte Carlo estimate is shown instead."
                 )
             else:  # Fixtures failed to load
                 st.error(
@@ -1449,8 +1822,12 @@ def main():
         st.error(f"An unexpected error occurred loading or computing analysis: {e}")
         traceback.print_exc()  # Print full traceback for unexpected errors
 
+    if analysis is not None:
+        # Full results are in: provisional estimate runs are no longer needed.
+        get_computation_pool().cancel_runs()
+
     # If analysis is still None after trying to load/compute, stop or handle error
-    if analysis is None:
+    if analysis is None and pending_analysis is None:
         st.error(
             "Failed to load or compute exhaustive analysis data. Exhaustive method unavailable."
         )
@@ -1569,6 +1946,8 @@ def main():
             "Precomputed analysis file has incorrect structure (missing metadata or analysis_data)."
         )
         analysis_method_used = "Error"
+    elif pending_analysis is not None:
+        analysis_method_used = "Running in the background"
     else:
         # analysis is None (loading/computation failed earlier)
         st.error("Precomputed analysis data is unavailable.")
@@ -1592,6 +1971,35 @@ def main():
             if team in display_data_for_chart:
                 display_data_for_chart[team].update(probs)
 
+        # When the artifact carries all tie-break policies, chart the NRR one (or
+        # the neutral one without NRR data) and show the pessimistic..optimistic
+        # spread instead of a single policy.
+        tiebreak_range = analysis_data.get("tiebreak_range")
+        chart_ranges = {"Top 4 Probability": None, "Top 2 Probability": None}
+        if tiebreak_range:
+            bar_policy = "nrr" if "nrr" in tiebreak_range else "neutral"
+            for team in display_data_for_chart:
+                display_data_for_chart[team].update(
+                    tiebreak_range[bar_policy].get(team, {})
+                )
+            for prob_column in chart_ranges:
+                chart_ranges[prob_column] = {
+                    team: (
+                        tiebreak_range["pessimistic"][team][prob_column],
+                        tiebreak_range["optimistic"][team][prob_column],
+                    )
+                    for team in display_data_for_chart
+                    if team in tiebreak_range["optimistic"]
+                }
+            st.caption(
+                (
+                    "Bars settle points ties on projected net run rate"
+                    if bar_policy == "nrr"
+                    else "Bars share points ties evenly between the tied teams"
+                )
+                + "; whiskers run from losing every points tie to winning every one."
+            )
+
         ## # --- ADD DEBUG PRINT ---
         ## st.write("DEBUG: Data for Charts:")
         ## st.json(display_data_for_chart)
@@ -1599,7 +2007,9 @@ def main():
         with col1:
             st.markdown("##### Top 4 Chances")
             chart_top4 = create_probability_chart(
-                display_data_for_chart, "Top 4 Probability"
+                display_data_for_chart,
+                "Top 4 Probability",
+                chart_ranges["Top 4 Probability"],
             )
             if chart_top4:
                 st.altair_chart(chart_top4, use_container_width=True)
@@ -1608,12 +2018,23 @@ def main():
         with col2:
             st.markdown("##### Top 2 Chances")
             chart_top2 = create_probability_chart(
-                display_data_for_chart, "Top 2 Probability"
+                display_data_for_chart,
+                "Top 2 Probability",
+                chart_ranges["Top 2 Probability"],
             )
             if chart_top2:
                 st.altair_chart(chart_top2, use_container_width=True)
             else:
                 st.warning("Could not generate Top 2 chart.")
+    elif pending_analysis is not None:
+        # The shared full analysis is the only enumeration running: show its progress.
+        show_pending_analysis(pending_analysis, pending_key)
+    elif analysis is None and initial_standings_data and fixtures_data is not None:
+        # No usable artifact and no full run: chart anytime estimates instead.
+        engine = "exhaustive" if num_fixtures <= EXHAUSTIVE_LIMIT else "monte_carlo"
+        show_background_estimates(
+            get_background_run(initial_standings_data, fixtures_data, engine)
+        )
     else:
         st.warning(
             f"Overall probability data not available (Method: {analysis_method_used})."
@@ -1768,6 +2189,56 @@ def main():
     st.markdown("---")
     # --- End Qualification Path ---
 
+    # --- Scenario Explorer (Bitmap Queries) ---
+    with st.expander("Scenario Explorer (Exhaustive)"):
+        if num_fixtures == 0:
+            st.info("No remaining fixtures to explore.")
+        elif num_fixtures > EXHAUSTIVE_LIMIT:
+            st.info(
+                f"Scenario queries need exhaustive enumeration ({num_fixtures} fixtures exceeds the limit of {EXHAUSTIVE_LIMIT})."
+            )
+        else:
+            result_options = {}
+            for i, (team_a, team_b) in enumerate(fixtures_data):
+                for winner, loser in ((team_a, team_b), (team_b, team_a)):
+                    result_options[f"{winner} beat {loser} (Match {i + 1})"] = (i, winner)
+            pinned_results = st.multiselect(
+                "Given these results:", list(result_options), key="explorer_results"
+            )
+            extra_options = {
+                f"{team_full_names.get(t, t)} finishes Top {k}": (t, k)
+                for t in initial_standings_data
+                for k in (4, 2)
+                if not (t == team_key and k == top_n)
+            }
+            extra_conditions = st.multiselect(
+                f"And also (besides {full_team_name} Top {top_n}):",
+                list(extra_options),
+                key="explorer_conditions",
+            )
+            pinned = [result_options[label] for label in pinned_results]
+            try:
+                if len({match_idx for match_idx, _ in pinned}) != len(pinned):
+                    st.warning("Each match can only be pinned to one result.")
+                else:
+                    scenario_index = get_scenario_index(
+                        initial_standings_data, fixtures_data
+                    )
+                    given = scenario_index.conditions(dict(pinned))
+                    event = scenario_index.top(team_key, top_n)
+                    for label in extra_conditions:
+                        event = event & scenario_index.top(*extra_options[label])
+                    probability = scenario_index.probability(event, given=given)
+                    st.metric(
+                        "Probability across matching scenarios",
+                        f"{probability:.4f}%",
+                        help=f"{given.count():,} of {scenario_index.size:,} scenarios match the pinned results.",
+                    )
+            except Exception as e:
+                st.error(f"Scenario query failed: {e}")
+                traceback.print_exc()
+    # --- End Scenario Explorer ---
+
     # --- Simulate Specific Scenario ---
     st.subheader("Simulate One Scenario")
     results_df_for_sim = None
@@ -0,0 +1,186 @@
+"""
+Load test for the Streamlit app under concurrent sessions.
+
+Each session is a headless ``streamlit.testing.v1.AppTest`` in its own worker
+process that opens the page and then repeats a realistic interaction loop:
+pick a team, switch between Top 4 and Top 2, and press "Simulate Scenario".
+Every rerun is timed (wall clock and process CPU), along with how many
+``json.load`` calls it made, and each session reports its CPU time and peak
+memory:
+
+    python load_test.py --sessions 8 --steps 10
+
+The report gives p50 / p95 / p99 rerun latency overall and per action, so slow
+actions (and reruns that reload JSON) stand out. Sessions run in separate
+processes so their CPU and memory can be measured individually; this also
+means ``st.cache_*`` caches are per session here rather than shared as in one
+server process, so the first page load of each session is reported as "open".
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(BASE_DIR, "ipl_analysis_app.py")
+LOAD_TEST_RESULTS_FILE = os.path.join(BASE_DIR, "load_test_results.json")
+DEFAULT_SESSIONS = 4
+DEFAULT_STEPS = 5  # Interaction loops per session
+RERUN_TIMEOUT = 300  # Seconds allowed for one rerun
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values, q):
+    """q-th percentile (0-100) of values by linear interpolation between closest ranks."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values):
+    summary = {f"p{q}": percentile(values, q) for q in PERCENTILES}
+    summary.update(count=len(values), mean=sum(values) / len(values) if values else None)
+    return summary
+
+
+# --- Sessions (run in worker processes) ---
+def run_session(session_id, steps, seed=None, app_file=APP_FILE):
+    """Drives one headless session. Returns its rerun records, CPU seconds and peak RSS."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed if seed is not None else session_id)
+    json_loads = [0]
+    original_load = json.load
+
+    def counting_load(*args, **kwargs):
+        json_loads[0] += 1
+        return original_load(*args, **kwargs)
+
+    json.load = counting_load
+    reruns = []
+    cpu_start = time.process_time()
+    at = AppTest.from_file(app_file, default_timeout=RERUN_TIMEOUT)
+
+    def timed(action, interact):
+        loads_before = json_loads[0]
+        wall, cpu = time.perf_counter(), time.process_time()
+        interact()
+        reruns.append(
+            {
+                "session": session_id,
+                "action": action,
+                "latency": time.perf_counter() - wall,
+                "cpu": time.process_time() - cpu,
+                "json_loads": json_loads[0] - loads_before,
+                "exceptions": [str(e.value) for e in at.exception],
+            }
+        )
+
+    try:
+        timed("open", at.run)
+        for _ in range(steps):
+            teams = at.selectbox(key="team_select_main").options if at.selectbox else []
+            if teams:
+                timed("select team", lambda: at.selectbox(key="team_select_main").select(rng.choice(teams)).run())
+            if at.radio:
+                target = at.radio(key="top_n_select_main")
+                timed("toggle target", lambda: target.set_value("Top 2" if target.value == "Top 4" else "Top 4").run())
+            simulate = [button for button in at.button if button.label == "Simulate Scenario"]
+            if simulate:
+                timed("simulate scenario", lambda: simulate[0].click().run())
+    finally:
+        json.load = original_load
+    return {
+        "session": session_id,
+        "reruns": reruns,
+        "cpu_seconds": time.process_time() - cpu_start,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def _run_session_task(task):
+    return run_session(*task)
+
+
+# --- Report ---
+def build_report(sessions, wall_seconds):
+    reruns = [rerun for session in sessions for rerun in session["reruns"]]
+    actions = {}
+    for rerun in reruns:
+        actions.setdefault(rerun["action"], []).append(rerun)
+    return {
+        "sessions": len(sessions),
+        "reruns": len(reruns),
+        "wall_seconds": wall_seconds,
+        "reruns_per_second": len(reruns) / wall_seconds if wall_seconds else None,
+        "latency": summarize([r["latency"] for r in reruns]),
+        "actions": {
+            action: {
+                "latency": summarize([r["latency"] for r in rows]),
+                "cpu_mean": sum(r["cpu"] for r in rows) / len(rows),
+                "json_loads_mean": sum(r["json_loads"] for r in rows) / len(rows),
+            }
+            for action, rows in actions.items()
+        },
+        "per_session": {
+            "cpu_seconds": summarize([s["cpu_seconds"] for s in sessions]),
+            "peak_rss_mb": summarize([s["peak_rss_mb"] for s in sessions]),
+        },
+        "exceptions": sorted({e for r in reruns for e in r["exceptions"]}),
+        "session_details": sessions,
+    }
+
+
+def print_report(report):
+    def ms(summary):
+        return "  ".join(f"p{q} {summary[f'p{q}'] * 1000:7.0f} ms" for q in PERCENTILES)
+
+    print(
+        f"{report['sessions']} sessions, {report['reruns']} reruns in {report['wall_seconds']:.1f} s "
+        f"({report['reruns_per_second']:.1f} reruns/s)"
+    )
+    print(f"  {'all reruns':<18} {ms(report['latency'])}")
+    for action, stats in report["actions"].items():
+        print(
+            f"  {action:<18} {ms(stats['latency'])}  cpu {stats['cpu_mean'] * 1000:6.0f} ms"
+            f"  json.load {stats['json_loads_mean']:.1f}"
+        )
+    per_session = report["per_session"]
+    print(
+        f"  per session: CPU p50 {per_session['cpu_seconds']['p50']:.2f} s, "
+        f"peak RSS p50 {per_session['peak_rss_mb']['p50']:.0f} MB (max {max(s['peak_rss_mb'] for s in report['session_details']):.0f} MB)"
+    )
+    for exception in report["exceptions"]:
+        print(f"  WARNING: a rerun raised: {exception}")
+
+
+def run_load_test(sessions=DEFAULT_SESSIONS, steps=DEFAULT_STEPS, seed=0, app_file=APP_FILE):
+    """Runs `sessions` concurrent sessions of `steps` interaction loops and returns the report."""
+    start = time.perf_counter()
+    tasks = [(i, steps, seed + i, app_file) for i in range(sessions)]
+    # One fresh process per session: ru_maxrss covers the whole process, so a
+    # reused worker would report another session's memory as well.
+    with ProcessPoolExecutor(max_workers=sessions, max_tasks_per_child=1) as executor:
+        results = list(executor.map(_run_session_task, tasks))
+    return build_report(results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the Streamlit app with concurrent headless sessions.")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS, help="Concurrent sessions (default: %(default)s).")
+    parser.add_argument("--steps", type=int, default=DEFAULT_STEPS, help="Interaction loops per session (default: %(default)s).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the sessions' team choices.")
+    parser.add_argument("--output", default=LOAD_TEST_RESULTS_FILE, help="Where to write the report JSON.")
+    args = parser.parse_args()
+    report = run_load_test(args.sessions, args.steps, args.seed)
+    print_report(report)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"Report saved to {args.output}.")
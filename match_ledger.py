@@ -0,0 +1,200 @@
+"""
+Append-only ledger of completed match results.
+
+Every completed match is recorded once, as one JSON line in match_ledger.jsonl
+(match id, date, teams, winner or null for a shared-points result, source and
+when it was recorded). Entries are never rewritten, so the ledger is the
+history of what changed between refreshes.
+
+``derive_files`` turns the ledger plus the season schedule into
+``current_standings.json`` and ``remaining_fixtures.json`` incrementally: the
+standings file remembers how many ledger entries it already includes and only
+the new ones are applied. It also writes ``ledger_delta.json``, naming exactly
+which of the previously remaining fixtures were resolved, so downstream stages
+can do incremental work instead of recomputing blindly. When an authoritative
+points table is passed and disagrees with the derived standings, the points
+table is published instead and the mismatch is listed in the delta.
+"""
+import json
+import os
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LEDGER_FILE = os.path.join(BASE_DIR, "match_ledger.jsonl")
+DELTA_FILE = os.path.join(BASE_DIR, "ledger_delta.json")
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def read_ledger(path=LEDGER_FILE):
+    """Ledger entries in append order. A torn final line (interrupted append) is ignored."""
+    if not os.path.exists(path):
+        return []
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                break
+    return entries
+
+
+def append_results(results, source, path=LEDGER_FILE):
+    """
+    Appends the results (dicts with match_id, date, team1, team2, winner) whose
+    match_id is not in the ledger yet. Returns the newly recorded entries.
+    """
+    known = {entry["match_id"] for entry in read_ledger(path)}
+    new_entries = []
+    for result in results:
+        if result["match_id"] in known:
+            continue
+        known.add(result["match_id"])
+        new_entries.append(
+            {
+                "match_id": result["match_id"],
+                "date": result.get("date"),
+                "team1": result["team1"],
+                "team2": result["team2"],
+                "winner": result.get("winner"),
+                "source": source,
+                "recorded_at": _now(),
+            }
+        )
+    if new_entries:
+        with open(path, "a", encoding="utf-8") as f:
+            for entry in new_entries:
+                f.write(json.dumps(entry, sort_keys=True) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+    return new_entries
+
+
+def apply_results(standings, entries):
+    """Adds ledger entries to a {team: {Matches, Wins, Points}} dict in place."""
+    for entry in entries:
+        for team in (entry["team1"], entry["team2"]):
+            stats = standings.setdefault(team, {"Matches": 0, "Wins": 0, "Points": 0})
+            stats["Matches"] += 1
+            if entry["winner"] is None:
+                stats["Points"] += 1  # No result / tie: shared points
+        if entry["winner"] is not None:
+            standings[entry["winner"]]["Wins"] += 1
+            standings[entry["winner"]]["Points"] += 2
+    return standings
+
+
+def derive_files(
+    schedule,
+    standings_path,
+    fixtures_path,
+    ledger_path=LEDGER_FILE,
+    delta_path=DELTA_FILE,
+    teams=(),
+    nrr=None,
+    source="Match Ledger",
+    points_table=None,
+    points_table_source="Points Table",
+):
+    """
+    Writes standings and remaining fixtures derived from the ledger. schedule is
+    the date-ordered list of upcoming matches ({match_id, team1, team2}); teams
+    lists every team (so winless teams still appear) and nrr optionally maps
+    team -> net run rate, which results alone cannot provide. points_table
+    optionally maps team -> {Matches, Wins, Points} from an authoritative source;
+    if any team's points differ from the ledger's, that table is published.
+    Returns the delta that is also written to delta_path.
+    """
+    ledger = read_ledger(ledger_path)
+    standings = None
+    applied = 0
+    previous_ids = []
+    try:
+        with open(standings_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        if 0 <= previous.get("ledger_entries", -1) <= len(ledger):
+            standings = {
+                team: {k: stats[k] for k in ("Matches", "Wins", "Points")}
+                for team, stats in previous["standings"].items()
+            }
+            applied = previous["ledger_entries"]
+        with open(fixtures_path, "r", encoding="utf-8") as f:
+            previous_ids = json.load(f).get("fixture_ids", [])
+    except (IOError, ValueError, KeyError):
+        pass
+    if standings is None:  # No incremental base: rebuild from the whole ledger
+        standings, applied = {}, 0
+    for team in teams:
+        standings.setdefault(team, {"Matches": 0, "Wins": 0, "Points": 0})
+    new_entries = ledger[applied:]
+    apply_results(standings, new_entries)
+    mismatches = [
+        {"team": team, "ledger_points": standings.get(team, {}).get("Points"), "table_points": stats["Points"]}
+        for team, stats in (points_table or {}).items()
+        if standings.get(team, {}).get("Points") != stats["Points"]
+    ]
+    if mismatches:
+        standings = {
+            team: {k: stats[k] for k in ("Matches", "Wins", "Points")}
+            for team, stats in points_table.items()
+        }
+        source = points_table_source
+    for team, value in (nrr or {}).items():
+        if team in standings and value is not None:
+            standings[team]["NRR"] = value
+
+    resolved_ids = {entry["match_id"] for entry in ledger}
+    remaining = [match for match in schedule if match["match_id"] not in resolved_ids]
+    remaining_ids = [match["match_id"] for match in remaining]
+    results_by_id = {entry["match_id"]: entry for entry in new_entries}
+    delta = {
+        "ledger_entries": [applied, len(ledger)],
+        "resolved": [
+            {
+                "fixture_index": i,
+                "match_id": match_id,
+                "team1": results_by_id[match_id]["team1"],
+                "team2": results_by_id[match_id]["team2"],
+                "winner": results_by_id[match_id]["winner"],
+            }
+            for i, match_id in enumerate(previous_ids)
+            if match_id in results_by_id
+        ],
+        "added": [match_id for match_id in remaining_ids if match_id not in previous_ids],
+        "mismatches": mismatches,
+        "generated_at": _now(),
+    }
+
+    ordered = dict(sorted(standings.items(), key=lambda item: -item[1]["Points"]))
+    with open(standings_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"last_updated": _now(), "source": source, "standings": ordered, "ledger_entries": len(ledger)},
+            f,
+            indent=4,
+        )
+    with open(fixtures_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "last_updated": _now(),
+                "source": source,
+                "fixtures": [[match["team1"], match["team2"]] for match in remaining],
+                "fixture_ids": remaining_ids,
+            },
+            f,
+            indent=4,
+        )
+    with open(delta_path, "w", encoding="utf-8") as f:
+        json.dump(delta, f, indent=4)
+    return delta
+
+
+def read_delta(path=DELTA_FILE):
+    """The last delta written by derive_files, or None."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return None
@@ -1,3 +1,4 @@
+import argparse
 import json
 import os
 import time
@@ -10,17 +11,95 @@ from ipl_analysis_app import (
     run_exhaustive_analysis_once, # Keep this for exhaustive part
     simulate_season_mc,           # For MC overall
     analyze_team_mc,              # For MC team-specific
-    # EXHAUSTIVE_LIMIT,           # We'll use a hardcoded threshold here
-    NUM_SIMULATIONS_MC            # Use the MC simulation count
+    EXHAUSTIVE_LIMIT,             # Upper bound for the optional scenario store
 )
+from engine_planner import (
+    plan_engine,
+    DEFAULT_TIME_BUDGET,
+    DEFAULT_MEMORY_BUDGET_MB,
+    DEFAULT_MC_PRECISION,
+)
+from analysis_artifacts import ARTIFACTS_DIR, write_artifacts
+from checkpoint import EXHAUSTIVE_CHECKPOINT_FILE
+from match_ledger import read_delta
+from split_enumeration import run_split_enumeration_analysis
+from probability_trajectory import compute_trajectories
+from scenario_space import compute_input_hash
+from scenario_store import build_scenario_store, ScenarioStore, SCENARIO_STORE_FILE
 
 # Define file paths (relative to this script's location)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ANALYSIS_FILE = os.path.join(BASE_DIR, 'analysis_results.json')
-EXHAUSTIVE_THRESHOLD = 22 # Run exhaustive if num_fixtures < this value (i.e., <= 21)
 
-def precompute_analysis():
-    """Runs EITHER exhaustive OR Monte Carlo analysis based on fixture count and saves results."""
+def write_analysis_file(output_data):
+    """Writes the analysis JSON via a temporary file, so readers never see a partial file."""
+    tmp_path = ANALYSIS_FILE + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(output_data, f, indent=4)
+    os.replace(tmp_path, ANALYSIS_FILE)
+
+def refresh_unchanged_analysis(input_hash, last_updated, data_source):
+    """If the saved analysis was computed from the same input hash, refreshes its
+    data timestamps in place and returns it; otherwise returns None."""
+    try:
+        with open(ANALYSIS_FILE, 'r') as f:
+            existing = json.load(f)
+    except (IOError, ValueError):
+        return None
+    metadata = existing.get("metadata") or {}
+    if metadata.get("input_hash") != input_hash or existing.get("analysis_data") is None:
+        return None
+    metadata["last_data_update"] = last_updated
+    metadata["data_source"] = data_source
+    metadata["checked_at"] = datetime.utcnow().isoformat() + "Z"
+    try:
+        write_analysis_file(existing)
+    except IOError as e:
+        print(f"ERROR: Failed to refresh analysis file timestamps: {e}")
+    return existing
+
+def save_artifacts(output_data, fixtures):
+    """Writes the sharded frontend artifacts next to the compatibility JSON."""
+    try:
+        sizes = write_artifacts(output_data, fixtures, ARTIFACTS_DIR)
+        print(f"Saved sharded artifacts to {ARTIFACTS_DIR}: overview {sizes['overview.json'] / 1024:.1f} KB, "
+              f"{len(sizes) - 1} team files of up to {max(sizes.values()) / 1024:.1f} KB (before compression).")
+    except (IOError, KeyError, TypeError) as e:
+        print(f"ERROR: Failed to write sharded artifacts: {e}")
+
+def save_scenario_store(standings, fixtures, force=False):
+    """Writes the scenario store unless one for the same inputs already exists."""
+    num_fixtures = len(fixtures)
+    if num_fixtures > EXHAUSTIVE_LIMIT:
+        print(f"Skipping scenario store: {num_fixtures} fixtures exceeds the exhaustive limit of {EXHAUSTIVE_LIMIT}.")
+        return
+    if not force and os.path.exists(SCENARIO_STORE_FILE):
+        try:
+            if ScenarioStore(SCENARIO_STORE_FILE).matches_inputs(standings, fixtures):
+                print(f"Scenario store {SCENARIO_STORE_FILE} is already up to date.")
+                return
+        except (IOError, ValueError, KeyError):
+            pass # Unreadable store; rebuild it below
+    print(f"Writing scenario store ({2**num_fixtures:,} scenarios) to {SCENARIO_STORE_FILE}...")
+    try:
+        build_scenario_store(standings, fixtures, SCENARIO_STORE_FILE)
+        print("Scenario store saved successfully.")
+    except (IOError, ValueError) as e:
+        print(f"ERROR: Failed to write scenario store: {e}")
+
+def precompute_analysis(
+    write_scenario_store=False,
+    time_budget=DEFAULT_TIME_BUDGET,
+    memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB,
+    precision=DEFAULT_MC_PRECISION,
+    require_exact=False,
+    force=False,
+):
+    """Runs exhaustive (direct or split enumeration) OR Monte Carlo analysis, as chosen by
+    the engine planner for the given budgets, and saves results.
+    Skips the analysis when the saved one was computed from the same inputs and engine
+    configuration (unless force is set).
+    Optionally also persists every exhaustive scenario to the memory-mapped scenario store."""
     print("Starting precomputation...")
     start_time = time.time()
 
@@ -38,6 +117,24 @@ def precompute_analysis():
     num_fixtures = len(fixtures)
     print(f"Loaded data: {len(standings)} teams, {num_fixtures} fixtures remaining.")
 
+    # --- Input-Hash Short-Circuit ---
+    input_hash = compute_input_hash(
+        standings,
+        fixtures,
+        time_budget=time_budget,
+        memory_budget_mb=memory_budget_mb,
+        precision=precision,
+        require_exact=require_exact,
+    )
+    existing = None if force else refresh_unchanged_analysis(input_hash, last_updated, data_source)
+    if existing is not None:
+        print(f"Inputs and engine configuration unchanged (hash {input_hash[:12]}); reusing {ANALYSIS_FILE}.")
+        save_artifacts(existing, fixtures)
+        if write_scenario_store:
+            save_scenario_store(standings, fixtures)
+        print(f"Precomputation finished in {time.time() - start_time:.2f} seconds.")
+        return
+
     # Initialize output structure
     output_data = {
         "metadata": {
@@ -45,18 +142,47 @@ def precompute_analysis():
             "num_fixtures": num_fixtures,
             "last_data_update": last_updated,
             "data_source": data_source,
-            "method_used": None # Will be filled based on execution path
+            "method_used": None, # Will be filled based on execution path
+            "input_hash": input_hash,
         },
         "analysis_data": None # Will hold results from the chosen method
     }
 
     analysis_results = None # To store results from either method
 
+    # Record which fixtures the match ledger resolved since the previous refresh.
+    delta = read_delta()
+    if delta is not None:
+        output_data["metadata"]["data_delta"] = delta
+        if delta["resolved"]:
+            indices = ", ".join(str(r["fixture_index"]) for r in delta["resolved"])
+            print(f"Previously remaining fixture(s) {indices} resolved since the last refresh.")
+
     # --- Decide and Run Analysis ---
-    if num_fixtures < EXHAUSTIVE_THRESHOLD:
-        print(f"Running Exhaustive Analysis ({num_fixtures} < {EXHAUSTIVE_THRESHOLD} fixtures)...")
-        # Note: run_exhaustive_analysis_once has its own internal progress/status
-        analysis_results = run_exhaustive_analysis_once(standings, fixtures)
+    print("Calibrating engines and planning analysis...")
+    plan = plan_engine(
+        standings,
+        fixtures,
+        time_budget=time_budget,
+        memory_budget_mb=memory_budget_mb,
+        precision=precision,
+        require_exact=require_exact,
+    )
+    output_data["metadata"]["engine_plan"] = plan
+    print(f"Planner chose '{plan['engine']}': {plan['reason']}.")
+
+    if plan["engine"] == "exhaustive":
+        print(f"Running Exhaustive Analysis ({num_fixtures} fixtures)...")
+        if os.path.exists(EXHAUSTIVE_CHECKPOINT_FILE):
+            print(f"Found checkpoint {EXHAUSTIVE_CHECKPOINT_FILE}; resuming if it matches the current data.")
+        next_report = [0]
+        def report_progress(done, total):
+            if done >= next_report[0] or done == total:
+                print(f"  - Analysed {done:,}/{total:,} pair-win states")
+                next_report[0] = done + max(1, total // 10)
+        analysis_results = run_exhaustive_analysis_once(
+            standings, fixtures, checkpoint_path=EXHAUSTIVE_CHECKPOINT_FILE, progress=report_progress
+        )
         if analysis_results:
             print("Exhaustive analysis completed.")
             output_data["metadata"]["method_used"] = "Exhaustive"
@@ -65,8 +191,23 @@ def precompute_analysis():
             # Decide if we should abort saving entirely if exhaustive fails
             # For now, we'll proceed but analysis_results will be None
 
+    elif plan["engine"] == "split_enumeration":
+        print(f"Running Exhaustive Analysis via split enumeration ({num_fixtures} fixtures)...")
+        next_report = [0]
+        def report_progress(done, total):
+            if done >= next_report[0] or done == total:
+                print(f"  - Joined {done:,}/{total:,} left-half vectors")
+                next_report[0] = done + max(1, total // 10)
+        analysis_results = run_split_enumeration_analysis(standings, fixtures, progress=report_progress)
+        if analysis_results:
+            print("Split enumeration analysis completed.")
+            output_data["metadata"]["method_used"] = "Exhaustive (split enumeration)"
+        else:
+            print("Split enumeration analysis failed or was aborted.")
+
     else: # Run Monte Carlo
-        print(f"Running Monte Carlo Analysis ({num_fixtures} >= {EXHAUSTIVE_THRESHOLD} fixtures, using {NUM_SIMULATIONS_MC} simulations)...")
+        num_simulations = plan["num_simulations"]
+        print(f"Running Monte Carlo Analysis ({num_fixtures} fixtures, using {num_simulations} simulations)...")
         output_data["metadata"]["method_used"] = "Monte Carlo"
         mc_results = {
             "overall_probabilities": None,
@@ -78,9 +219,11 @@ def precompute_analysis():
 
         # MC Overall Probabilities
         print("  - Calculating MC overall probabilities...")
-        mc_overall_probs = simulate_season_mc(standings, fixtures, num_simulations=NUM_SIMULATIONS_MC)
+        mc_details = {} # Position distribution etc., gathered in the same pass
+        mc_overall_probs = simulate_season_mc(standings, fixtures, num_simulations=num_simulations, details=mc_details)
         if mc_overall_probs:
             mc_results["overall_probabilities"] = mc_overall_probs
+            mc_results.update(mc_details)
             print("  - MC overall probabilities completed.")
         else:
             print("  - WARNING: MC overall probabilities failed.")
@@ -95,7 +238,7 @@ def precompute_analysis():
             for target_n in [4, 2]:
                 print(f"    - Analyzing {team_key} (Top {target_n})...")
                 try:
-                    percentage, results_df = analyze_team_mc(team_key, target_n, standings, fixtures, num_simulations=NUM_SIMULATIONS_MC)
+                    percentage, results_df = analyze_team_mc(team_key, target_n, standings, fixtures, num_simulations=num_simulations)
                     mc_results["team_analysis"][str(target_n)][team_key] = {
                         'percentage': percentage,
                         'results_df': results_df.to_dict(orient='index') # Store as dict
@@ -114,14 +257,23 @@ def precompute_analysis():
              print("Monte Carlo analysis completed with errors. Results might be incomplete.")
              analysis_results = mc_results # Still assign potentially incomplete results
 
+    # --- Probability Trajectory ---
+    if analysis_results is not None:
+        trajectory = plan["trajectory"]
+        if trajectory["run"]:
+            print(f"Computing probability trajectory over {num_fixtures} remaining fixtures ({trajectory['reason']})...")
+            analysis_results["probability_trajectory"] = compute_trajectories(standings, fixtures)
+        else:
+            print(f"Skipping probability trajectory: {trajectory['reason']}.")
+
     # --- Save Results ---
     if analysis_results is not None: # Only save if some analysis was attempted and produced a result dict
         output_data["analysis_data"] = analysis_results
         try:
             print(f"Saving analysis ({output_data['metadata']['method_used']}) to {ANALYSIS_FILE}...")
-            with open(ANALYSIS_FILE, 'w') as f:
-                json.dump(output_data, f, indent=4)
+            write_analysis_file(output_data)
             print("Analysis saved successfully.")
+            save_artifacts(output_data, fixtures)
         except IOError as e:
             print(f"ERROR: Failed to write analysis file: {e}")
         except TypeError as e:
@@ -129,8 +281,57 @@ def precompute_analysis():
     else:
         print("No analysis results generated, skipping save.")
 
+    # --- Optional Scenario Store ---
+    if write_scenario_store:
+        save_scenario_store(standings, fixtures, force=force)
+
     end_time = time.time()
     print(f"Precomputation finished in {end_time - start_time:.2f} seconds.")
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute IPL qualification analysis.")
+    parser.add_argument(
+        "--scenario-store",
+        action="store_true",
+        help=f"Also persist every exhaustive scenario to {os.path.basename(SCENARIO_STORE_FILE)} for later queries.",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=DEFAULT_TIME_BUDGET,
+        help="Seconds the analysis may take; the planner picks the fastest engine within it (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=float,
+        default=DEFAULT_MEMORY_BUDGET_MB,
+        help="Working memory in MB an exact engine may use (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--precision",
+        type=float,
+        default=DEFAULT_MC_PRECISION,
+        help="Max standard error, in percentage points, if Monte Carlo is used (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="Use an exact engine even if Monte Carlo is cheaper or the exact run is estimated to exceed the time budget.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Recompute even if the saved analysis was built from the same inputs and settings.",
+    )
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    precompute_analysis() # Renamed function call
+    args = parse_args()
+    precompute_analysis(
+        write_scenario_store=args.scenario_store,
+        time_budget=args.time_budget,
+        memory_budget_mb=args.memory_budget,
+        precision=args.precision,
+        require_exact=args.exact,
+        force=args.force,
+    ) # Renamed function call
@@ -0,0 +1,126 @@
+"""
+How each team's qualification probability can move as the season plays out.
+
+After the first k fixtures of the date-ordered schedule are decided, a team's
+probability is the share of the remaining 2^(n-k) completions in which it
+qualifies. With ``scenario_space`` indexing (fixture 0 is the most significant
+bit) the completions of one k-fixture prefix are a contiguous block of 2^(n-k)
+scenario indices, so every matchday's probabilities are block sums of the same
+per-scenario qualification flags. A single streaming pass therefore yields the
+distribution (fan chart) for all k at once:
+
+* levels whose blocks fit inside a decoded chunk are histogrammed per chunk by
+  their qualifying-completion count;
+* coarser levels are rebuilt from per-chunk totals after the pass.
+
+Every k-fixture prefix is equally likely (2^-k), matching the exhaustive engine.
+"""
+import numpy as np
+
+from scenario_aggregates import QUALIFICATION_TARGETS
+from scenario_space import (
+    DEFAULT_CHUNK_SIZE,
+    base_tables,
+    competition_ranks,
+    decode_outcomes,
+    fixture_team_indices,
+    iter_index_chunks,
+    scenario_tables,
+)
+
+TRAJECTORY_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def _percentiles(values, counts, percentiles):
+    """Inverse-CDF percentiles of sorted `values` occurring `counts` times each."""
+    cumulative = np.cumsum(counts)
+    ranks = np.ceil(np.asarray(percentiles) / 100 * cumulative[-1])
+    return values[np.searchsorted(cumulative, np.maximum(ranks, 1))]
+
+
+def _level_summary(values, counts, completions, percentiles):
+    """Percentiles plus clinched/eliminated shares for one team at one level."""
+    total = counts.sum()
+    return {
+        "percentiles": [
+            float(v) for v in _percentiles(values, counts, percentiles) / completions * 100
+        ],
+        "clinched": float(counts[values == completions].sum() / total * 100),
+        "eliminated": float(counts[values == 0].sum() / total * 100),
+    }
+
+
+def compute_trajectories(
+    initial_standings_arg,
+    fixtures_arg,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    percentiles=TRAJECTORY_PERCENTILES,
+):
+    """
+    Per team and Top-n target, the distribution of the qualification probability
+    after each number of matches played (0 to all of them). chunk_size is
+    rounded down to a power of two so chunks align with prefix blocks.
+    """
+    team_keys = list(initial_standings_arg.keys())
+    num_teams = len(team_keys)
+    num_fixtures = len(fixtures_arg)
+    base_points, base_wins = base_tables(initial_standings_arg, team_keys)
+    team_a, team_b = fixture_team_indices(team_keys, fixtures_arg)
+
+    chunk_bits = min(num_fixtures, chunk_size.bit_length() - 1)
+    outer_bits = num_fixtures - chunk_bits
+    # histograms[n][k][t, j]: k-fixture prefixes after which team t qualifies in
+    # j of the 2^(n-k) completions, for the levels k >= outer_bits.
+    histograms = {
+        n: {
+            k: np.zeros((num_teams, (1 << (num_fixtures - k)) + 1), dtype=np.int64)
+            for k in range(outer_bits, num_fixtures + 1)
+        }
+        for n in QUALIFICATION_TARGETS
+    }
+    chunk_totals = {
+        n: np.zeros((1 << outer_bits, num_teams), dtype=np.int64)
+        for n in QUALIFICATION_TARGETS
+    }
+
+    team_offsets = np.arange(num_teams)
+    for c, (lo, hi) in enumerate(iter_index_chunks(2**num_fixtures, 1 << chunk_bits)):
+        outcomes = decode_outcomes(np.arange(lo, hi, dtype=np.int64), num_fixtures)
+        points, _ = scenario_tables(outcomes, base_points, base_wins, team_a, team_b)
+        ranks = competition_ranks(points)
+        for n in QUALIFICATION_TARGETS:
+            sums = (ranks <= n).astype(np.int64)
+            for k in range(num_fixtures, outer_bits - 1, -1):
+                width = histograms[n][k].shape[1]
+                histograms[n][k] += np.bincount(
+                    (sums + team_offsets * width).ravel(), minlength=num_teams * width
+                ).reshape(num_teams, width)
+                if k > outer_bits:
+                    sums = sums.reshape(-1, 2, num_teams).sum(axis=1)
+            chunk_totals[n][c] = sums[0]
+
+    trajectories = {n: {team: [] for team in team_keys} for n in QUALIFICATION_TARGETS}
+    for n in QUALIFICATION_TARGETS:
+        levels = {}
+        sums = chunk_totals[n]
+        for k in range(outer_bits - 1, -1, -1):
+            sums = sums.reshape(-1, 2, num_teams).sum(axis=1)
+            levels[k] = sums
+        for k in range(num_fixtures + 1):
+            completions = 1 << (num_fixtures - k)
+            for t, team in enumerate(team_keys):
+                if k in levels:
+                    values, counts = np.unique(levels[k][:, t], return_counts=True)
+                else:
+                    counts = histograms[n][k][t]
+                    values = np.nonzero(counts)[0]
+                    counts = counts[values]
+                summary = _level_summary(values, counts, completions, percentiles)
+                summary["matches_played"] = k
+                trajectories[n][team].append(summary)
+
+    return {
+        "percentiles": list(percentiles),
+        "fixtures": [f"{a} vs {b}" for a, b in fixtures_arg],
+        "teams": trajectories,
+    }
@@ -0,0 +1,388 @@
+"""
+Per-scenario aggregates shared by the exhaustive and Monte Carlo engines.
+
+Engines hand every finished scenario's final points and wins to a
+``ScenarioAggregates`` instance (optionally with a weight, e.g. a multiplicity)
+and get artifact-ready sections back from ``results()``. Rows are buffered and
+folded in with numpy in batches, so the per-scenario cost inside the engines'
+Python loops is a single list append.
+"""
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+DEFAULT_BUFFER_SIZE = 4096
+
+TIEBREAK_POLICIES = ("optimistic", "neutral", "pessimistic")
+PLAYOFF_SPOTS = 4
+QUALIFICATION_TARGETS = (4, 2)
+MAX_LINEUP_TEAMS = 16  # Lineup counts are a dense array over 2^teams masks
+
+
+def points_ties(points):
+    """(greater, tied) per team of (scenarios, teams) points: teams strictly above, teams level (itself included)."""
+    points = np.asarray(points)
+    greater = (points[..., None, :] > points[..., :, None]).sum(axis=-1)
+    tied = (points[..., None, :] == points[..., :, None]).sum(axis=-1)
+    return greater, tied
+
+
+def qualifying_share(greater, tied, n, tie_policy="optimistic"):
+    """
+    Share of a finish (greater teams above, tied level) that lands in the top n
+    under tie_policy, one of TIEBREAK_POLICIES: 1 or 0 for optimistic and
+    pessimistic, the fraction of the tied positions inside the top n for neutral.
+    """
+    greater, tied = np.asarray(greater), np.asarray(tied)
+    if tie_policy == "optimistic":
+        return (greater < n).astype(np.float64)
+    if tie_policy == "pessimistic":
+        return (greater + tied <= n).astype(np.float64)
+    if tie_policy == "neutral":
+        return np.clip(n - greater, 0, tied) / tied
+    raise ValueError(f"Unknown tie policy {tie_policy!r}; expected one of {TIEBREAK_POLICIES}.")
+
+
+class ScenarioAggregates:
+    """
+    Accumulates a teams x positions histogram for three tie-break policies:
+      - optimistic: a team wins every points tie (the default tie_policy of
+        the engines in ipl_analysis_app), position = 1 + teams on strictly
+        more points.
+      - neutral: a points tie is shared evenly, each tied team takes every
+        tied position with equal probability.
+      - pessimistic: a team loses every points tie.
+      - nrr (only with a tie_resolver): ties straddling the Top 4 / Top 2
+        boundary are settled by projected net run rate; see nrr_tiebreak.
+    It also counts playoff lineups, hashed to a bitmask over team_keys and
+    counted in a dense array indexed by mask. A lineup is one joint top-4 set,
+    which only the neutral policy defines (optimistic and pessimistic are
+    per-team views that cannot all hold at once): teams above the 4th-place
+    points total are in, and every choice of the open spots among the teams
+    level on it is equally likely. So each team's lineup share (the diagonal
+    of co_qualification) is its neutral Top 4 chance. Finally it keeps the
+    points of the 4th- and 2nd-placed teams and, per team and final points
+    total, how often that team made the Top 4 / Top 2 under each policy.
+    """
+
+    def __init__(self, team_keys, buffer_size=DEFAULT_BUFFER_SIZE, tie_resolver=None):
+        self.team_keys = list(team_keys)
+        self.buffer_size = buffer_size
+        self.tie_resolver = tie_resolver
+        num_teams = len(self.team_keys)
+        self.total_weight = 0.0
+        self.optimistic_positions = np.zeros((num_teams, num_teams), dtype=np.float64)
+        self.pessimistic_positions = np.zeros((num_teams, num_teams), dtype=np.float64)
+        self.nrr_qualified = {n: np.zeros(num_teams) for n in QUALIFICATION_TARGETS}
+        # Difference array: neutral mass is spread over a contiguous position range.
+        self._neutral_diff = np.zeros((num_teams, num_teams + 1), dtype=np.float64)
+        self.lineup_counts = (
+            np.zeros(1 << num_teams, dtype=np.float64)
+            if num_teams <= MAX_LINEUP_TEAMS
+            else None
+        )
+        # Points-indexed tables, grown on demand: cutoff_points[n][p] is the weight of
+        # scenarios whose n-th placed team ends on p points; points_totals[t, p] the
+        # weight with team t on p points and points_qualified[policy][n] the share
+        # of that in which t finished in the top n.
+        self.cutoff_points = {n: np.zeros(0) for n in QUALIFICATION_TARGETS}
+        self.points_totals = np.zeros((num_teams, 0))
+        self.points_qualified = {
+            policy: {n: np.zeros((num_teams, 0)) for n in QUALIFICATION_TARGETS}
+            for policy in TIEBREAK_POLICIES
+        }
+        self._points_buffer = []
+        self._wins_buffer = []
+        self._weight_buffer = []
+
+    def _grow_points_tables(self, max_points):
+        size = max_points + 1
+        current = self.points_totals.shape[1]
+        if size <= current:
+            return
+        pad = size - current
+        self.cutoff_points = {
+            n: np.pad(counts, (0, pad)) for n, counts in self.cutoff_points.items()
+        }
+        self.points_totals = np.pad(self.points_totals, ((0, 0), (0, pad)))
+        for by_target in self.points_qualified.values():
+            for n in by_target:
+                by_target[n] = np.pad(by_target[n], ((0, 0), (0, pad)))
+
+    def add(self, points_row, wins_row, weight=1):
+        """Records one scenario: final points and wins per team, ordered like team_keys."""
+        self._points_buffer.append(points_row)
+        self._wins_buffer.append(wins_row)
+        self._weight_buffer.append(weight)
+        if len(self._points_buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self._points_buffer:
+            return
+        points = np.array(self._points_buffer, dtype=np.int32)
+        wins = np.array(self._wins_buffer, dtype=np.int32)
+        weights = np.array(self._weight_buffer, dtype=np.float64)
+        self._points_buffer = []
+        self._wins_buffer = []
+        self._weight_buffer = []
+        self.add_batch(points, wins, weights)
+
+    def add_batch(self, points, wins, weights=None):
+        """Records (scenarios, teams) points/wins arrays, optionally weighted per scenario."""
+        points = np.asarray(points)
+        wins = np.asarray(wins)
+        num_scenarios, num_teams = points.shape
+        if weights is None:
+            weights = np.ones(num_scenarios, dtype=np.float64)
+        weights = np.asarray(weights, dtype=np.float64)
+        self.total_weight += float(weights.sum())
+
+        greater = (points[:, None, :] > points[:, :, None]).sum(axis=2)
+        tied = (points[:, None, :] == points[:, :, None]).sum(axis=2)  # includes self
+        team_weights = np.broadcast_to(weights[:, None], (num_scenarios, num_teams))
+
+        # Flattened (team, position) cells so each histogram is a single bincount.
+        row = np.arange(num_teams) * num_teams
+        self.optimistic_positions += np.bincount(
+            (row + greater).ravel(), weights=team_weights.ravel(), minlength=num_teams**2
+        ).reshape(num_teams, num_teams)
+        self.pessimistic_positions += np.bincount(
+            (row + greater + tied - 1).ravel(),
+            weights=team_weights.ravel(),
+            minlength=num_teams**2,
+        ).reshape(num_teams, num_teams)
+        share = (team_weights / tied).ravel()
+        diff_row = np.arange(num_teams) * (num_teams + 1)
+        diff_size = num_teams * (num_teams + 1)
+        self._neutral_diff += (
+            np.bincount((diff_row + greater).ravel(), weights=share, minlength=diff_size)
+            - np.bincount((diff_row + greater + tied).ravel(), weights=share, minlength=diff_size)
+        ).reshape(num_teams, num_teams + 1)
+
+        if self.tie_resolver is not None:
+            self._add_nrr_qualification(points, wins, greater, tied, weights)
+
+        # Points thresholds: n-th placed team's points, and qualification by own points.
+        self._grow_points_tables(int(points.max()))
+        size = self.points_totals.shape[1]
+        sorted_points = -np.sort(-points, axis=1)
+        cells = (np.arange(num_teams) * size + points).ravel()
+        self.points_totals += np.bincount(
+            cells, weights=team_weights.ravel(), minlength=num_teams * size
+        ).reshape(num_teams, size)
+        for n in QUALIFICATION_TARGETS:
+            if n > num_teams:
+                continue
+            self.cutoff_points[n] += np.bincount(
+                sorted_points[:, n - 1], weights=weights, minlength=size
+            )
+            qualified = {
+                "optimistic": (greater < n).astype(np.float64),
+                "neutral": np.clip((n - greater) / tied, 0, 1),
+                "pessimistic": (greater + tied <= n).astype(np.float64),
+            }
+            for policy, share_qualified in qualified.items():
+                self.points_qualified[policy][n] += np.bincount(
+                    cells,
+                    weights=(share_qualified * team_weights).ravel(),
+                    minlength=num_teams * size,
+                ).reshape(num_teams, size)
+
+        if self.lineup_counts is not None:
+            self._add_lineups(points, sorted_points, weights)
+
+    def _add_lineups(self, points, sorted_points, weights):
+        """Neutral lineups: the open spots are shared evenly among the teams level at the cut."""
+        num_teams = points.shape[1]
+        spots = min(PLAYOFF_SPOTS, num_teams)
+        cut = sorted_points[:, [spots - 1]]
+        bits = np.int64(1) << np.arange(num_teams, dtype=np.int64)
+        above = ((points > cut) * bits).sum(axis=1)
+        level = ((points == cut) * bits).sum(axis=1)
+        # Resolve each distinct (above, level) situation once.
+        keys, inverse = np.unique(np.column_stack([above, level]), axis=0, return_inverse=True)
+        key_weights = np.bincount(inverse.ravel(), weights=weights, minlength=len(keys))
+        for (above_mask, level_mask), weight in zip(keys, key_weights):
+            level_bits = [int(b) for b in bits if level_mask & b]
+            open_spots = spots - bin(int(above_mask)).count("1")
+            share = weight / comb(len(level_bits), open_spots)
+            for chosen in combinations(level_bits, open_spots):
+                self.lineup_counts[int(above_mask) + sum(chosen)] += share
+
+    def _add_nrr_qualification(self, points, wins, greater, tied, weights):
+        """Top-n weight with NRR tie-breaks; only boundary-straddling ties reach the resolver."""
+        for n in QUALIFICATION_TARGETS:
+            qualified = (greater + tied <= n).astype(np.float64)
+            straddling = (greater < n) & (greater + tied > n)
+            rows = np.nonzero(straddling.any(axis=1))[0]
+            if len(rows):
+                # At most one points group straddles a given boundary, so a tie
+                # situation is (group, group wins, open slots): resolve each
+                # distinct one once and scatter it back to its rows.
+                in_group = straddling[rows]
+                slots = n - np.where(in_group, greater[rows], n).min(axis=1)
+                keys = np.column_stack([in_group, np.where(in_group, wins[rows], -1), slots])
+                _, first, inverse = np.unique(
+                    keys, axis=0, return_index=True, return_inverse=True
+                )
+                shares = np.zeros(in_group.shape)
+                for s, i in enumerate(first):
+                    group = np.nonzero(in_group[i])[0]
+                    shares[s, group] = self.tie_resolver.slot_shares(
+                        group, wins[rows[i]], int(slots[i])
+                    )
+                qualified[rows] = np.where(in_group, shares[inverse.ravel()], qualified[rows])
+            self.nrr_qualified[n] += weights @ qualified
+
+    def state(self):
+        """Accumulated state as a flat {name: array} dict, e.g. for a checkpoint."""
+        self.flush()
+        state = {
+            "total_weight": np.array(self.total_weight),
+            "optimistic_positions": self.optimistic_positions,
+            "pessimistic_positions": self.pessimistic_positions,
+            "neutral_diff": self._neutral_diff,
+            "points_totals": self.points_totals,
+        }
+        if self.lineup_counts is not None:
+            state["lineup_counts"] = self.lineup_counts
+        for n in QUALIFICATION_TARGETS:
+            state[f"cutoff_points/{n}"] = self.cutoff_points[n]
+            state[f"nrr_qualified/{n}"] = self.nrr_qualified[n]
+            for policy in TIEBREAK_POLICIES:
+                state[f"points_qualified/{policy}/{n}"] = self.points_qualified[policy][n]
+        return {name: np.array(value) for name, value in state.items()}
+
+    def load_state(self, state):
+        """Restores what state() returned; pending buffered rows are discarded."""
+        self._points_buffer = []
+        self._wins_buffer = []
+        self._weight_buffer = []
+        self.total_weight = float(state["total_weight"])
+        self.optimistic_positions = np.array(state["optimistic_positions"])
+        self.pessimistic_positions = np.array(state["pessimistic_positions"])
+        self._neutral_diff = np.array(state["neutral_diff"])
+        self.points_totals = np.array(state["points_totals"])
+        if self.lineup_counts is not None:
+            self.lineup_counts = np.array(state["lineup_counts"])
+        for n in QUALIFICATION_TARGETS:
+            self.cutoff_points[n] = np.array(state[f"cutoff_points/{n}"])
+            self.nrr_qualified[n] = np.array(state[f"nrr_qualified/{n}"])
+            for policy in TIEBREAK_POLICIES:
+                self.points_qualified[policy][n] = np.array(
+                    state[f"points_qualified/{policy}/{n}"]
+                )
+
+    def position_histograms(self):
+        """{policy: (teams, positions) array of accumulated weight}."""
+        self.flush()
+        return {
+            "optimistic": self.optimistic_positions.copy(),
+            # Clip float noise left over from cancelling +share/-share terms.
+            "neutral": np.clip(np.cumsum(self._neutral_diff, axis=1)[:, :-1], 0, None),
+            "pessimistic": self.pessimistic_positions.copy(),
+        }
+
+    def results(self):
+        """Artifact sections (percentages, like overall_probabilities)."""
+        histograms = self.position_histograms()
+        if self.total_weight == 0:
+            return {}
+        positions = np.arange(1, len(self.team_keys) + 1)
+        distribution = {}
+        expected = {}
+        tiebreak_range = {}
+        for policy in TIEBREAK_POLICIES:
+            shares = histograms[policy] / self.total_weight
+            distribution[policy] = {
+                team: [100 * float(p) for p in shares[i]]
+                for i, team in enumerate(self.team_keys)
+            }
+            expected[policy] = {
+                team: float(shares[i] @ positions)
+                for i, team in enumerate(self.team_keys)
+            }
+            # Same shape as overall_probabilities, one block per policy.
+            tiebreak_range[policy] = {
+                team: {
+                    f"Top {n} Probability": 100 * float(shares[i][:n].sum())
+                    for n in QUALIFICATION_TARGETS
+                }
+                for i, team in enumerate(self.team_keys)
+            }
+        if self.tie_resolver is not None:
+            tiebreak_range["nrr"] = {
+                team: {
+                    f"Top {n} Probability": 100
+                    * float(self.nrr_qualified[n][i] / self.total_weight)
+                    for n in QUALIFICATION_TARGETS
+                }
+                for i, team in enumerate(self.team_keys)
+            }
+        sections = {
+            "position_distribution": distribution,
+            "expected_position": expected,
+            "tiebreak_range": tiebreak_range,
+        }
+        if self.lineup_counts is not None:
+            sections.update(self._lineup_sections())
+        sections["points_thresholds"] = self._threshold_section()
+        return sections
+
+    def _threshold_section(self):
+        """Cutoff-points distributions and P(qualify | final points) per team."""
+        cutoff_points = {
+            str(n): {
+                str(p): 100 * float(weight / self.total_weight)
+                for p, weight in enumerate(counts)
+                if weight > 0
+            }
+            for n, counts in self.cutoff_points.items()
+            if counts.any()
+        }
+        qualification_by_points = {
+            policy: {
+                str(n): {
+                    team: {
+                        str(p): 100 * float(qualified[t, p] / self.points_totals[t, p])
+                        for p in np.nonzero(self.points_totals[t])[0]
+                    }
+                    for t, team in enumerate(self.team_keys)
+                }
+                for n, qualified in by_target.items()
+                if n <= len(self.team_keys)
+            }
+            for policy, by_target in self.points_qualified.items()
+        }
+        return {
+            "cutoff_points": cutoff_points,
+            "qualification_by_points": qualification_by_points,
+        }
+
+    def _lineup_sections(self):
+        """Distinct playoff lineups and the team x team co-qualification matrix."""
+        num_teams = len(self.team_keys)
+        masks = np.nonzero(self.lineup_counts)[0]
+        shares = self.lineup_counts[masks] / self.total_weight
+        membership = ((masks[:, None] >> np.arange(num_teams)) & 1).astype(np.float64)
+
+        lineups = [
+            {
+                "teams": [self.team_keys[t] for t in np.nonzero(row)[0]],
+                "probability": 100 * float(share),
+            }
+            for row, share in zip(membership, shares)
+        ]
+        lineups.sort(key=lambda lineup: -lineup["probability"])
+
+        co_qualified = membership.T @ (membership * shares[:, None])
+        co_qualification = {
+            team_a: {
+                team_b: 100 * float(co_qualified[i, j])
+                for j, team_b in enumerate(self.team_keys)
+            }
+            for i, team_a in enumerate(self.team_keys)
+        }
+        return {"playoff_lineups": lineups, "co_qualification": co_qualification}
@@ -0,0 +1,257 @@
+"""
+Compressed bitmap index over the exhaustive scenario space.
+
+Every fixture outcome ("Mumbai beat Lucknow") and every per-team event
+("Chennai finishes top 4") becomes a bitmap with one bit per scenario, in the
+enumeration order of ``scenario_space``. Bitmaps are split into
+65,536-scenario containers that are stored as all-zero / all-one markers when
+uniform and as packed bytes otherwise (identical dense containers are shared),
+so arbitrary questions reduce to AND / OR / NOT plus a popcount.
+"""
+import numpy as np
+
+from scenario_space import (
+    base_tables,
+    competition_ranks,
+    decode_outcomes,
+    fixture_team_indices,
+    iter_index_chunks,
+    scenario_tables,
+)
+
+CONTAINER_BITS = 1 << 16
+DEFAULT_TOP_KS = (1, 2, 3, 4)
+
+_ZEROS = "zeros"
+_ONES = "ones"
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _tail_mask(num_bits):
+    """Byte mask that keeps only the first num_bits bits of a packed container."""
+    mask = np.zeros((num_bits + 7) // 8, dtype=np.uint8)
+    mask[: num_bits // 8] = 0xFF
+    if num_bits % 8:
+        mask[-1] = (0xFF << (8 - num_bits % 8)) & 0xFF
+    return mask
+
+
+class Bitmap:
+    """Immutable bitmap over `size` scenarios, stored as a list of containers."""
+
+    def __init__(self, containers, size):
+        self.containers = containers
+        self.size = size
+
+    def _lengths(self):
+        for i in range(len(self.containers)):
+            yield min(CONTAINER_BITS, self.size - i * CONTAINER_BITS)
+
+    @staticmethod
+    def _normalize(dense, num_bits):
+        if not dense.any():
+            return _ZEROS
+        if np.array_equal(dense, _tail_mask(num_bits)):
+            return _ONES
+        return dense
+
+    def _combine(self, other, op):
+        if self.size != other.size:
+            raise ValueError("Bitmaps cover different scenario spaces.")
+        combined = []
+        for a, b, num_bits in zip(self.containers, other.containers, self._lengths()):
+            if op == "and":
+                if a is _ZEROS or b is _ZEROS:
+                    combined.append(_ZEROS)
+                elif a is _ONES or b is _ONES:
+                    combined.append(b if a is _ONES else a)
+                else:
+                    combined.append(self._normalize(a & b, num_bits))
+            else:
+                if a is _ONES or b is _ONES:
+                    combined.append(_ONES)
+                elif a is _ZEROS or b is _ZEROS:
+                    combined.append(b if a is _ZEROS else a)
+                else:
+                    combined.append(self._normalize(a | b, num_bits))
+        return Bitmap(combined, self.size)
+
+    def __and__(self, other):
+        return self._combine(other, "and")
+
+    def __or__(self, other):
+        return self._combine(other, "or")
+
+    def __invert__(self):
+        inverted = []
+        for container, num_bits in zip(self.containers, self._lengths()):
+            if container is _ZEROS:
+                inverted.append(_ONES)
+            elif container is _ONES:
+                inverted.append(_ZEROS)
+            else:
+                inverted.append(~container & _tail_mask(num_bits))
+        return Bitmap(inverted, self.size)
+
+    def count(self):
+        """Number of scenarios in the set (popcount)."""
+        total = 0
+        for container, num_bits in zip(self.containers, self._lengths()):
+            if container is _ONES:
+                total += num_bits
+            elif container is not _ZEROS:
+                total += int(_POPCOUNT[container].sum(dtype=np.int64))
+        return total
+
+    @property
+    def nbytes(self):
+        return sum(c.nbytes for c in self.containers if isinstance(c, np.ndarray))
+
+
+class ScenarioBitmapIndex:
+    """Per-fixture outcome bitmaps and per-team "finished top-k" bitmaps."""
+
+    def __init__(self, teams, fixtures, top_ks, fixture_bitmaps, top_bitmaps, size):
+        self.teams = list(teams)
+        self.fixtures = [tuple(match) for match in fixtures]
+        self.top_ks = tuple(top_ks)
+        self.size = size
+        self._fixture_bitmaps = fixture_bitmaps  # [fixture_index] -> team_a-won Bitmap
+        self._top_bitmaps = top_bitmaps  # {(team, k): Bitmap}
+
+    @classmethod
+    def build(cls, initial_standings_arg, fixtures_arg, top_ks=DEFAULT_TOP_KS):
+        """Walks every scenario once, container by container, and builds all bitmaps."""
+        team_keys = list(initial_standings_arg.keys())
+        num_fixtures = len(fixtures_arg)
+        total_scenarios = 2**num_fixtures
+        base_points, base_wins = base_tables(initial_standings_arg, team_keys)
+        team_a, team_b = fixture_team_indices(team_keys, fixtures_arg)
+
+        builder = _BitmapBuilder()
+        fixture_containers = [[] for _ in fixtures_arg]
+        top_containers = {(team, k): [] for team in team_keys for k in top_ks}
+
+        for lo, hi in iter_index_chunks(total_scenarios, CONTAINER_BITS):
+            outcomes = decode_outcomes(np.arange(lo, hi, dtype=np.int64), num_fixtures)
+            points, _ = scenario_tables(outcomes, base_points, base_wins, team_a, team_b)
+            ranks = competition_ranks(points)
+            for j in range(num_fixtures):
+                fixture_containers[j].append(builder.container(outcomes[:, j]))
+            for t, team in enumerate(team_keys):
+                for k in top_ks:
+                    top_containers[(team, k)].append(builder.container(ranks[:, t] <= k))
+
+        return cls(
+            team_keys,
+            fixtures_arg,
+            top_ks,
+            [Bitmap(c, total_scenarios) for c in fixture_containers],
+            {key: Bitmap(c, total_scenarios) for key, c in top_containers.items()},
+            total_scenarios,
+        )
+
+    @classmethod
+    def from_store(cls, store, top_ks=DEFAULT_TOP_KS):
+        """Builds the index from a ScenarioStore instead of re-walking the scenarios."""
+        builder = _BitmapBuilder()
+        size = len(store)
+        num_fixtures = len(store.fixtures)
+        order = np.argsort(store.records["outcome"], kind="stable")
+        fixture_containers = [[] for _ in store.fixtures]
+        top_containers = {(team, k): [] for team in store.teams for k in top_ks}
+        team_ranks = {team: store.ranks(team)[order] for team in store.teams}
+        outcome_ids = store.records["outcome"][order].astype(np.int64)
+
+        for lo, hi in iter_index_chunks(size, CONTAINER_BITS):
+            for j in range(num_fixtures):
+                bits = (outcome_ids[lo:hi] >> (num_fixtures - 1 - j)) & 1
+                fixture_containers[j].append(builder.container(bits))
+            for team in store.teams:
+                for k in top_ks:
+                    top_containers[(team, k)].append(
+                        builder.container(team_ranks[team][lo:hi] <= k)
+                    )
+
+        return cls(
+            store.teams,
+            store.fixtures,
+            top_ks,
+            [Bitmap(c, size) for c in fixture_containers],
+            {key: Bitmap(c, size) for key, c in top_containers.items()},
+            size,
+        )
+
+    # --- Query API ---
+    def all(self):
+        """Every scenario."""
+        num_containers = -(-self.size // CONTAINER_BITS)
+        return Bitmap([_ONES] * num_containers, self.size)
+
+    def fixture(self, fixture_index, winner):
+        """Scenarios in which `winner` wins fixture `fixture_index`."""
+        team_a, team_b = self.fixtures[fixture_index]
+        if winner == team_a:
+            return self._fixture_bitmaps[fixture_index]
+        if winner == team_b:
+            return ~self._fixture_bitmaps[fixture_index]
+        raise ValueError(
+            f"{winner} does not play in fixture {fixture_index} ({team_a} vs {team_b})."
+        )
+
+    def top(self, team, k):
+        """Scenarios in which `team` finishes in the top k (winning points ties)."""
+        try:
+            return self._top_bitmaps[(team, k)]
+        except KeyError:
+            raise ValueError(
+                f"No top-{k} bitmap for {team}; index was built for top_ks={self.top_ks}."
+            ) from None
+
+    def conditions(self, results):
+        """AND of fixture bitmaps for {fixture_index: winning_team}."""
+        bitmap = self.all()
+        for fixture_index, winner in results.items():
+            bitmap = bitmap & self.fixture(fixture_index, winner)
+        return bitmap
+
+    def lineup(self, teams, k=4):
+        """Scenarios in which exactly `teams` (and no one else) finish top k."""
+        bitmap = self.all()
+        for team in self.teams:
+            bitmap = bitmap & (self.top(team, k) if team in teams else ~self.top(team, k))
+        return bitmap
+
+    def probability(self, event, given=None):
+        """Percentage of the `given` scenarios (default: all) that are in `event`."""
+        if given is None:
+            return 100 * event.count() / self.size
+        given_count = given.count()
+        if given_count == 0:
+            return None
+        return 100 * (event & given).count() / given_count
+
+    @property
+    def nbytes(self):
+        seen = {}
+        for bitmap in list(self._top_bitmaps.values()) + self._fixture_bitmaps:
+            for container in bitmap.containers:
+                if isinstance(container, np.ndarray):
+                    seen[id(container)] = container.nbytes
+        return sum(seen.values())
+
+
+class _BitmapBuilder:
+    """Packs boolean slices into containers, sharing identical dense ones."""
+
+    def __init__(self):
+        self._interned = {}
+
+    def container(self, bits):
+        bits = np.asarray(bits, dtype=bool)
+        if not bits.any():
+            return _ZEROS
+        if bits.all():
+            return _ONES
+        packed = np.packbits(bits)
+        return self._interned.setdefault(packed.tobytes(), packed)
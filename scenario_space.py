@@ -0,0 +1,126 @@
+"""
+Vectorised helpers for walking the exhaustive scenario space.
+
+Scenario ``i`` over ``n`` fixtures is the ``i``-th tuple produced by
+``itertools.product([0, 1], repeat=n)``. Fixture 0 is the most significant bit
+and a result of 1 means the first-named team wins, so scenario indices computed
+here line up exactly with the ones the pure-Python engines enumerate.
+"""
+import hashlib
+import json
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 1 << 16  # Scenarios decoded per vectorised step
+
+
+def compute_input_hash(standings, fixtures, **config):
+    """Stable SHA-256 of the standings, fixture list and any engine settings.
+
+    Used to decide whether persisted results still describe the current inputs.
+    """
+    payload = {
+        "standings": {
+            team: {k: stats[k] for k in ("Matches", "Wins", "Points", "NRR") if k in stats}
+            for team, stats in sorted(standings.items())
+        },
+        "fixtures": [list(match) for match in fixtures],
+        "config": config,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def group_fixtures(fixtures):
+    """
+    Groups fixture indices by the pair of teams playing, regardless of home/away
+    order. Returns [((team_a, team_b), [fixture indices])] in first-appearance
+    order, with team_a/team_b named as in the pair's first fixture.
+    """
+    groups = {}
+    for j, (team_a, team_b) in enumerate(fixtures):
+        key = frozenset((team_a, team_b))
+        if key not in groups:
+            groups[key] = ((team_a, team_b), [])
+        groups[key][1].append(j)
+    return list(groups.values())
+
+
+def fixture_team_indices(team_keys, fixtures):
+    """Maps each fixture to (team_a index, team_b index) arrays over team_keys."""
+    position = {team: i for i, team in enumerate(team_keys)}
+    team_a = np.array([position[a] for a, _ in fixtures], dtype=np.intp)
+    team_b = np.array([position[b] for _, b in fixtures], dtype=np.intp)
+    return team_a, team_b
+
+
+def base_tables(standings, team_keys):
+    """Current (points, wins) as int32 arrays ordered like team_keys."""
+    points = np.array([standings[t]["Points"] for t in team_keys], dtype=np.int32)
+    wins = np.array([standings[t]["Wins"] for t in team_keys], dtype=np.int32)
+    return points, wins
+
+
+def iter_index_chunks(total, chunk_size=DEFAULT_CHUNK_SIZE, start=0):
+    """Yields (lo, hi) half-open scenario index ranges covering [start, total)."""
+    for lo in range(start, total, chunk_size):
+        yield lo, min(lo + chunk_size, total)
+
+
+# Odd 64-bit constants: multiplying by one is a bijection modulo any power of two.
+PERMUTATION_MULTIPLIERS = (0x9E3779B97F4A7C15, 0xBF58476D1CE4E5B9, 0x94D049BB133111EB)
+
+
+def permutation_key(seed=None):
+    """Random key for permute_indices: an offset plus one xor key per mixing round."""
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 2**63, size=1 + len(PERMUTATION_MULTIPLIERS), dtype=np.uint64)
+
+
+def permute_indices(positions, num_fixtures, key):
+    """
+    Scenario index at each position of a keyed pseudo-random order of all
+    2**num_fixtures scenarios. The map is a bijection (offset, then rounds of
+    xor / odd multiply / xorshift, all modulo 2**num_fixtures), so walking
+    positions 0, 1, ... still visits every scenario exactly once. Because of the
+    random offset, every scenario is equally likely to sit at any position, so
+    tallies over a prefix are unbiased estimates of the full enumeration.
+    """
+    mask = np.uint64((1 << num_fixtures) - 1)
+    shift = np.uint64(max(1, (num_fixtures + 1) // 2))
+    x = (np.asarray(positions, dtype=np.uint64) + key[0]) & mask
+    for round_key, multiplier in zip(key[1:], PERMUTATION_MULTIPLIERS):
+        x = ((x ^ round_key) * np.uint64(multiplier)) & mask
+        x ^= x >> shift
+    return x.astype(np.int64)
+
+
+def decode_outcomes(indices, num_fixtures):
+    """Decodes scenario indices into a (len(indices), num_fixtures) uint8 array."""
+    indices = np.asarray(indices, dtype=np.int64)
+    shifts = np.arange(num_fixtures - 1, -1, -1, dtype=np.int64)
+    return ((indices[:, None] >> shifts) & 1).astype(np.uint8)
+
+
+def scenario_tables(outcomes, base_points, base_wins, team_a, team_b):
+    """Final (points, wins) arrays of shape (scenarios, teams) for decoded outcomes."""
+    num_fixtures = outcomes.shape[1]
+    num_teams = base_points.shape[0]
+    a_wins = np.zeros((num_fixtures, num_teams), dtype=np.int32)
+    b_wins = np.zeros((num_fixtures, num_teams), dtype=np.int32)
+    a_wins[np.arange(num_fixtures), team_a] = 1
+    b_wins[np.arange(num_fixtures), team_b] = 1
+    outcomes = outcomes.astype(np.int32)
+    extra_wins = outcomes @ a_wins + (1 - outcomes) @ b_wins
+    return base_points + 2 * extra_wins, base_wins + extra_wins
+
+
+def competition_ranks(points):
+    """1-based rank of every team: one plus the number of teams on strictly more points.
+
+    This is the position each team gets when it wins every points tie, i.e. the
+    tie-break ``run_exhaustive_analysis_once`` applies to the analysed team, so
+    ``rank <= n`` reproduces its Top-n test for every team at once.
+    """
+    greater = points[:, None, :] > points[:, :, None]
+    return 1 + greater.sum(axis=2, dtype=np.int32)
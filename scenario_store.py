@@ -0,0 +1,192 @@
+"""
+Bit-packed, memory-mapped store of every exhaustive scenario.
+
+Each record holds the scenario's outcome index (see ``scenario_space``) and the
+final competition rank of every team packed into 4-bit nibbles, so a 2^23
+scenario season with 10 teams takes ~75 MB on disk. The store is written once
+by ``precompute_analysis.py --scenario-store`` and can then be re-opened by any
+process to answer new questions with vectorised filters instead of a re-run.
+"""
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from scenario_space import (
+    DEFAULT_CHUNK_SIZE,
+    base_tables,
+    competition_ranks,
+    compute_input_hash,
+    decode_outcomes,
+    fixture_team_indices,
+    iter_index_chunks,
+    scenario_tables,
+)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCENARIO_STORE_FILE = os.path.join(BASE_DIR, "scenario_store.npy")
+MAX_STORE_FIXTURES = 32  # Outcome index is stored as uint32
+MAX_STORE_TEAMS = 16  # Ranks must fit in a nibble
+
+
+def metadata_path(store_path):
+    """Path of the JSON sidecar describing a store file."""
+    return os.path.splitext(store_path)[0] + ".json"
+
+
+def record_dtype(num_teams):
+    """Structured dtype: uint32 outcome index + one rank nibble per team."""
+    return np.dtype([("outcome", "<u4"), ("ranks", "u1", ((num_teams + 1) // 2,))])
+
+
+def pack_ranks(ranks):
+    """Packs a (scenarios, teams) array of 1-based ranks into nibble bytes."""
+    zero_based = (ranks - 1).astype(np.uint8)
+    if zero_based.shape[1] % 2:
+        zero_based = np.pad(zero_based, ((0, 0), (0, 1)))
+    return zero_based[:, 0::2] | (zero_based[:, 1::2] << 4)
+
+
+def unpack_rank(packed, team_index):
+    """1-based ranks for one team from a (scenarios, bytes) packed array."""
+    byte = packed[:, team_index // 2]
+    nibble = (byte >> 4) if team_index % 2 else (byte & 0x0F)
+    return nibble + 1
+
+
+def build_scenario_store(
+    initial_standings_arg,
+    fixtures_arg,
+    store_path=SCENARIO_STORE_FILE,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+):
+    """
+    Enumerates every scenario once and writes its packed record to store_path.
+    Returns the opened ScenarioStore.
+    """
+    team_keys = list(initial_standings_arg.keys())
+    num_fixtures = len(fixtures_arg)
+    if num_fixtures > MAX_STORE_FIXTURES:
+        raise ValueError(
+            f"Scenario store supports at most {MAX_STORE_FIXTURES} fixtures, got {num_fixtures}."
+        )
+    if len(team_keys) > MAX_STORE_TEAMS:
+        raise ValueError(
+            f"Scenario store supports at most {MAX_STORE_TEAMS} teams, got {len(team_keys)}."
+        )
+
+    total_scenarios = 2**num_fixtures
+    base_points, base_wins = base_tables(initial_standings_arg, team_keys)
+    team_a, team_b = fixture_team_indices(team_keys, fixtures_arg)
+
+    # Write to a temporary file and only publish it (plus its metadata) once
+    # complete, so a killed run never leaves a half-written store behind.
+    tmp_path = store_path + ".tmp"
+    records = np.lib.format.open_memmap(
+        tmp_path, mode="w+", dtype=record_dtype(len(team_keys)), shape=(total_scenarios,)
+    )
+    for lo, hi in iter_index_chunks(total_scenarios, chunk_size):
+        indices = np.arange(lo, hi, dtype=np.int64)
+        outcomes = decode_outcomes(indices, num_fixtures)
+        points, _ = scenario_tables(outcomes, base_points, base_wins, team_a, team_b)
+        records["outcome"][lo:hi] = indices
+        records["ranks"][lo:hi] = pack_ranks(competition_ranks(points))
+    records.flush()
+    del records
+
+    # Retire the old metadata before publishing the new store, and publish the
+    # new metadata last (atomically). An interruption at any point leaves either
+    # the old pair, the new pair, or a store without metadata, which
+    # load_scenario_store rejects; never a store described by stale metadata.
+    if os.path.exists(metadata_path(store_path)):
+        os.remove(metadata_path(store_path))
+    os.replace(tmp_path, store_path)
+
+    metadata = {
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "input_hash": compute_input_hash(initial_standings_arg, fixtures_arg),
+        "teams": team_keys,
+        "fixtures": [list(match) for match in fixtures_arg],
+        "num_scenarios": total_scenarios,
+        "rank_policy": "competition (team wins points ties)",
+    }
+    tmp_metadata = metadata_path(store_path) + ".tmp"
+    with open(tmp_metadata, "w") as f:
+        json.dump(metadata, f, indent=4)
+    os.replace(tmp_metadata, metadata_path(store_path))
+
+    return ScenarioStore(store_path)
+
+
+class ScenarioStore:
+    """Read-only, memory-mapped view over a store written by build_scenario_store."""
+
+    def __init__(self, store_path=SCENARIO_STORE_FILE):
+        with open(metadata_path(store_path), "r") as f:
+            self.metadata = json.load(f)
+        self.records = np.load(store_path, mmap_mode="r")
+        if self.records.shape[0] != self.metadata.get("num_scenarios"):
+            raise ValueError(f"{store_path} does not match its metadata.")
+        self.teams = self.metadata["teams"]
+        self.fixtures = [tuple(match) for match in self.metadata["fixtures"]]
+        self._team_index = {team: i for i, team in enumerate(self.teams)}
+
+    def __len__(self):
+        return self.records.shape[0]
+
+    def matches_inputs(self, initial_standings_arg, fixtures_arg):
+        """True if the store was built from exactly these standings and fixtures."""
+        return self.metadata.get("input_hash") == compute_input_hash(
+            initial_standings_arg, fixtures_arg
+        )
+
+    def ranks(self, team):
+        """1-based competition rank of team in every stored scenario."""
+        return unpack_rank(self.records["ranks"], self._team_index[team])
+
+    def fixture_results(self, fixture_index):
+        """1 where the first-named team won fixture_index, else 0, per scenario."""
+        shift = len(self.fixtures) - 1 - fixture_index
+        return (self.records["outcome"] >> shift) & 1
+
+    def select(self, results=None, top_n=None):
+        """
+        Boolean mask of scenarios matching every condition.
+        results: {fixture_index: winning_team}; top_n: {team: n} (team finishes top n).
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for fixture_index, winner in (results or {}).items():
+            team_a, team_b = self.fixtures[fixture_index]
+            if winner not in (team_a, team_b):
+                raise ValueError(
+                    f"{winner} does not play in fixture {fixture_index} ({team_a} vs {team_b})."
+                )
+            mask &= self.fixture_results(fixture_index) == (1 if winner == team_a else 0)
+        for team, n in (top_n or {}).items():
+            mask &= self.ranks(team) <= n
+        return mask
+
+    def probability(self, team, top_n, results=None):
+        """Percentage of (matching) scenarios in which team finishes in the top_n."""
+        mask = self.select(results)
+        matching = int(mask.sum())
+        if matching == 0:
+            return 0.0
+        qualified = int(np.count_nonzero(self.ranks(team)[mask] <= top_n))
+        return 100 * qualified / matching
+
+
+def load_scenario_store(
+    initial_standings_arg, fixtures_arg, store_path=SCENARIO_STORE_FILE
+):
+    """Opens the store if it exists and matches the given inputs, else returns None."""
+    if not (os.path.exists(store_path) and os.path.exists(metadata_path(store_path))):
+        return None
+    try:
+        store = ScenarioStore(store_path)
+    except (OSError, ValueError, KeyError, json.JSONDecodeError):
+        return None
+    if not store.matches_inputs(initial_standings_arg, fixtures_arg):
+        return None
+    return store
@@ -0,0 +1,90 @@
+"""
+Team symmetries of the current standings plus remaining fixtures.
+
+If two teams have identical standings and swapping them maps the multiset of
+remaining pairings onto itself, every scenario has a mirror image in which the
+two teams' fortunes are exchanged. ``FixtureSymmetry`` finds all such team
+permutations and lets an engine analyse one canonical scenario per orbit,
+replaying its per-team results onto the other orbit members by relabelling.
+
+Scenarios are the per-pair win counts enumerated by run_exhaustive_analysis_once
+(see ``scenario_space.group_fixtures``).
+"""
+from itertools import permutations, product
+from math import factorial, prod
+
+SIGNATURE_KEYS = ("Matches", "Wins", "Points", "NRR")
+MAX_SYMMETRY_CANDIDATES = 5040  # Candidate permutations checked before giving up
+
+
+class FixtureSymmetry:
+    """The non-trivial automorphism group of a (standings, fixture groups) pair."""
+
+    def __init__(self, team_perms, group_maps):
+        self.team_perms = team_perms  # [{team: image team}], identity first
+        self.group_maps = group_maps  # [[(image group index, flipped)] per group]
+
+    def __len__(self):
+        return len(self.team_perms)
+
+    @classmethod
+    def detect(cls, initial_standings_arg, fixture_groups):
+        """
+        Returns the symmetry group, or None if it is trivial (or too large to
+        enumerate, in which case the caller simply walks every scenario).
+        """
+        classes = {}
+        for team, stats in initial_standings_arg.items():
+            signature = tuple(stats.get(key) for key in SIGNATURE_KEYS)
+            classes.setdefault(signature, []).append(team)
+        classes = [members for members in classes.values() if len(members) > 1]
+        if not classes:
+            return None
+        if prod(factorial(len(members)) for members in classes) > MAX_SYMMETRY_CANDIDATES:
+            return None
+
+        group_index = {frozenset(pair): g for g, (pair, _) in enumerate(fixture_groups)}
+        team_perms = []
+        group_maps = []
+        for images in product(*(permutations(members) for members in classes)):
+            perm = {team: team for team in initial_standings_arg}
+            for members, image in zip(classes, images):
+                perm.update(zip(members, image))
+            group_map = []
+            for (team_a, team_b), indices in fixture_groups:
+                target = group_index.get(frozenset((perm[team_a], perm[team_b])))
+                if target is None or len(fixture_groups[target][1]) != len(indices):
+                    break
+                group_map.append((target, fixture_groups[target][0][0] != perm[team_a]))
+            else:
+                team_perms.append(perm)
+                group_maps.append(group_map)
+
+        if len(team_perms) == 1:
+            return None
+        identity = next(
+            k for k, perm in enumerate(team_perms) if all(t == u for t, u in perm.items())
+        )
+        team_perms.insert(0, team_perms.pop(identity))
+        group_maps.insert(0, group_maps.pop(identity))
+        return cls(team_perms, group_maps)
+
+    def image(self, k, group_wins, group_sizes):
+        """Per-group win counts of the scenario that permutation k maps group_wins to."""
+        image = [0] * len(group_wins)
+        for (target, flipped), c, m in zip(self.group_maps[k], group_wins, group_sizes):
+            image[target] = m - c if flipped else c
+        return tuple(image)
+
+    def orbit(self, group_wins, group_sizes):
+        """
+        {image scenario: team permutation} over the distinct members of the orbit,
+        or None if group_wins is not the orbit's canonical (smallest) member.
+        """
+        members = {}
+        for k, perm in enumerate(self.team_perms):
+            image = self.image(k, group_wins, group_sizes)
+            if image < group_wins:
+                return None
+            members.setdefault(image, perm)
+        return members
@@ -0,0 +1,239 @@
+"""
+Exact split enumeration: every distinct final table, built from two halves.
+
+The fixture list is split into two halves. Each half is enumerated on its own
+and collapsed to its distinct extra-wins vectors, with a multiplicity per
+vector and, per fixture, how many of those outcomes the first-named team won.
+The halves are then combined pairwise in numpy blocks: every (left, right)
+pair is a distinct final table whose weight is the product of the two
+multiplicities. Because qualification only depends on the final table, this
+reproduces ``run_exhaustive_analysis_once`` exactly.
+
+This is a full cross product, not a meet-in-the-middle join: the results
+include position distributions, lineups and points thresholds, which need
+every final table, and "fewer than n teams above t" does not reduce to a key
+shared by the halves. Work is (distinct left) x (distinct right) tables, so the
+only saving over enumeration is the collapse of outcomes to distinct win
+vectors, which grows with repeated pairings. With ten teams that is about
+1.8 * 10^7 tables at 28 fixtures (around a minute) but 8 * 10^7 at 30 and
+3.4 * 10^8 at 34, hence SPLIT_ENUMERATION_LIMIT.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from nrr_tiebreak import NRRTieResolver
+from scenario_aggregates import QUALIFICATION_TARGETS, ScenarioAggregates
+from scenario_space import (
+    base_tables,
+    competition_ranks,
+    decode_outcomes,
+    fixture_team_indices,
+    scenario_tables,
+)
+
+SPLIT_ENUMERATION_LIMIT = 28  # 2^14 outcomes per half; the cross product grows quadratically beyond
+JOIN_CHUNK_ROWS = 1 << 16  # Joined tables evaluated per vectorised step
+
+HalfTable = namedtuple("HalfTable", ["wins", "counts", "a_wins"])
+HalfTable.__doc__ = """Distinct extra-wins vectors of one half of the fixtures.
+
+wins: (vectors, teams) extra wins; counts: (vectors,) outcomes mapping to each
+vector; a_wins: (vectors, half fixtures) of those, how many the first team won.
+"""
+
+
+def enumerate_half(team_keys, fixtures):
+    """Enumerates every outcome of `fixtures` and collapses it to a HalfTable."""
+    num_teams = len(team_keys)
+    num_fixtures = len(fixtures)
+    if num_fixtures == 0:
+        return HalfTable(
+            np.zeros((1, num_teams), dtype=np.int32),
+            np.ones(1),
+            np.zeros((1, 0)),
+        )
+    team_a, team_b = fixture_team_indices(team_keys, fixtures)
+    outcomes = decode_outcomes(np.arange(2**num_fixtures, dtype=np.int64), num_fixtures)
+    zeros = np.zeros(num_teams, dtype=np.int32)
+    _, extra_wins = scenario_tables(outcomes, zeros, zeros, team_a, team_b)
+
+    # Mixed-radix key per vector so np.unique works on a flat int64 array.
+    radix = np.bincount(np.concatenate([team_a, team_b]), minlength=num_teams) + 1
+    multipliers = np.concatenate([[1], np.cumprod(radix[:-1])]).astype(np.int64)
+    keys = extra_wins.astype(np.int64) @ multipliers
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    num_vectors = len(first)
+    counts = np.bincount(inverse, minlength=num_vectors).astype(np.float64)
+    a_wins = np.stack(
+        [
+            np.bincount(inverse, weights=outcomes[:, j], minlength=num_vectors)
+            for j in range(num_fixtures)
+        ],
+        axis=1,
+    )
+    return HalfTable(extra_wins[first], counts, a_wins)
+
+
+def split_fixtures(team_keys, fixtures):
+    """
+    Splits fixture indices into two halves. Fixtures are ordered by the teams
+    they involve first, so each half touches fewer teams (and repeated pairings
+    land together), which keeps the number of distinct vectors per half down.
+    """
+    position = {team: i for i, team in enumerate(team_keys)}
+    order = sorted(
+        range(len(fixtures)),
+        key=lambda j: sorted(position[team] for team in fixtures[j]),
+    )
+    middle = len(order) // 2
+    return order[:middle], order[middle:]
+
+
+def run_split_enumeration_analysis(
+    initial_standings_arg,
+    fixtures_arg,
+    halves=None,
+    chunk_rows=JOIN_CHUNK_ROWS,
+    progress=None,
+):
+    """
+    Same result dictionary as run_exhaustive_analysis_once, computed by joining
+    two independently enumerated halves of fixtures_arg (two lists of fixture
+    indices, default split_fixtures). `progress(done, total)` is called after
+    each block of left vectors. Returns None if there is nothing to analyse.
+    """
+    team_keys = list(initial_standings_arg.keys())
+    num_teams = len(team_keys)
+    num_fixtures = len(fixtures_arg)
+    if not team_keys:
+        return None
+    if num_fixtures > SPLIT_ENUMERATION_LIMIT:
+        raise ValueError(
+            f"Split enumeration supports at most {SPLIT_ENUMERATION_LIMIT} fixtures, got {num_fixtures}."
+        )
+    halves = halves or split_fixtures(team_keys, fixtures_arg)
+    left, right = (
+        enumerate_half(team_keys, [fixtures_arg[j] for j in half]) for half in halves
+    )
+    base_points, base_wins = base_tables(initial_standings_arg, team_keys)
+    team_a, team_b = fixture_team_indices(team_keys, fixtures_arg)
+    max_future = int(np.bincount(np.concatenate([team_a, team_b]), minlength=num_teams).max())
+
+    # per_left[n][l, t]: weight of right vectors joined with l where t makes the top n;
+    # per_right likewise. Fixture tallies and overall counts are recovered from these.
+    per_left = {n: np.zeros((len(left.counts), num_teams)) for n in QUALIFICATION_TARGETS}
+    per_right = {n: np.zeros((len(right.counts), num_teams)) for n in QUALIFICATION_TARGETS}
+    # path[n][t, k]: weight with t winning k of its remaining games (and qualifying).
+    path_totals = np.zeros((num_teams, max_future + 1))
+    path_qualified = {n: np.zeros((num_teams, max_future + 1)) for n in QUALIFICATION_TARGETS}
+    aggregates = ScenarioAggregates(
+        team_keys,
+        tie_resolver=NRRTieResolver.from_standings(initial_standings_arg, fixtures_arg),
+    )
+
+    num_left, num_right = len(left.counts), len(right.counts)
+    block = max(1, chunk_rows // num_right)
+    path_cells = np.arange(num_teams) * (max_future + 1)
+    path_size = num_teams * (max_future + 1)
+    for lo in range(0, num_left, block):
+        hi = min(lo + block, num_left)
+        extra = (left.wins[lo:hi, None, :] + right.wins[None, :, :]).reshape(-1, num_teams)
+        weights = np.outer(left.counts[lo:hi], right.counts).ravel()
+        points = base_points + 2 * extra
+        wins = base_wins + extra
+        aggregates.add_batch(points, wins, weights)
+
+        team_weights = np.broadcast_to(weights[:, None], extra.shape)
+        cells = (path_cells + extra).ravel()
+        path_totals += np.bincount(
+            cells, weights=team_weights.ravel(), minlength=path_size
+        ).reshape(num_teams, max_future + 1)
+        ranks = competition_ranks(points)
+        for n in QUALIFICATION_TARGETS:
+            qualified = (ranks <= n).astype(np.float64)
+            path_qualified[n] += np.bincount(
+                cells, weights=(qualified * team_weights).ravel(), minlength=path_size
+            ).reshape(num_teams, max_future + 1)
+            qualified = qualified.reshape(hi - lo, num_right, num_teams)
+            per_left[n][lo:hi] += np.einsum("lrt,r->lt", qualified, right.counts)
+            per_right[n] += np.einsum("lrt,l->rt", qualified, left.counts[lo:hi])
+        if progress is not None:
+            progress(hi, num_left)
+
+    total_valid_scenarios = float(left.counts.sum() * right.counts.sum())
+    overall_counts = {n: left.counts @ per_left[n] for n in QUALIFICATION_TARGETS}
+    # Fixture tallies, keyed by match tuple like run_exhaustive_analysis_once. A
+    # pairing listed twice in the same order has identical tallies for both
+    # fixtures, so either one stands for the key.
+    tallies = {n: {} for n in QUALIFICATION_TARGETS}
+    for half, indices, per_vector in (
+        (left, halves[0], per_left),
+        (right, halves[1], per_right),
+    ):
+        for column, j in enumerate(indices):
+            match_key = tuple(fixtures_arg[j])
+            for n in QUALIFICATION_TARGETS:
+                tallies[n][match_key] = (
+                    half.a_wins[:, column] @ per_vector[n],
+                    (half.counts - half.a_wins[:, column]) @ per_vector[n],
+                )
+
+    final_results = {
+        "overall_probabilities": {},
+        "team_analysis": {4: {}, 2: {}},
+        "qualification_path": {4: {}, 2: {}},
+    }
+    for t, team in enumerate(team_keys):
+        final_results["overall_probabilities"][team] = {
+            f"Top {n} Probability": float(overall_counts[n][t] / total_valid_scenarios * 100)
+            for n in QUALIFICATION_TARGETS
+        }
+
+    # Same "required outcome" rules as run_exhaustive_analysis_once.
+    for t, team in enumerate(team_keys):
+        for n in QUALIFICATION_TARGETS:
+            qualified_count = overall_counts[n][t]
+            outcome_details = {}
+            if qualified_count > 0:
+                for match in fixtures_arg:
+                    a_wins, b_wins = (v[t] for v in tallies[n][tuple(match)])
+                    outcome_str = "Result doesn't matter"
+                    if a_wins + b_wins > 0:
+                        if a_wins == qualified_count:
+                            outcome_str = f"{match[0]} wins"
+                        elif b_wins == qualified_count:
+                            outcome_str = f"{match[1]} wins"
+                        elif a_wins > b_wins:
+                            outcome_str = f"{match[0]} wins"
+                        elif b_wins > a_wins:
+                            outcome_str = f"{match[1]} wins"
+                    outcome_details[f"{match[0]} vs {match[1]}"] = {"Outcome": outcome_str}
+                percentage = float(qualified_count / total_valid_scenarios * 100)
+            else:
+                percentage = 0
+            final_results["team_analysis"][n][team] = {
+                "percentage": percentage,
+                "results_df": outcome_details,
+            }
+
+    num_target_matches = {team: sum(1 for m in fixtures_arg if team in m) for team in team_keys}
+    for t, team in enumerate(team_keys):
+        for n in QUALIFICATION_TARGETS:
+            num_team_matches = num_target_matches[team]
+            wins_range = range(num_team_matches + 1)
+            possible = [k for k in wins_range if path_qualified[n][t, k] > 0]
+            guaranteed = [
+                k
+                for k in wins_range
+                if path_totals[t, k] > 0 and path_qualified[n][t, k] == path_totals[t, k]
+            ]
+            final_results["qualification_path"][n][team] = {
+                "possible": min(possible) if possible else None,
+                "guaranteed": min(guaranteed) if guaranteed else None,
+                "target_matches": num_team_matches,
+            }
+
+    final_results.update(aggregates.results())
+    return final_results
@@ -0,0 +1,87 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+
+import analysis_artifacts
+import ipl_analysis_app as app
+from analysis_artifacts import OUTCOME_CODES, build_artifacts, write_artifacts
+from test_scenario_aggregates import FIXTURES, STANDINGS
+
+
+def decode_outcomes(codes, fixtures, extra_outcomes):
+    """Inverse of the shard encoding, as a frontend would do it."""
+    labels = {}
+    for (team_a, team_b), code in zip(fixtures, codes):
+        if code == 0:
+            continue
+        if code == 1:
+            label = f"{team_a} wins"
+        elif code == 2:
+            label = f"{team_b} wins"
+        else:
+            label = extra_outcomes[code - len(OUTCOME_CODES)]
+        labels[f"{team_a} vs {team_b}"] = label
+    return labels
+
+
+class TestAnalysisArtifacts(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.output_data = {
+            "metadata": {"method_used": "exhaustive", "num_fixtures": len(FIXTURES)},
+            "analysis_data": app.run_exhaustive_analysis_once(STANDINGS, FIXTURES),
+        }
+
+    def test_shards_round_trip_required_outcomes(self):
+        overview, shards = build_artifacts(self.output_data, FIXTURES)
+        analysis = self.output_data["analysis_data"]
+        for team, relative in overview["team_files"].items():
+            shard = shards[relative]
+            for n, by_team in analysis["team_analysis"].items():
+                original = by_team[team]
+                encoded = shard["team_analysis"][str(n)]
+                self.assertEqual(encoded["percentage"], original["percentage"])
+                if not original["results_df"]:
+                    self.assertIsNone(encoded["outcomes"])
+                    continue
+                required = {
+                    match: entry["Outcome"]
+                    for match, entry in original["results_df"].items()
+                    if entry["Outcome"] != OUTCOME_CODES[0]
+                }
+                self.assertEqual(
+                    decode_outcomes(encoded["outcomes"], overview["fixtures"], overview["extra_outcomes"]),
+                    required,
+                )
+
+    def test_overview_columns_follow_team_order(self):
+        overview, _ = build_artifacts(self.output_data, FIXTURES)
+        overall = self.output_data["analysis_data"]["overall_probabilities"]
+        for team, row in zip(overview["teams"], overview["overall_probabilities"]["rows"]):
+            self.assertEqual(row, [overall[team][c] for c in overview["overall_probabilities"]["columns"]])
+
+    def test_written_files_and_compressed_siblings(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            sizes = write_artifacts(self.output_data, FIXTURES, tmpdir)
+            with open(os.path.join(tmpdir, "overview.json"), "rb") as f:
+                raw = f.read()
+            with open(os.path.join(tmpdir, "overview.json.gz"), "rb") as f:
+                self.assertEqual(gzip.decompress(f.read()), raw)
+            if analysis_artifacts.brotli is not None:
+                with open(os.path.join(tmpdir, "overview.json.br"), "rb") as f:
+                    self.assertEqual(analysis_artifacts.brotli.decompress(f.read()), raw)
+            full_size = len(json.dumps(self.output_data, indent=4))
+            self.assertLess(sizes["overview.json"], full_size / 2)
+            self.assertEqual(len(sizes), len(STANDINGS) + 1)
+
+            # A team that drops out of the analysis loses its stale shard.
+            stale = os.path.join(tmpdir, "teams", "Gone.json")
+            open(stale, "w").close()
+            write_artifacts(self.output_data, FIXTURES, tmpdir)
+            self.assertFalse(os.path.exists(stale))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import analysis_service
+import ipl_analysis_app as app
+from analysis_service import AnalysisService, apply_pinned, start_server
+from test_scenario_aggregates import FIXTURES, STANDINGS
+
+
+async def request(port, method, path, payload=None):
+    """One HTTP request over a fresh connection; returns (status, JSON body)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(content)
+
+
+class TestAnalysisService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.service = AnalysisService(self.executor, load_inputs=lambda: (STANDINGS, list(FIXTURES)))
+        self.server = await start_server(self.service, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown()
+
+    async def test_probabilities_and_team_analysis(self):
+        expected = json.loads(json.dumps(app.run_exhaustive_analysis_once(STANDINGS, FIXTURES)))
+        status, body = await request(self.port, "GET", "/probabilities")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["overall_probabilities"], expected["overall_probabilities"])
+
+        team = next(iter(STANDINGS))
+        status, body = await request(self.port, "GET", f"/teams/{team}?top=2")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["percentage"], expected["team_analysis"]["2"][team]["percentage"])
+        self.assertEqual(self.service.stats["computed"], 1)  # Both answered by one run
+
+        status, _ = await request(self.port, "GET", "/teams/Nobody")
+        self.assertEqual(status, 404)
+
+    async def test_what_if_matches_analysis_of_the_pinned_table(self):
+        team1, team2 = FIXTURES[0]
+        pinned = [{"fixture": 0, "winner": team2}, {"fixture": 1, "winner": None}]
+        status, body = await request(self.port, "POST", "/what-if", {"pinned": pinned, "team": team1})
+        self.assertEqual(status, 200)
+        standings, fixtures = apply_pinned(STANDINGS, list(FIXTURES), pinned)
+        self.assertEqual(len(fixtures), len(FIXTURES) - 2)
+        self.assertEqual(standings[team2]["Points"], STANDINGS[team2]["Points"] + 2)
+        expected = json.loads(json.dumps(app.run_exhaustive_analysis_once(standings, fixtures)))
+        self.assertEqual(body["overall_probabilities"], expected["overall_probabilities"])
+        self.assertEqual(body["team_analysis"]["percentage"], expected["team_analysis"]["4"][team1]["percentage"])
+
+        for bad in ([{"fixture": 99, "winner": None}], [{"fixture": 0, "winner": "Nobody"}], "x"):
+            status, body = await request(self.port, "POST", "/what-if", {"pinned": bad})
+            self.assertEqual(status, 400, bad)
+            self.assertIn("error", body)
+
+    async def test_malformed_requests_are_rejected(self):
+        for payload in (
+            {"pinned": [{"fixture": True, "winner": None}]},
+            {"pinned": [], "team": ["x"]},
+            {"pinned": [], "team": next(iter(STANDINGS)), "top": 4.0},
+        ):
+            status, body = await request(self.port, "POST", "/what-if", payload)
+            self.assertEqual(status, 400, payload)
+            self.assertIn("error", body)
+
+        for length in ("abc", "-5"):
+            reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+            writer.write(f"POST /what-if HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            self.assertTrue(response.startswith(b"HTTP/1.1 400"), response)
+
+    async def test_concurrent_identical_requests_share_one_run(self):
+        with mock.patch.object(
+            analysis_service, "run_full_analysis", wraps=analysis_service.run_full_analysis
+        ) as run:
+            results = await asyncio.gather(
+                *(request(self.port, "POST", "/what-if", {"pinned": [{"fixture": 2, "winner": None}]}) for _ in range(8))
+            )
+            await request(self.port, "POST", "/what-if", {"pinned": [{"fixture": 2, "winner": None}]})
+        self.assertEqual(run.call_count, 1)
+        self.assertEqual(len({json.dumps(body, sort_keys=True) for _, body in results}), 1)
+        self.assertEqual(self.service.stats["hits"] + self.service.stats["coalesced"], 8)
+
+    async def test_least_recently_used_entry_is_evicted(self):
+        self.service.cache_size = 1
+        for winner in (None, FIXTURES[0][0], None):
+            await request(self.port, "POST", "/what-if", {"pinned": [{"fixture": 0, "winner": winner}]})
+        self.assertEqual(self.service.stats["computed"], 3)
+        self.assertEqual(len(self.service.cache), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
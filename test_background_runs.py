@@ -0,0 +1,126 @@
+import itertools
+import time
+import unittest
+
+import numpy as np
+
+import ipl_analysis_app as app
+from background_runs import BackgroundRun, iter_exhaustive_estimates, iter_mc_estimates
+from scenario_space import permutation_key, permute_indices
+from test_scenario_aggregates import FIXTURES, STANDINGS
+
+COLUMNS = ("Top 4 Probability", "Top 2 Probability")
+
+
+class TestEstimates(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.exact = app.simulate_season_exhaustive(STANDINGS, FIXTURES)
+
+    def test_lexicographic_ranges_always_contain_the_exact_answer(self):
+        estimates = list(iter_exhaustive_estimates(STANDINGS, FIXTURES, chunk_size=7, order="lexicographic"))
+        self.assertGreater(len(estimates), 3)
+        for estimate in estimates:
+            for column in COLUMNS:
+                for team, (low, high) in estimate["ranges"][column].items():
+                    self.assertLessEqual(low, self.exact[team][column] + 1e-9)
+                    self.assertGreaterEqual(high, self.exact[team][column] - 1e-9)
+        final = estimates[-1]
+        self.assertEqual(final["done"], 2 ** len(FIXTURES))
+        for team in STANDINGS:
+            for column in COLUMNS:
+                self.assertAlmostEqual(final["probabilities"][team][column], self.exact[team][column])
+                self.assertAlmostEqual(*final["ranges"][column][team])
+
+    def test_random_order_prefixes_are_unbiased(self):
+        exact = np.array([self.exact[team]["Top 4 Probability"] for team in STANDINGS])
+        first_chunks = np.array(
+            [
+                [
+                    probs["Top 4 Probability"]
+                    for probs in next(
+                        iter_exhaustive_estimates(STANDINGS, FIXTURES, chunk_size=8, seed=seed)
+                    )["probabilities"].values()
+                ]
+                for seed in range(400)
+            ]
+        )
+        np.testing.assert_allclose(first_chunks.mean(axis=0), exact, atol=4.0)
+
+        final = list(iter_exhaustive_estimates(STANDINGS, FIXTURES, chunk_size=8, seed=1))[-1]
+        for team in STANDINGS:
+            self.assertAlmostEqual(final["probabilities"][team]["Top 4 Probability"], self.exact[team]["Top 4 Probability"])
+
+    def test_time_budget_stops_early(self):
+        estimates = list(iter_exhaustive_estimates(STANDINGS, FIXTURES, chunk_size=4, time_budget=0))
+        self.assertEqual([e["done"] for e in estimates], [4])
+
+    def test_monte_carlo_converges_within_its_interval(self):
+        estimates = list(iter_mc_estimates(STANDINGS, FIXTURES, 100000, batch_size=25000, seed=7))
+        self.assertEqual([e["done"] for e in estimates], [25000, 50000, 75000, 100000])
+        final = estimates[-1]
+        for team in STANDINGS:
+            for column in COLUMNS:
+                low, high = final["ranges"][column][team]
+                self.assertLessEqual(high - low, 1.0)
+                self.assertAlmostEqual(final["probabilities"][team][column], self.exact[team][column], delta=1.0)
+
+
+class TestPermutation(unittest.TestCase):
+    def test_permutation_visits_every_scenario_once(self):
+        for num_fixtures in (0, 1, 5, 12):
+            indices = permute_indices(np.arange(2**num_fixtures), num_fixtures, permutation_key(num_fixtures))
+            self.assertEqual(sorted(indices.tolist()), list(range(2**num_fixtures)))
+
+    def test_order_depends_on_the_key(self):
+        positions = np.arange(64)
+        first = permute_indices(positions, 20, permutation_key(1))
+        self.assertTrue(np.array_equal(first, permute_indices(positions, 20, permutation_key(1))))
+        self.assertFalse(np.array_equal(first, permute_indices(positions, 20, permutation_key(2))))
+
+
+class TestBackgroundRun(unittest.TestCase):
+    def wait_until_stopped(self, run):
+        run.join(5)
+        return run.snapshot()
+
+    def test_completes_with_the_last_estimate(self):
+        run = BackgroundRun(iter_exhaustive_estimates(STANDINGS, FIXTURES, chunk_size=8))
+        snapshot = self.wait_until_stopped(run)
+        self.assertEqual(snapshot["status"], "done")
+        self.assertEqual(snapshot["estimate"]["done"], 2 ** len(FIXTURES))
+
+    def test_a_time_budget_stop_is_not_reported_as_done(self):
+        estimates = iter_exhaustive_estimates(STANDINGS, FIXTURES, chunk_size=8, time_budget=0)
+        snapshot = self.wait_until_stopped(BackgroundRun(estimates))
+        self.assertEqual(snapshot["status"], "timed_out")
+        self.assertLess(snapshot["estimate"]["done"], snapshot["estimate"]["total"])
+
+    def test_cancel_stops_an_endless_run(self):
+        def endless():
+            for i in itertools.count(1):
+                time.sleep(0.01)
+                yield {"done": i}
+
+        run = BackgroundRun(endless())
+        while run.snapshot()["estimate"] is None:
+            time.sleep(0.01)
+        self.assertTrue(run.running)
+        run.cancel()
+        snapshot = self.wait_until_stopped(run)
+        self.assertEqual(snapshot["status"], "cancelled")
+        self.assertGreaterEqual(snapshot["estimate"]["done"], 1)
+
+    def test_failures_are_reported(self):
+        def failing():
+            yield {"done": 1}
+            raise ValueError("boom")
+
+        snapshot = self.wait_until_stopped(BackgroundRun(failing()))
+        self.assertEqual(snapshot["status"], "failed")
+        self.assertEqual(snapshot["error"], "boom")
+        self.assertEqual(snapshot["estimate"], {"done": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from itertools import combinations
+from math import log
+
+import backtest
+
+TEAMS = ["Alpha", "Bravo", "Charlie", "Delta", "Echo"]
+# Single round robin; the earlier-listed team wins, except one no result.
+SEASON = {
+    "season": "test",
+    "matches": [
+        {"team1": a, "team2": b, "winner": None if (a, b) == ("Charlie", "Delta") else a}
+        for a, b in combinations(TEAMS, 2)
+    ],
+}
+
+
+class TestBacktest(unittest.TestCase):
+    def test_standings_rebuilt_from_results(self):
+        standings, fixtures = backtest.standings_at(SEASON, 8)
+        self.assertEqual(standings["Alpha"], {"Matches": 4, "Wins": 4, "Points": 8})
+        self.assertEqual(standings["Charlie"], {"Matches": 3, "Wins": 0, "Points": 1})
+        self.assertEqual(fixtures, [("Charlie", "Echo"), ("Delta", "Echo")])
+        self.assertEqual(backtest.actual_qualifiers(SEASON)[2], {"Alpha", "Bravo"})
+
+    def test_scores(self):
+        predictions = [(0.8, True), (0.2, False), (0.5, True)]
+        self.assertAlmostEqual(backtest.brier_score(predictions), (0.04 + 0.04 + 0.25) / 3)
+        self.assertAlmostEqual(backtest.log_loss(predictions), -(2 * log(0.8) + log(0.5)) / 3)
+        self.assertLess(backtest.log_loss([(1.0, False)]), 20)
+
+    def test_parallel_run_then_cached_rerun(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = backtest.run_backtest([SEASON], step=3, workers=2, cache_dir=cache_dir)
+            self.assertEqual(first["analysed"], 4)
+            self.assertEqual(len(os.listdir(cache_dir)), 4)
+            # Once the table is settled the predictions are certain and correct.
+            last = first["checkpoints"][-1]
+            self.assertEqual(last["matches_played"], 9)
+            self.assertEqual(last["probabilities"]["Alpha"]["Top 2 Probability"], 100)
+
+            again = backtest.run_backtest([SEASON], step=3, workers=2, cache_dir=cache_dir)
+            self.assertEqual((again["analysed"], again["cached"]), (0, 4))
+            self.assertEqual(again["scores"], first["scores"])
+
+    def test_tie_policy_is_scored_and_reported(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            neutral = backtest.run_backtest([SEASON], step=3, workers=1, cache_dir=cache_dir)
+            optimistic = backtest.run_backtest(
+                [SEASON], step=3, workers=1, cache_dir=cache_dir, tie_policy="optimistic"
+            )
+        self.assertEqual((neutral["tie_policy"], optimistic["tie_policy"]), ("neutral", "optimistic"))
+        self.assertEqual(optimistic["analysed"], 4)
+        # At the start every team is level, so only the neutral policy shares the places.
+        first = neutral["checkpoints"][0]["probabilities"]
+        self.assertAlmostEqual(sum(p["Top 2 Probability"] for p in first.values()), 200)
+        self.assertGreater(
+            sum(p["Top 2 Probability"] for p in optimistic["checkpoints"][0]["probabilities"].values()), 200
+        )
+        with self.assertRaises(ValueError):
+            backtest.run_backtest([SEASON], tie_policy="nrr")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import ipl_analysis_app as app
+from checkpoint import load_checkpoint, remove_checkpoint, save_checkpoint
+from test_split_enumeration import assert_results_equal
+from test_scenario_aggregates import FIXTURES, STANDINGS
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "checkpoint.npz")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        arrays = {"counts": np.arange(6).reshape(2, 3), "aggregates/total_weight": np.array(2.5)}
+        save_checkpoint(self.path, {"input_hash": "abc", "next_index": 7}, arrays)
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+        metadata, loaded = load_checkpoint(self.path, "abc")
+        self.assertEqual(metadata["next_index"], 7)
+        np.testing.assert_array_equal(loaded["counts"], arrays["counts"])
+        self.assertEqual(float(loaded["aggregates/total_weight"]), 2.5)
+
+    def test_other_inputs_or_torn_file_are_ignored(self):
+        save_checkpoint(self.path, {"input_hash": "abc"}, {})
+        self.assertIsNone(load_checkpoint(self.path, "def"))
+        with open(self.path, "wb") as f:
+            f.write(b"not a checkpoint")
+        self.assertIsNone(load_checkpoint(self.path, "abc"))
+        remove_checkpoint(self.path)
+        self.assertIsNone(load_checkpoint(self.path, "abc"))
+
+    def test_interrupted_run_resumes_to_the_same_results(self):
+        expected = app.run_exhaustive_analysis_once(STANDINGS, FIXTURES)
+        saves = []
+
+        def save_then_interrupt(*args):
+            save_checkpoint(*args)
+            saves.append(args[1]["next_index"])
+            if len(saves) == 5:
+                raise KeyboardInterrupt
+
+        with mock.patch.object(app, "save_checkpoint", side_effect=save_then_interrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                app.run_exhaustive_analysis_once(
+                    STANDINGS, FIXTURES, checkpoint_path=self.path, checkpoint_interval=0
+                )
+        self.assertTrue(os.path.exists(self.path))
+
+        resumed = app.run_exhaustive_analysis_once(
+            STANDINGS, FIXTURES, checkpoint_path=self.path, checkpoint_interval=0
+        )
+        assert_results_equal(self, expected, resumed)
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
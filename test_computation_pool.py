@@ -0,0 +1,96 @@
+import threading
+import unittest
+import unittest.mock
+from concurrent.futures import ThreadPoolExecutor
+
+from computation_pool import CoalescingPool
+
+
+class TestCoalescingPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = CoalescingPool(max_workers=2, max_results=2)
+        self.addCleanup(self.pool.executor.shutdown)
+        self.calls = []
+        self.release = threading.Event()
+
+    def compute(self, value):
+        self.calls.append(value)
+        self.release.wait(5)
+        return value * 2
+
+    def test_concurrent_identical_requests_share_one_run(self):
+        with ThreadPoolExecutor(max_workers=10) as sessions:
+            futures = [sessions.submit(self.pool.submit, "key", self.compute, 21) for _ in range(10)]
+            shared = {id(f.result()) for f in futures}
+            self.release.set()
+            results = [f.result().result() for f in futures]
+        self.assertEqual(results, [42] * 10)
+        self.assertEqual(len(shared), 1)
+        self.assertEqual(self.calls, [21])
+
+        self.assertIsNone(self.pool.progress("key"))
+
+        # Later requests are served from the cached result.
+        self.assertEqual(self.pool.submit("key", self.compute, 21).result(), 42)
+        self.assertEqual(self.calls, [21])
+        self.assertEqual(self.pool.get("key"), 42)
+
+    def test_failures_are_not_cached_and_old_results_are_evicted(self):
+        self.release.set()
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            self.pool.submit("bad", fail).result()
+        self.assertIsNone(self.pool.get("bad"))
+        self.assertEqual(self.pool.submit("bad", self.compute, 1).result(), 2)
+
+        for key in ("a", "b"):
+            self.pool.submit(key, self.compute, 3).result()
+        self.assertIsNone(self.pool.get("bad"))
+        self.assertEqual(self.pool.get("b"), 6)
+
+    def test_progress_is_reported_while_in_flight(self):
+        def compute():
+            self.pool.reporter("key")(3, 8)
+            self.release.wait(5)
+            return 1
+
+        future = self.pool.submit("key", compute)
+        while self.pool.progress("key") is None:
+            threading.Event().wait(0.01)
+        self.assertEqual(self.pool.progress("key"), (3, 8))
+        self.release.set()
+        future.result()
+        self.pool.executor.shutdown()
+        self.assertIsNone(self.pool.progress("key"))
+
+    def test_background_runs_are_shared_per_key(self):
+        started = []
+
+        def start(name):
+            run = unittest.mock.Mock(name=name)
+            started.append(run)
+            return run
+
+        first = self.pool.run("key", lambda: start("first"))
+        self.assertIs(self.pool.run("key", lambda: start("second")), first)
+        self.assertEqual(len(started), 1)
+
+        self.pool.drop_run("key")
+        first.cancel.assert_called_once()
+        restarted = self.pool.run("key", lambda: start("restarted"))
+        self.assertIsNot(restarted, first)
+
+        # Beyond max_results runs the oldest is cancelled; cancel_runs stops the rest.
+        others = [self.pool.run(key, lambda: start(key)) for key in ("a", "b")]
+        restarted.cancel.assert_called_once()
+        self.pool.cancel_runs()
+        for run in others:
+            run.cancel.assert_called_once()
+        self.assertEqual(len(self.pool.runs), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+from engine_planner import MIN_MC_SAMPLES, mc_samples_for_precision, plan_engine
+
+STANDINGS = {
+    team: {"Matches": 4, "Wins": wins, "Points": 2 * wins}
+    for team, wins in zip("ABCDEF", [3, 2, 2, 1, 1, 0])
+}
+FIXTURES = [("A", "B"), ("C", "D"), ("E", "F"), ("A", "C"), ("B", "E"), ("D", "F")]
+# Seconds per unit: a fixed "machine" so plans do not depend on benchmark noise.
+CALIBRATION = {"exhaustive": 1e-4, "split_enumeration": 1e-3, "monte_carlo": 1e-3, "trajectory": 1e-4}
+
+
+class TestEnginePlanner(unittest.TestCase):
+    def test_precision_sets_monte_carlo_runs(self):
+        self.assertEqual(mc_samples_for_precision(0.05), 1000000)
+        self.assertEqual(mc_samples_for_precision(50), MIN_MC_SAMPLES)
+
+    def test_picks_exact_engine_when_cheapest(self):
+        plan = plan_engine(STANDINGS, FIXTURES, calibration=CALIBRATION)
+        self.assertEqual(plan["engine"], "exhaustive")
+        estimates = {c["engine"]: c for c in plan["candidates"]}
+        # 2^6 scenarios, halved by the B<->C, D<->E symmetry.
+        self.assertEqual(estimates["exhaustive"]["units"], 32)
+        self.assertAlmostEqual(estimates["exhaustive"]["seconds"], 32 * 1e-4)
+
+    def test_falls_back_to_monte_carlo_within_budget(self):
+        plan = plan_engine(STANDINGS, FIXTURES, time_budget=0.001, calibration=CALIBRATION)
+        self.assertEqual(plan["engine"], "monte_carlo")
+        self.assertEqual(plan["num_simulations"], MIN_MC_SAMPLES)
+        self.assertIn("capped", plan["reason"])
+
+    def test_require_exact_overrides_budget(self):
+        plan = plan_engine(
+            STANDINGS, FIXTURES, time_budget=0.001, require_exact=True, calibration=CALIBRATION
+        )
+        self.assertEqual(plan["engine"], "exhaustive")
+        self.assertIn("over budget", plan["reason"])
+
+    def test_cheaper_monte_carlo_beats_exact_engines_within_budget(self):
+        slow_exact = dict(CALIBRATION, exhaustive=10.0, split_enumeration=10.0)
+        plan = plan_engine(STANDINGS, FIXTURES, precision=50, calibration=slow_exact)
+        self.assertEqual(plan["engine"], "monte_carlo")
+        self.assertEqual(plan["num_simulations"], MIN_MC_SAMPLES)
+        self.assertIn("cheapest", plan["reason"])
+
+        plan = plan_engine(
+            STANDINGS, FIXTURES, precision=50, require_exact=True, calibration=slow_exact
+        )
+        self.assertEqual(plan["engine"], "exhaustive")
+
+    def test_memory_budget_excludes_engines(self):
+        plan = plan_engine(STANDINGS, FIXTURES, memory_budget_mb=0, calibration=CALIBRATION)
+        self.assertEqual(plan["engine"], "monte_carlo")
+
+    def test_trajectory_runs_only_within_what_the_engine_leaves_of_the_budget(self):
+        plan = plan_engine(STANDINGS, FIXTURES, calibration=CALIBRATION)
+        self.assertTrue(plan["trajectory"]["run"])
+        self.assertAlmostEqual(plan["trajectory"]["seconds"], 2**6 * 1e-4)
+
+        plan = plan_engine(STANDINGS, FIXTURES, time_budget=0.001, calibration=CALIBRATION)
+        self.assertEqual(plan["engine"], "monte_carlo")
+        self.assertFalse(plan["trajectory"]["run"])
+        self.assertIn("time budget", plan["trajectory"]["reason"])
+
+        plan = plan_engine(STANDINGS, FIXTURES, memory_budget_mb=0, calibration=CALIBRATION)
+        self.assertFalse(plan["trajectory"]["run"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from unittest import mock
+
+import ipl_analysis_app as app
+import scenario_space
+from test_scenario_index import FIXTURES, STANDINGS, brute_force_ranks
+
+
+def small_chunks(total, chunk_size=None, start=0):
+    """Chunks much smaller than the scenario space, to exercise the streaming path."""
+    return scenario_space.iter_index_chunks(total, 5, start)
+
+
+@mock.patch.object(app, "iter_index_chunks", small_chunks)
+class TestStreamingExhaustive(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.scenarios = list(brute_force_ranks())
+
+    def test_season_probabilities_match_brute_force(self):
+        probabilities = app.simulate_season_exhaustive(STANDINGS, FIXTURES)
+        for team in STANDINGS:
+            for n in (4, 2):
+                expected = 100 * sum(r[team] <= n for _, r in self.scenarios) / len(self.scenarios)
+                self.assertAlmostEqual(probabilities[team][f"Top {n} Probability"], expected)
+
+    def test_team_analysis_counts_winners_in_qualifying_scenarios(self):
+        percentage, results_df = app.analyze_team_exhaustive("Delta", 4, STANDINGS, FIXTURES)
+        qualifying = [o for o, r in self.scenarios if r["Delta"] <= 4]
+        self.assertAlmostEqual(percentage, 100 * len(qualifying) / len(self.scenarios))
+        for j, (team_a, team_b) in enumerate(FIXTURES):
+            a_wins = sum(o[j] for o in qualifying)
+            b_wins = len(qualifying) - a_wins
+            expected = (
+                "Result doesn't matter"
+                if a_wins == b_wins
+                else f"{team_a if a_wins > b_wins else team_b} wins"
+            )
+            self.assertEqual(results_df.loc[f"{team_a} vs {team_b}", "Outcome"], expected)
+
+    def test_headless_full_analysis_reports_progress_without_widgets(self):
+        calls = []
+        with mock.patch.object(app.st, "progress") as progress_bar, mock.patch.object(app.st, "empty") as status:
+            results = app.run_exhaustive_analysis_once(
+                STANDINGS, FIXTURES, progress=lambda done, total: calls.append((done, total))
+            )
+            self.assertIsNotNone(app.run_exhaustive_analysis_once(STANDINGS, FIXTURES, progress=False))
+        progress_bar.assert_not_called()
+        status.assert_not_called()
+        self.assertIsNotNone(results)
+        self.assertEqual(calls[-1][0], calls[-1][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
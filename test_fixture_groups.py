@@ -0,0 +1,59 @@
+import unittest
+
+import ipl_analysis_app as app
+from scenario_index import ScenarioBitmapIndex
+from scenario_space import group_fixtures
+
+STANDINGS = {
+    "A": {"Matches": 4, "Wins": 3, "Points": 6},
+    "B": {"Matches": 4, "Wins": 2, "Points": 4},
+    "C": {"Matches": 4, "Wins": 2, "Points": 4},
+    "D": {"Matches": 4, "Wins": 2, "Points": 4},
+    "E": {"Matches": 4, "Wins": 1, "Points": 2},
+    "F": {"Matches": 4, "Wins": 0, "Points": 0},
+}
+FIXTURES = [
+    ("A", "B"),
+    ("C", "D"),
+    ("B", "A"),
+    ("E", "F"),
+    ("C", "D"),
+    ("A", "B"),
+    ("D", "E"),
+    ("F", "C"),
+]
+
+
+class TestFixtureGroups(unittest.TestCase):
+    def test_groups_pairs_regardless_of_order(self):
+        self.assertEqual(
+            group_fixtures(FIXTURES),
+            [
+                (("A", "B"), [0, 2, 5]),
+                (("C", "D"), [1, 4]),
+                (("E", "F"), [3]),
+                (("D", "E"), [6]),
+                (("F", "C"), [7]),
+            ],
+        )
+
+    def test_grouped_exhaustive_matches_every_bit_scenario(self):
+        results = app.run_exhaustive_analysis_once(STANDINGS, FIXTURES)
+        index = ScenarioBitmapIndex.build(STANDINGS, FIXTURES, top_ks=(2, 4))
+        for team in STANDINGS:
+            for n in (4, 2):
+                self.assertAlmostEqual(
+                    results["overall_probabilities"][team][f"Top {n} Probability"],
+                    index.probability(index.top(team, n)),
+                )
+        # Required outcome for a pairing that is listed in both orders.
+        qualified = index.top("B", 2)
+        b_home = index.probability(qualified & index.fixture(2, "B"), given=qualified)
+        expected = "B wins" if b_home > 50 else "A wins"
+        self.assertEqual(
+            results["team_analysis"][2]["B"]["results_df"]["B vs A"]["Outcome"], expected
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import contextlib
+import io
+import os
+import unittest
+from unittest import mock
+
+import generate_ipl_data
+from http_fetch import FetchResult
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "html_samples")
+
+
+def saved_page(filename):
+    with open(os.path.join(SAMPLES_DIR, filename), "r", encoding="utf-8") as f:
+        return FetchResult(filename, f.read(), 200, False, None)
+
+
+class TestTargetedParsing(unittest.TestCase):
+    def parse(self, parser):
+        with mock.patch.object(generate_ipl_data, "HTML_PARSER", parser), contextlib.redirect_stdout(io.StringIO()):
+            standings = generate_ipl_data.fetch_standings_from_web(saved_page("points_table.html"))
+            fixtures = generate_ipl_data.fetch_fixtures_from_web(saved_page("fixtures.html"))
+        return standings, fixtures
+
+    def test_saved_pages_parse_with_html_parser(self):
+        standings, fixtures = self.parse("html.parser")
+        self.assertEqual(len(standings), 10)
+        self.assertEqual(standings["Gujarat"], {"Matches": 12, "Wins": 9, "Points": 18, "NRR": 0.9})
+        self.assertEqual(len(fixtures), 14)
+        self.assertTrue(all(len(match) == 2 for match in fixtures))
+
+    def test_lxml_matches_html_parser(self):
+        try:
+            import lxml  # noqa: F401
+        except ImportError:
+            self.skipTest("lxml is not installed")
+        self.assertEqual(self.parse("lxml"), self.parse("html.parser"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from http_fetch import Fetcher, unchanged
+
+ETAG = '"v1"'
+LAST_MODIFIED = "Sat, 02 May 2026 19:44:09 GMT"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/etag and /dated honour conditional requests; /flaky fails its first two hits."""
+
+    hits = {}
+
+    def do_GET(self):
+        StubHandler.hits[self.path] = StubHandler.hits.get(self.path, 0) + 1
+        if self.path == "/etag" and self.headers.get("If-None-Match") == ETAG:
+            return self.reply(304)
+        if self.path == "/dated" and self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+            return self.reply(304)
+        if self.path == "/flaky" and StubHandler.hits[self.path] <= 2:
+            return self.reply(503)
+        if self.path == "/missing":
+            return self.reply(404)
+        self.reply(200, f"body of {self.path}".encode())
+
+    def reply(self, status, body=b""):
+        self.send_response(status)
+        if self.path == "/etag":
+            self.send_header("ETag", ETAG)
+        if self.path == "/dated":
+            self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestFetcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StubHandler.hits = {}
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmpdir.name, "fetch_cache.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def fetcher(self):
+        return Fetcher(cache_path=self.cache_path, timeout=5, backoff=0)
+
+    def test_not_modified_without_a_cached_body_is_refetched(self):
+        url = f"{self.base}/etag"
+        result = self.fetcher().fetch(url, headers={"If-None-Match": ETAG})
+        self.assertEqual(result.status, 200)
+        self.assertFalse(result.not_modified)
+        self.assertEqual(result.text, "body of /etag")
+        self.assertEqual(StubHandler.hits["/etag"], 2)
+
+    def test_conditional_refresh_short_circuits(self):
+        urls = [f"{self.base}/etag", f"{self.base}/dated"]
+        output = os.path.join(self.tmpdir.name, "out.json")
+        open(output, "w").close()
+
+        fetcher = self.fetcher()
+        first = fetcher.fetch_all(urls)
+        self.assertEqual([r.status for r in first.values()], [200, 200])
+        self.assertFalse(unchanged(first, [output]))
+        fetcher.save()
+
+        # A new run re-reads the on-disk cache and gets 304s served from it.
+        second = self.fetcher().fetch_all(urls)
+        self.assertTrue(all(r.not_modified for r in second.values()))
+        self.assertEqual(second[urls[0]].text, "body of /etag")
+        self.assertTrue(unchanged(second, [output]))
+        self.assertFalse(unchanged(second, [output, output + ".missing"]))
+
+        # Files written from fallback data are never kept on a 304.
+        with open(output, "w") as f:
+            json.dump({"source": "Hardcoded Fallback"}, f)
+        self.assertFalse(unchanged(second, [output], live_sources=("Live Scrape",)))
+        with open(output, "w") as f:
+            json.dump({"source": "Live Scrape (2025)"}, f)
+        self.assertTrue(unchanged(second, [output], live_sources=("Live Scrape",)))
+
+    def test_retries_transient_errors_with_a_bound(self):
+        result = self.fetcher().fetch(f"{self.base}/flaky")
+        self.assertEqual((result.status, result.text), (200, "body of /flaky"))
+        self.assertEqual(StubHandler.hits["/flaky"], 3)
+
+        StubHandler.hits = {}
+        fetcher = Fetcher(cache_path=None, timeout=5, max_retries=1, backoff=0)
+        result = fetcher.fetch(f"{self.base}/flaky")
+        self.assertIsNotNone(result.error)
+        self.assertEqual(StubHandler.hits["/flaky"], 2)
+
+    def test_client_errors_are_not_retried(self):
+        result = self.fetcher().fetch(f"{self.base}/missing")
+        self.assertEqual(result.status, 404)
+        self.assertIsNotNone(result.error)
+        self.assertEqual(StubHandler.hits["/missing"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
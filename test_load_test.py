@@ -0,0 +1,46 @@
+import unittest
+
+from load_test import build_report, percentile, run_session
+
+
+class TestLoadTest(unittest.TestCase):
+    def test_percentile_interpolates_between_ranks(self):
+        values = [4, 1, 3, 2, 5]
+        self.assertEqual(percentile(values, 50), 3)
+        self.assertEqual(percentile(values, 0), 1)
+        self.assertEqual(percentile(values, 100), 5)
+        self.assertAlmostEqual(percentile(values, 95), 4.8)
+        self.assertIsNone(percentile([], 50))
+
+    def test_report_groups_reruns_by_action(self):
+        sessions = [
+            {
+                "session": i,
+                "reruns": [
+                    {"session": i, "action": "open", "latency": 1.0 + i, "cpu": 0.5, "json_loads": 3, "exceptions": []},
+                    {"session": i, "action": "select team", "latency": 0.1, "cpu": 0.05, "json_loads": 1, "exceptions": []},
+                ],
+                "cpu_seconds": 1.0,
+                "peak_rss_mb": 100.0 + i,
+            }
+            for i in range(2)
+        ]
+        report = build_report(sessions, wall_seconds=2.0)
+        self.assertEqual(report["reruns"], 4)
+        self.assertEqual(report["reruns_per_second"], 2.0)
+        self.assertEqual(report["actions"]["open"]["latency"]["p50"], 1.5)
+        self.assertEqual(report["actions"]["select team"]["json_loads_mean"], 1)
+        self.assertEqual(report["per_session"]["peak_rss_mb"]["p50"], 100.5)
+
+    def test_session_drives_the_app(self):
+        result = run_session(0, steps=1)
+        actions = [rerun["action"] for rerun in result["reruns"]]
+        self.assertEqual(actions[0], "open")
+        self.assertIn("select team", actions)
+        self.assertIn("toggle target", actions)
+        self.assertEqual([e for rerun in result["reruns"] for e in rerun["exceptions"]], [])
+        self.assertGreater(result["peak_rss_mb"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
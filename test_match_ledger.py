@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+import unittest
+
+from extract_table import parse_results
+from match_ledger import append_results, derive_files, read_ledger
+
+SCHEDULE = [
+    {"match_id": "m1", "team1": "Alpha", "team2": "Bravo"},
+    {"match_id": "m2", "team1": "Charlie", "team2": "Alpha"},
+    {"match_id": "m3", "team1": "Bravo", "team2": "Charlie"},
+    {"match_id": "m4", "team1": "Alpha", "team2": "Charlie"},
+]
+TEAMS = ["Alpha", "Bravo", "Charlie"]
+
+
+class TestMatchLedger(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.paths = {
+            name: os.path.join(self.tmpdir.name, name)
+            for name in ("ledger.jsonl", "standings.json", "fixtures.json", "delta.json")
+        }
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def record(self, *results):
+        return append_results(
+            [dict(match_id=m, team1=a, team2=b, winner=w) for m, a, b, w in results],
+            source="test",
+            path=self.paths["ledger.jsonl"],
+        )
+
+    def derive(self, schedule, points_table=None):
+        delta = derive_files(
+            schedule,
+            self.paths["standings.json"],
+            self.paths["fixtures.json"],
+            ledger_path=self.paths["ledger.jsonl"],
+            delta_path=self.paths["delta.json"],
+            teams=TEAMS,
+            points_table=points_table,
+        )
+        with open(self.paths["standings.json"]) as f:
+            standings = json.load(f)["standings"]
+        with open(self.paths["fixtures.json"]) as f:
+            fixtures = json.load(f)["fixtures"]
+        return delta, standings, fixtures
+
+    def test_append_only_and_deduplicated(self):
+        self.assertEqual(len(self.record(("m1", "Alpha", "Bravo", "Alpha"))), 1)
+        self.assertEqual(len(self.record(("m1", "Alpha", "Bravo", "Alpha"), ("m2", "Charlie", "Alpha", None))), 1)
+        with open(self.paths["ledger.jsonl"], "a") as f:
+            f.write('{"match_id": "torn')  # Interrupted append
+        self.assertEqual([e["match_id"] for e in read_ledger(self.paths["ledger.jsonl"])], ["m1", "m2"])
+
+    def test_incremental_derivation_reports_resolved_fixtures(self):
+        delta, standings, fixtures = self.derive(SCHEDULE)
+        self.assertEqual(delta["resolved"], [])
+        self.assertEqual(len(fixtures), 4)
+        self.assertEqual(standings["Alpha"], {"Matches": 0, "Wins": 0, "Points": 0})
+
+        self.record(("m2", "Charlie", "Alpha", None), ("m3", "Bravo", "Charlie", "Charlie"))
+        delta, standings, fixtures = self.derive(SCHEDULE[3:])
+        self.assertEqual(delta["ledger_entries"], [0, 2])
+        self.assertEqual([r["fixture_index"] for r in delta["resolved"]], [1, 2])
+        self.assertEqual(fixtures, [["Alpha", "Charlie"]])
+        self.assertEqual(standings["Charlie"], {"Matches": 2, "Wins": 1, "Points": 3})
+        self.assertEqual(standings["Alpha"], {"Matches": 1, "Wins": 0, "Points": 1})
+
+        # Only the new entry is applied on top of the saved standings.
+        self.record(("m4", "Alpha", "Charlie", "Alpha"))
+        delta, standings, fixtures = self.derive([])
+        self.assertEqual(delta["ledger_entries"], [2, 3])
+        self.assertEqual([r["fixture_index"] for r in delta["resolved"]], [0])
+        self.assertEqual(standings["Alpha"], {"Matches": 2, "Wins": 1, "Points": 3})
+        self.assertEqual(fixtures, [])
+
+    def test_points_table_wins_a_mismatch(self):
+        self.record(("m1", "Alpha", "Bravo", "Alpha"))
+        table = {
+            "Alpha": {"Matches": 1, "Wins": 1, "Points": 2, "NRR": 0.5},
+            "Bravo": {"Matches": 1, "Wins": 0, "Points": 0},
+            "Charlie": {"Matches": 0, "Wins": 0, "Points": 0},
+        }
+        delta, standings, _ = self.derive(SCHEDULE, points_table=table)
+        self.assertEqual(delta["mismatches"], [])
+
+        table["Charlie"] = {"Matches": 1, "Wins": 1, "Points": 2}
+        delta, standings, _ = self.derive(SCHEDULE, points_table=table)
+        self.assertEqual([m["team"] for m in delta["mismatches"]], ["Charlie"])
+        self.assertEqual(standings["Charlie"], {"Matches": 1, "Wins": 1, "Points": 2})
+        self.assertEqual(standings["Alpha"], {"Matches": 1, "Wins": 1, "Points": 2})
+
+    def test_playoffs_are_not_recorded(self):
+        payload = {
+            "data": {
+                "matchList": [
+                    {"id": "m70", "name": "Alpha vs Bravo, 70th Match", "matchEnded": True,
+                     "teams": ["Alpha", "Bravo"], "status": "Alpha won by 5 runs", "dateTimeGMT": "2026-05-18T14:00:00"},
+                    {"id": "q1", "name": "Alpha vs Bravo, Qualifier 1", "matchEnded": True,
+                     "teams": ["Alpha", "Bravo"], "status": "Bravo won by 3 wkts", "dateTimeGMT": "2026-05-20T14:00:00"},
+                    {"id": "f", "name": "Bravo vs Alpha, Final", "matchEnded": True,
+                     "teams": ["Bravo", "Alpha"], "status": "Bravo won by 1 run", "dateTimeGMT": "2026-05-26T14:00:00"},
+                ]
+            }
+        }
+        self.assertEqual([r["match_id"] for r in parse_results(payload)], ["m70"])
+
+
+if __name__ == "__main__":
+    unittest.main()
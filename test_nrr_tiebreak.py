@@ -0,0 +1,74 @@
+import unittest
+
+from nrr_tiebreak import NRRTieResolver
+from scenario_aggregates import ScenarioAggregates
+
+TEAMS = ["A", "B", "C", "D", "E"]
+
+
+class CountingResolver(NRRTieResolver):
+    """Resolver that records which tie situations it was asked to settle."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = []
+
+    def _simulate(self, group, future_wins, slots):
+        self.calls.append((group, future_wins, slots))
+        return super()._simulate(group, future_wins, slots)
+
+
+def make_resolver(nrr):
+    # Every team has played 10 with 4 wins and has 2 matches left.
+    return CountingResolver(nrr, [10] * 5, [2] * 5, [4] * 5, samples=4000)
+
+
+class TestNRRTieResolver(unittest.TestCase):
+    def test_from_standings_requires_nrr_for_every_team(self):
+        standings = {
+            "A": {"Matches": 1, "Wins": 1, "Points": 2, "NRR": 0.5},
+            "B": {"Matches": 1, "Wins": 0, "Points": 0},
+        }
+        self.assertIsNone(NRRTieResolver.from_standings(standings, [("A", "B")]))
+        standings["B"]["NRR"] = -0.5
+        resolver = NRRTieResolver.from_standings(standings, [("A", "B")])
+        self.assertEqual(list(resolver.matches_remaining), [1, 1])
+
+    def test_shares_fill_the_open_slots(self):
+        resolver = make_resolver([0.2, 0.0, -0.2, 0.0, 0.0])
+        shares = resolver.slot_shares([0, 1, 2], [5, 5, 5, 4, 4], 2)
+        self.assertAlmostEqual(float(shares.sum()), 2.0)
+        self.assertGreater(shares[0], shares[1])
+        self.assertGreater(shares[1], shares[2])
+
+    def test_only_boundary_ties_reach_the_resolver(self):
+        resolver = make_resolver([2.0, 1.0, 0.0, -1.0, -2.0])
+        aggregates = ScenarioAggregates(TEAMS, tie_resolver=resolver)
+        aggregates.add([10, 10, 8, 6, 4], [5, 5, 4, 3, 2])  # Tie inside the top 2
+        nrr = aggregates.results()["tiebreak_range"]["nrr"]
+        self.assertEqual(resolver.calls, [])
+        self.assertEqual(nrr["B"]["Top 2 Probability"], 100)
+
+    def test_straddling_tie_lies_between_the_extremes(self):
+        resolver = make_resolver([0.4, 0.2, 0.0, -0.2, -0.4])
+        aggregates = ScenarioAggregates(TEAMS, tie_resolver=resolver)
+        aggregates.add([12, 10, 10, 10, 4], [6, 5, 5, 5, 2])  # B, C, D share one Top 2 slot
+        aggregates.add([12, 10, 10, 10, 4], [6, 5, 5, 5, 2])
+        tiebreak_range = aggregates.results()["tiebreak_range"]
+        self.assertEqual(len(resolver.calls), 1)  # Second identical tie is cached
+        top2 = {team: tiebreak_range["nrr"][team]["Top 2 Probability"] for team in "BCD"}
+        self.assertAlmostEqual(sum(top2.values()), 100)
+        self.assertGreater(top2["B"], top2["C"])
+        self.assertGreater(top2["C"], top2["D"])
+        for team in "BCD":
+            self.assertLessEqual(tiebreak_range["pessimistic"][team]["Top 2 Probability"], top2[team])
+            self.assertGreaterEqual(tiebreak_range["optimistic"][team]["Top 2 Probability"], top2[team])
+
+    def test_no_nrr_section_without_resolver(self):
+        aggregates = ScenarioAggregates(TEAMS)
+        aggregates.add([12, 10, 10, 10, 4], [6, 5, 5, 5, 2])
+        self.assertNotIn("nrr", aggregates.results()["tiebreak_range"])
+
+
+if __name__ == "__main__":
+    unittest.main()
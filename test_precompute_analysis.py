@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import precompute_analysis
+from test_scenario_aggregates import FIXTURES, STANDINGS
+
+
+class TestInputHashShortCircuit(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.analysis_file = os.path.join(self.tmpdir.name, "analysis_results.json")
+        self.data = (STANDINGS, FIXTURES, "2026-05-01T00:00:00Z", "test", [])
+        patches = [
+            mock.patch.object(precompute_analysis, "ANALYSIS_FILE", self.analysis_file),
+            mock.patch.object(precompute_analysis, "ARTIFACTS_DIR", os.path.join(self.tmpdir.name, "analysis")),
+            mock.patch.object(precompute_analysis, "load_data", lambda: self.data),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def run_precompute(self, **kwargs):
+        with mock.patch.object(
+            precompute_analysis, "plan_engine", wraps=precompute_analysis.plan_engine
+        ) as planner:
+            precompute_analysis.precompute_analysis(**kwargs)
+        with open(self.analysis_file) as f:
+            return planner.call_count, json.load(f)
+
+    def test_unchanged_inputs_skip_the_analysis(self):
+        calls, first = self.run_precompute()
+        self.assertEqual(calls, 1)
+
+        self.data = (STANDINGS, FIXTURES, "2026-05-02T00:00:00Z", "test", [])
+        calls, second = self.run_precompute()
+        self.assertEqual(calls, 0)
+        self.assertEqual(second["analysis_data"], first["analysis_data"])
+        self.assertEqual(second["metadata"]["precomputed_at"], first["metadata"]["precomputed_at"])
+        self.assertEqual(second["metadata"]["last_data_update"], "2026-05-02T00:00:00Z")
+
+        calls, _ = self.run_precompute(force=True)
+        self.assertEqual(calls, 1)
+
+    def test_changed_inputs_or_settings_recompute(self):
+        self.run_precompute()
+        calls, _ = self.run_precompute(precision=0.1)
+        self.assertEqual(calls, 1)
+        self.data = (STANDINGS, FIXTURES[:-1], "2026-05-02T00:00:00Z", "test", [])
+        calls, saved = self.run_precompute(precision=0.1)
+        self.assertEqual(calls, 1)
+        self.assertEqual(saved["metadata"]["num_fixtures"], len(FIXTURES) - 1)
+
+    def test_failed_refresh_keeps_the_saved_analysis(self):
+        self.run_precompute()
+        with open(self.analysis_file) as f:
+            original = f.read()
+
+        def partial_dump(data, f, **kwargs):
+            f.write("{")
+            raise IOError("disk full")
+
+        self.data = (STANDINGS, FIXTURES, "2026-05-02T00:00:00Z", "test", [])
+        with mock.patch.object(precompute_analysis.json, "dump", partial_dump):
+            calls, _ = self.run_precompute()
+        self.assertEqual(calls, 0)
+        with open(self.analysis_file) as f:
+            self.assertEqual(f.read(), original)
+
+    def test_trajectory_follows_the_engine_plan(self):
+        _, saved = self.run_precompute()
+        self.assertTrue(saved["metadata"]["engine_plan"]["trajectory"]["run"])
+        self.assertIn("probability_trajectory", saved["analysis_data"])
+
+        _, saved = self.run_precompute(time_budget=0.001, precision=50)
+        self.assertFalse(saved["metadata"]["engine_plan"]["trajectory"]["run"])
+        self.assertNotIn("probability_trajectory", saved["analysis_data"])
+
+
+if __name__ == "__main__":
+    unittest.main()
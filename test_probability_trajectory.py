@@ -0,0 +1,43 @@
+import unittest
+
+import numpy as np
+
+from probability_trajectory import compute_trajectories
+from test_scenario_index import FIXTURES, STANDINGS, brute_force_ranks
+
+
+class TestProbabilityTrajectory(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.scenarios = list(brute_force_ranks())
+
+    def expected_probabilities(self, team, n, k):
+        """Qualification probability after each k-fixture prefix, by brute force."""
+        by_prefix = {}
+        for outcome, ranks in self.scenarios:
+            by_prefix.setdefault(outcome[:k], []).append(ranks[team] <= n)
+        return np.array([100 * np.mean(flags) for flags in by_prefix.values()])
+
+    def test_matches_brute_force_for_every_chunking(self):
+        # 8 splits the 64 scenarios across chunks; the default keeps them in one.
+        for chunk_size in (8, 1 << 16):
+            trajectory = compute_trajectories(STANDINGS, FIXTURES, chunk_size=chunk_size)
+            for n in (4, 2):
+                for team in STANDINGS:
+                    levels = trajectory["teams"][n][team]
+                    self.assertEqual(len(levels), len(FIXTURES) + 1)
+                    for k, level in enumerate(levels):
+                        expected = self.expected_probabilities(team, n, k)
+                        quantiles = np.percentile(expected, trajectory["percentiles"], method="inverted_cdf")
+                        np.testing.assert_allclose(level["percentiles"], quantiles)
+                        self.assertAlmostEqual(level["clinched"], 100 * np.mean(expected == 100))
+                        self.assertAlmostEqual(level["eliminated"], 100 * np.mean(expected == 0))
+
+    def test_first_level_is_the_overall_probability(self):
+        trajectory = compute_trajectories(STANDINGS, FIXTURES)
+        overall = 100 * np.mean([ranks["Bravo"] <= 2 for _, ranks in self.scenarios])
+        self.assertEqual(set(trajectory["teams"][2]["Bravo"][0]["percentiles"]), {overall})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import itertools
+import random
+import unittest
+
+import ipl_analysis_app as app
+from scenario_aggregates import TIEBREAK_POLICIES, ScenarioAggregates
+
+STANDINGS = {
+    "Alpha": {"Matches": 2, "Wins": 2, "Points": 4},
+    "Bravo": {"Matches": 2, "Wins": 1, "Points": 2},
+    "Charlie": {"Matches": 2, "Wins": 1, "Points": 2},
+    "Delta": {"Matches": 1, "Wins": 0, "Points": 0},
+    "Echo": {"Matches": 1, "Wins": 0, "Points": 0},
+}
+FIXTURES = [
+    ("Alpha", "Bravo"),
+    ("Charlie", "Delta"),
+    ("Echo", "Alpha"),
+    ("Bravo", "Charlie"),
+    ("Delta", "Echo"),
+    ("Alpha", "Charlie"),
+]
+
+
+class TestScenarioAggregates(unittest.TestCase):
+    def test_positions_for_a_single_tied_table(self):
+        aggregates = ScenarioAggregates(["A", "B", "C"])
+        aggregates.add([4, 4, 2], [2, 2, 1])
+        results = aggregates.results()
+        self.assertEqual(results["position_distribution"]["optimistic"]["B"], [100, 0, 0])
+        self.assertEqual(results["position_distribution"]["neutral"]["A"], [50, 50, 0])
+        self.assertEqual(results["position_distribution"]["neutral"]["C"], [0, 0, 100])
+        self.assertEqual(results["position_distribution"]["pessimistic"]["A"], [0, 100, 0])
+        self.assertAlmostEqual(results["expected_position"]["neutral"]["B"], 1.5)
+
+    def test_tiebreak_range_brackets_neutral(self):
+        aggregates = ScenarioAggregates(["A", "B", "C", "D", "E"])
+        aggregates.add([8, 6, 6, 6, 2], [4, 3, 3, 3, 1])
+        tiebreak_range = aggregates.results()["tiebreak_range"]
+        self.assertEqual(tiebreak_range["optimistic"]["B"]["Top 2 Probability"], 100)
+        self.assertAlmostEqual(tiebreak_range["neutral"]["B"]["Top 2 Probability"], 100 / 3)
+        self.assertEqual(tiebreak_range["pessimistic"]["B"]["Top 2 Probability"], 0)
+        self.assertEqual(tiebreak_range["pessimistic"]["B"]["Top 4 Probability"], 100)
+
+    def test_weights_scale_scenarios(self):
+        aggregates = ScenarioAggregates(["A", "B"])
+        aggregates.add([2, 0], [1, 0], weight=3)
+        aggregates.add([0, 2], [0, 1], weight=1)
+        shares = aggregates.results()["position_distribution"]["optimistic"]["A"]
+        self.assertEqual(shares, [75, 25])
+
+    def test_exhaustive_distribution_matches_overall_probabilities(self):
+        results = app.run_exhaustive_analysis_once(STANDINGS, FIXTURES)
+        optimistic = results["position_distribution"]["optimistic"]
+        for team, probs in results["overall_probabilities"].items():
+            self.assertAlmostEqual(sum(optimistic[team][:4]), probs["Top 4 Probability"])
+            self.assertAlmostEqual(sum(optimistic[team][:2]), probs["Top 2 Probability"])
+        for position in range(len(STANDINGS)):
+            column = sum(shares[position] for shares in results["position_distribution"]["neutral"].values())
+            self.assertAlmostEqual(column, 100)
+
+    def test_lineups_share_the_cut_evenly(self):
+        aggregates = ScenarioAggregates(["A", "B", "C", "D", "E"])
+        aggregates.add([6, 4, 4, 4, 2], [3, 2, 1, 2, 1], weight=2)
+        aggregates.add([2, 2, 2, 2, 8], [1, 1, 1, 1, 4])
+        results = aggregates.results()
+        self.assertEqual(results["playoff_lineups"][0]["teams"], ["A", "B", "C", "D"])
+        self.assertAlmostEqual(results["playoff_lineups"][0]["probability"], 200 / 3)
+        # Four teams level on 2 points for three spots: each trio is a quarter.
+        self.assertEqual(len(results["playoff_lineups"]), 5)
+        self.assertAlmostEqual(results["playoff_lineups"][1]["probability"], 100 / 12)
+        self.assertAlmostEqual(results["co_qualification"]["A"]["E"], 100 / 4)
+        self.assertAlmostEqual(results["co_qualification"]["E"]["E"], 100 / 3)
+        self.assertAlmostEqual(results["co_qualification"]["A"]["A"], 200 / 3 + 100 / 4)
+
+    def test_points_thresholds(self):
+        results = app.run_exhaustive_analysis_once(STANDINGS, FIXTURES)
+        thresholds = results["points_thresholds"]
+        self.assertAlmostEqual(sum(thresholds["cutoff_points"]["4"].values()), 100)
+        self.assertAlmostEqual(sum(thresholds["cutoff_points"]["2"].values()), 100)
+        # Recombining P(qualify | points) with P(points) gives back the overall chance.
+        for team, probs in results["overall_probabilities"].items():
+            points_share = self._points_distribution(team)
+            by_points = thresholds["qualification_by_points"]["optimistic"]["4"][team]
+            recombined = sum(points_share[p] * by_points[str(p)] / 100 for p in points_share)
+            self.assertAlmostEqual(recombined, probs["Top 4 Probability"])
+
+    @staticmethod
+    def _points_distribution(team):
+        shares = {}
+        for outcome in itertools.product([0, 1], repeat=len(FIXTURES)):
+            points = STANDINGS[team]["Points"] + 2 * sum(
+                (team_a if result == 1 else team_b) == team
+                for result, (team_a, team_b) in zip(outcome, FIXTURES)
+            )
+            shares[points] = shares.get(points, 0) + 100 / 2 ** len(FIXTURES)
+        return shares
+
+    def test_monte_carlo_fills_details(self):
+        details = {}
+        overall = app.simulate_season_mc(STANDINGS, FIXTURES, num_simulations=200, details=details)
+        self.assertAlmostEqual(sum(l["probability"] for l in details["playoff_lineups"]), 100)
+        for team in STANDINGS:
+            self.assertAlmostEqual(sum(details["position_distribution"]["neutral"][team]), 100)
+            # Lineups split ties at the cut evenly, like the neutral policy.
+            self.assertAlmostEqual(
+                details["co_qualification"][team][team],
+                details["tiebreak_range"]["neutral"][team]["Top 4 Probability"],
+            )
+            self.assertLessEqual(
+                details["co_qualification"][team][team], overall[team]["Top 4 Probability"] + 1e-9
+            )
+
+
+class TestTiePolicies(unittest.TestCase):
+    SIMULATIONS = 20000
+    TOLERANCE = 2.0  # Percentage points, over 4 standard errors at this many runs
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tiebreak_range = app.run_exhaustive_analysis_once(STANDINGS, FIXTURES)["tiebreak_range"]
+
+    def test_season_engines_agree_under_each_policy(self):
+        for policy in TIEBREAK_POLICIES:
+            with self.subTest(policy=policy):
+                exhaustive = app.simulate_season_exhaustive(STANDINGS, FIXTURES, tie_policy=policy)
+                random.seed(0)
+                mc = app.simulate_season_mc(
+                    STANDINGS, FIXTURES, num_simulations=self.SIMULATIONS, tie_policy=policy
+                )
+                for team in STANDINGS:
+                    for column in ("Top 4 Probability", "Top 2 Probability"):
+                        self.assertAlmostEqual(
+                            exhaustive[team][column], self.tiebreak_range[policy][team][column]
+                        )
+                        self.assertAlmostEqual(
+                            mc[team][column], exhaustive[team][column], delta=self.TOLERANCE
+                        )
+
+    def test_team_engines_agree_under_each_policy(self):
+        for policy in TIEBREAK_POLICIES:
+            for team, top_n in (("Bravo", 2), ("Delta", 4)):
+                with self.subTest(policy=policy, team=team):
+                    exhaustive, _ = app.analyze_team_exhaustive(
+                        team, top_n, STANDINGS, FIXTURES, tie_policy=policy
+                    )
+                    random.seed(0)
+                    mc, _ = app.analyze_team_mc(
+                        team, top_n, STANDINGS, FIXTURES,
+                        num_simulations=self.SIMULATIONS, tie_policy=policy,
+                    )
+                    self.assertAlmostEqual(
+                        exhaustive, self.tiebreak_range[policy][team][f"Top {top_n} Probability"]
+                    )
+                    self.assertAlmostEqual(mc, exhaustive, delta=self.TOLERANCE)
+
+    def test_policies_are_ordered(self):
+        shares = {
+            policy: app.simulate_season_exhaustive(STANDINGS, FIXTURES, tie_policy=policy)
+            for policy in TIEBREAK_POLICIES
+        }
+        for team in STANDINGS:
+            top4 = [shares[p][team]["Top 4 Probability"] for p in ("pessimistic", "neutral", "optimistic")]
+            self.assertEqual(top4, sorted(top4))
+        with self.assertRaises(ValueError):
+            app.simulate_season_exhaustive(STANDINGS, FIXTURES, tie_policy="coin toss")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import itertools
+import unittest
+
+from scenario_index import Bitmap, ScenarioBitmapIndex, CONTAINER_BITS
+
+STANDINGS = {
+    "Alpha": {"Matches": 2, "Wins": 2, "Points": 4},
+    "Bravo": {"Matches": 2, "Wins": 1, "Points": 2},
+    "Charlie": {"Matches": 2, "Wins": 1, "Points": 2},
+    "Delta": {"Matches": 1, "Wins": 0, "Points": 0},
+    "Echo": {"Matches": 1, "Wins": 0, "Points": 0},
+}
+FIXTURES = [
+    ("Alpha", "Bravo"),
+    ("Charlie", "Delta"),
+    ("Echo", "Alpha"),
+    ("Bravo", "Charlie"),
+    ("Delta", "Echo"),
+    ("Alpha", "Charlie"),
+]
+
+
+def brute_force_ranks():
+    """Yields (outcome tuple, {team: rank}) with rank = 1 + teams on strictly more points."""
+    for outcome in itertools.product([0, 1], repeat=len(FIXTURES)):
+        points = {t: s["Points"] for t, s in STANDINGS.items()}
+        for result, (team_a, team_b) in zip(outcome, FIXTURES):
+            points[team_a if result == 1 else team_b] += 2
+        yield outcome, {t: 1 + sum(p > points[t] for p in points.values()) for t in points}
+
+
+class TestScenarioBitmapIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.index = ScenarioBitmapIndex.build(STANDINGS, FIXTURES)
+        cls.scenarios = list(brute_force_ranks())
+
+    def test_conditional_joint_query(self):
+        given = self.index.conditions({0: "Bravo", 2: "Echo"})
+        event = self.index.top("Charlie", 4) & self.index.top("Bravo", 2)
+        matching = [r for o, r in self.scenarios if o[0] == 0 and o[2] == 1]
+        expected = 100 * sum(r["Charlie"] <= 4 and r["Bravo"] <= 2 for r in matching) / len(matching)
+        self.assertAlmostEqual(self.index.probability(event, given=given), expected)
+
+    def test_exact_lineup(self):
+        lineup = {"Alpha", "Bravo", "Charlie", "Delta"}
+        expected = sum(
+            {t for t, rank in r.items() if rank <= 4} == lineup for _, r in self.scenarios
+        )
+        self.assertEqual(self.index.lineup(lineup).count(), expected)
+
+    def test_contradictory_conditions_have_no_scenarios(self):
+        given = self.index.fixture(0, "Alpha") & self.index.fixture(0, "Bravo")
+        self.assertEqual(given.count(), 0)
+        self.assertIsNone(self.index.probability(self.index.top("Alpha", 4), given=given))
+
+    def test_bitmap_operations_across_containers(self):
+        size = CONTAINER_BITS + 10
+        index = ScenarioBitmapIndex([], [], (), [], {}, size)
+        everything = index.all()
+        self.assertEqual(everything.count(), size)
+        self.assertEqual((~everything).count(), 0)
+        self.assertEqual((everything | ~everything).count(), size)
+        self.assertIsInstance(everything, Bitmap)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import ipl_analysis_app as app
+import scenario_store
+from scenario_store import build_scenario_store, load_scenario_store, metadata_path, ScenarioStore
+
+STANDINGS = {
+    "Alpha": {"Matches": 2, "Wins": 2, "Points": 4},
+    "Bravo": {"Matches": 2, "Wins": 1, "Points": 2},
+    "Charlie": {"Matches": 2, "Wins": 1, "Points": 2},
+    "Delta": {"Matches": 1, "Wins": 0, "Points": 0},
+    "Echo": {"Matches": 1, "Wins": 0, "Points": 0},
+}
+FIXTURES = [
+    ("Alpha", "Bravo"),
+    ("Charlie", "Delta"),
+    ("Echo", "Alpha"),
+    ("Bravo", "Charlie"),
+    ("Delta", "Echo"),
+    ("Alpha", "Charlie"),
+]
+
+
+class TestScenarioStore(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.store_path = os.path.join(cls.tmp_dir.name, "store.npy")
+        cls.store = build_scenario_store(STANDINGS, FIXTURES, cls.store_path)
+        cls.exhaustive = app.run_exhaustive_analysis_once(STANDINGS, FIXTURES)
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.store
+        cls.tmp_dir.cleanup()
+
+    def test_store_matches_exhaustive_probabilities(self):
+        self.assertEqual(len(self.store), 2 ** len(FIXTURES))
+        for team, probs in self.exhaustive["overall_probabilities"].items():
+            self.assertAlmostEqual(self.store.probability(team, 4), probs["Top 4 Probability"])
+            self.assertAlmostEqual(self.store.probability(team, 2), probs["Top 2 Probability"])
+
+    def test_outcome_indices_follow_enumeration_order(self):
+        # Scenario 0 has every second-named team winning, the last one every first-named team.
+        self.assertEqual(list(self.store.records["outcome"][:2]), [0, 1])
+        self.assertEqual(int(self.store.fixture_results(0)[0]), 0)
+        self.assertEqual(int(self.store.fixture_results(0)[-1]), 1)
+        self.assertEqual(int(self.store.fixture_results(len(FIXTURES) - 1)[1]), 1)
+
+    def test_conditional_query(self):
+        mask = self.store.select(results={0: "Bravo", 5: "Charlie"})
+        self.assertEqual(int(mask.sum()), 2 ** (len(FIXTURES) - 2))
+        # Alpha on 4 points with two losses can never be outscored by all of the others.
+        self.assertGreater(self.store.probability("Alpha", 4, results={0: "Bravo"}), 0)
+        with self.assertRaises(ValueError):
+            self.store.select(results={0: "Echo"})
+
+    def test_reopen_checks_inputs(self):
+        reopened = load_scenario_store(STANDINGS, FIXTURES, self.store_path)
+        self.assertIsInstance(reopened, ScenarioStore)
+        self.assertIsNone(load_scenario_store(STANDINGS, FIXTURES[:-1], self.store_path))
+
+
+    def test_interrupted_rebuild_never_pairs_a_store_with_stale_metadata(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "store.npy")
+            build_scenario_store(STANDINGS, FIXTURES, path)
+            real_replace = os.replace
+
+            def interrupt_metadata(src, dst):
+                if dst == metadata_path(path):
+                    raise KeyboardInterrupt
+                real_replace(src, dst)
+
+            with mock.patch.object(scenario_store.os, "replace", interrupt_metadata):
+                with self.assertRaises(KeyboardInterrupt):
+                    build_scenario_store(STANDINGS, FIXTURES[:-1], path)
+            # The new store is published but has no metadata yet: neither input set trusts it.
+            self.assertIsNone(load_scenario_store(STANDINGS, FIXTURES, path))
+            self.assertIsNone(load_scenario_store(STANDINGS, FIXTURES[:-1], path))
+
+            rebuilt = build_scenario_store(STANDINGS, FIXTURES[:-1], path)
+            self.assertEqual(len(rebuilt), 2 ** (len(FIXTURES) - 1))
+            del rebuilt
+            self.assertIsNotNone(load_scenario_store(STANDINGS, FIXTURES[:-1], path))
+
+
+if __name__ == "__main__":
+    unittest.main()
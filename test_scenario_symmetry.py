@@ -0,0 +1,59 @@
+import unittest
+
+import ipl_analysis_app as app
+from split_enumeration import run_split_enumeration_analysis
+from scenario_space import group_fixtures
+from scenario_symmetry import FixtureSymmetry
+from test_split_enumeration import assert_results_equal
+
+TEAMS = ["A", "B", "C", "D", "E", "F"]
+STANDINGS = {
+    team: {"Matches": 4, "Wins": wins, "Points": 2 * wins}
+    for team, wins in zip(TEAMS, [3, 2, 2, 2, 1, 0])
+}
+# B, C and D have the same record and every one of them meets A, E, F and
+# the other two once, so any permutation of B/C/D is a symmetry.
+FIXTURES = [
+    ("A", "B"), ("A", "C"), ("A", "D"), ("B", "C"), ("C", "D"), ("D", "B"),
+    ("E", "B"), ("C", "E"), ("E", "D"), ("F", "A"), ("E", "F"), ("B", "F"),
+    ("F", "C"), ("D", "F"),
+]
+
+
+class TestFixtureSymmetry(unittest.TestCase):
+    def test_detects_permutations_of_identical_teams(self):
+        symmetry = FixtureSymmetry.detect(STANDINGS, group_fixtures(FIXTURES))
+        self.assertEqual(len(symmetry), 6)
+        self.assertTrue(all(t == u for t, u in symmetry.team_perms[0].items()))
+
+    def test_only_schedule_preserving_permutations_survive(self):
+        fixtures = FIXTURES[:-1]  # D no longer plays F, only B <-> C remains
+        symmetry = FixtureSymmetry.detect(STANDINGS, group_fixtures(fixtures))
+        self.assertEqual(len(symmetry), 2)
+        chain = [("A", "B"), ("B", "C"), ("C", "D")]
+        self.assertIsNone(FixtureSymmetry.detect(STANDINGS, group_fixtures(chain)))
+
+    def test_nrr_breaks_symmetry(self):
+        standings = {team: dict(stats, NRR=0.0) for team, stats in STANDINGS.items()}
+        standings["B"]["NRR"] = 0.4
+        symmetry = FixtureSymmetry.detect(standings, group_fixtures(FIXTURES))
+        self.assertEqual(len(symmetry), 2)  # Only C <-> D remains
+
+    def test_orbit_has_one_canonical_member(self):
+        groups = group_fixtures(FIXTURES)
+        sizes = [len(indices) for _, indices in groups]
+        symmetry = FixtureSymmetry.detect(STANDINGS, groups)
+        scenario = (1,) * len(groups)
+        images = {symmetry.image(k, scenario, sizes) for k in range(len(symmetry))}
+        canonical = [s for s in images if symmetry.orbit(s, sizes) is not None]
+        self.assertEqual(canonical, [min(images)])
+        self.assertEqual(set(symmetry.orbit(min(images), sizes)), images)
+
+    def test_reduced_exhaustive_matches_unreduced_engine(self):
+        expected = run_split_enumeration_analysis(STANDINGS, FIXTURES)
+        actual = app.run_exhaustive_analysis_once(STANDINGS, FIXTURES)
+        assert_results_equal(self, expected, actual)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import random
+import unittest
+
+import ipl_analysis_app as app
+from split_enumeration import enumerate_half, run_split_enumeration_analysis, split_fixtures
+
+TEAMS = ["A", "B", "C", "D", "E", "F"]
+STANDINGS = {
+    team: {"Matches": 4, "Wins": wins, "Points": 2 * wins}
+    for team, wins in zip(TEAMS, [3, 2, 2, 2, 1, 0])
+}
+
+
+def assert_results_equal(test, expected, actual, path=""):
+    """Deep comparison of two engines' result dictionaries (floats to 9 places)."""
+    if isinstance(expected, dict):
+        test.assertEqual(set(expected), set(actual), path)
+        for key in expected:
+            assert_results_equal(test, expected[key], actual[key], f"{path}/{key}")
+    elif isinstance(expected, list):
+        test.assertEqual(len(expected), len(actual), path)
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            assert_results_equal(test, a, b, f"{path}[{i}]")
+    elif isinstance(expected, float):
+        test.assertAlmostEqual(expected, actual, places=9, msg=path)
+    else:
+        test.assertEqual(expected, actual, path)
+
+
+class TestSplitEnumeration(unittest.TestCase):
+    def test_half_table_counts_every_outcome(self):
+        half = enumerate_half(TEAMS, [("A", "B"), ("A", "B"), ("C", "D")])
+        self.assertEqual(half.counts.sum(), 8)
+        self.assertEqual(len(half.counts), 6)  # 3 A/B splits x 2 C/D results
+        self.assertEqual(half.a_wins[:, 0].sum(), 4)
+
+    def test_split_keeps_repeated_pairs_together(self):
+        fixtures = [("A", "B"), ("E", "F"), ("B", "A"), ("E", "F")]
+        left, right = split_fixtures(TEAMS, fixtures)
+        self.assertEqual(sorted(left), [0, 2])
+        self.assertEqual(sorted(right), [1, 3])
+
+    def test_matches_exhaustive_analysis(self):
+        rng = random.Random(3)
+        fixtures = [tuple(rng.sample(TEAMS, 2)) for _ in range(11)] + [("A", "B")]
+        expected = app.run_exhaustive_analysis_once(STANDINGS, fixtures)
+        for halves in (None, (list(range(5)), list(range(5, 12)))):
+            actual = run_split_enumeration_analysis(
+                STANDINGS, fixtures, halves=halves, chunk_rows=64
+            )
+            assert_results_equal(self, expected, actual)
+
+
+if __name__ == "__main__":
+    unittest.main()